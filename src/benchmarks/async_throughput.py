@@ -0,0 +1,187 @@
+"""
+Throughput of the asyncio API (AsyncMilvusDataManager) against the sync path.
+
+Run from the src folder:
+    python benchmarks/async_throughput.py [--backend local] [--rows 20000] [--requests 500]
+        [--concurrency 1 8 32] [--latency-ms 0] [--text] [--json out.json]
+
+Sync: 500-row insert calls and one blocking search() per request, in sequence.
+Async: all requests in flight at once through asyncio.gather, limited to
+--concurrency store calls. With the in-memory backend, --latency-ms adds a
+sleep to every store call to model a Milvus round trip; --backend milvus
+measures the real server (the benchmark collection is dropped afterwards).
+--text sends raw text queries so encoding is offloaded and coalesced too.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from services.Milvus.AsyncMilvusDataManager import AsyncMilvusDataManager  # noqa: E402
+
+COLLECTION_NAME = "bench_async"
+DIMENSION = 384
+
+
+class DelayedStore:
+    # TODO: Sync store whose every call sleeps first (simulated network round trip)
+    def __init__(self, store, latency_s: float):
+        self.store = store
+        self.latency_s = latency_s
+        self.collection_name = store.collection_name
+
+    def __getattr__(self, name):
+        attr = getattr(self.store, name)
+        if not callable(attr):
+            return attr
+
+        def delayed(*args, **kwargs):
+            time.sleep(self.latency_s)
+            return attr(*args, **kwargs)
+
+        return delayed
+
+
+# TODO: Vector store for the benchmark; returns (store, cleanup)
+def build_store(backend: str, latency_ms: float, pool_size: int):
+    if backend == "local":
+        from services.Milvus.LocalDataManager import LocalDataManager
+
+        store = LocalDataManager(COLLECTION_NAME, DIMENSION, persist_dir=None)
+        if latency_ms:
+            store = DelayedStore(store, latency_ms / 1000.0)
+        return store, lambda: None
+
+    from services.Milvus.MilvusConnector import MilvusConnector
+    from services.Milvus.MilvusDataManager import MilvusDataManager
+
+    connector = MilvusConnector(pool_size=pool_size).connect()
+    connector.drop_collection(COLLECTION_NAME)
+    connector.create_collection(COLLECTION_NAME, DIMENSION)
+    connector.create_index(COLLECTION_NAME)
+    connector.collection(COLLECTION_NAME).load()
+
+    def cleanup():
+        connector.drop_collection(COLLECTION_NAME)
+        connector.disconnect()
+
+    return MilvusDataManager(connector, COLLECTION_NAME), cleanup
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["local", "milvus"], default="local")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--text", action="store_true", help="Raw text queries")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    embedder = None
+    if args.text:
+        from services.Milvus.MilvusEmbedder import MilvusEmbedder
+
+        embedder = MilvusEmbedder(cache_dir=None)
+        queries = fixtures.make_testcases(args.requests, seed=7)["Description"].tolist()
+    else:
+        queries = list(fixtures.make_embeddings(args.requests, DIMENSION, seed=7))
+
+    ids = list(range(args.rows))
+    vectors = fixtures.make_embeddings(args.rows, DIMENSION)
+    texts = ["text"] * args.rows
+    results = {"backend": args.backend, "latency_ms": args.latency_ms, "runs": {}}
+
+    # ? Sync path: what a blocking service does, one request after the other
+    store, cleanup = build_store(args.backend, args.latency_ms, max(args.concurrency))
+    try:
+
+        # ? Same 500-row insert calls the async path makes, one after the other
+        def sync_insert():
+            for start in range(0, args.rows, 500):
+                end = start + 500
+                store.insert_embeddings(
+                    ids[start:end], vectors[start:end], texts[start:end]
+                )
+
+        insert_s = timed(sync_insert)
+        if args.backend == "milvus":
+            store.flush()
+
+        def sync_search():
+            for q in queries:
+                if isinstance(q, str):
+                    q = embedder.encode([q], show_progress_bar=False)[0]
+                store.search(q, top_k=10)
+
+        search_s = timed(sync_search)
+    finally:
+        cleanup()
+    results["runs"]["sync"] = {
+        "insert_rows_per_sec": round(args.rows / insert_s, 1),
+        "search_qps": round(args.requests / search_s, 1),
+    }
+
+    for concurrency in args.concurrency:
+        store, cleanup = build_store(args.backend, args.latency_ms, concurrency)
+        try:
+
+            async def run():
+                async with AsyncMilvusDataManager(
+                    store, embedder=embedder, max_concurrency=concurrency
+                ) as manager:
+                    started = time.perf_counter()
+                    await manager.insert(ids, vectors, texts)
+                    insert_s = time.perf_counter() - started
+                    if args.backend == "milvus":
+                        await manager.flush()
+                    started = time.perf_counter()
+                    await asyncio.gather(
+                        *(manager.search(q, top_k=10) for q in queries)
+                    )
+                    return insert_s, time.perf_counter() - started
+
+            insert_s, search_s = asyncio.run(run())
+        finally:
+            cleanup()
+        results["runs"][f"async_c{concurrency}"] = {
+            "insert_rows_per_sec": round(args.rows / insert_s, 1),
+            "search_qps": round(args.requests / search_s, 1),
+        }
+
+    sync = results["runs"]["sync"]
+    print(
+        f"backend={args.backend} rows={args.rows} requests={args.requests} "
+        f"latency={args.latency_ms}ms"
+    )
+    for name, row in results["runs"].items():
+        print(
+            f"{name:<12} insert {row['insert_rows_per_sec']:>10.1f} rows/s "
+            f"(x{row['insert_rows_per_sec'] / sync['insert_rows_per_sec']:.2f})  "
+            f"search {row['search_qps']:>8.1f} qps "
+            f"(x{row['search_qps'] / sync['search_qps']:.2f})"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Memory saved vs recall@k lost for the compact vector modes (float16 / binary).
+
+Run from the src folder:
+    python benchmarks/compact_vectors.py [--embeddings vectors.npy] [--rows 50000]
+        [--queries 500] [--top-k 10] [--rerank-factor 4] [--json out.json]
+
+Brute-force, no server: every mode is scored against exact float32 cosine search
+over the same corpus, so the recall loss is the quantization's alone (an ANN index
+adds its own loss on top, see `mainApp.py tune`). "+rerank" rows fetch
+rerank-factor x top-k candidates and re-order them with the full-precision vectors,
+as MilvusDataManager does with a rerank store. Without --embeddings the corpus is
+clustered synthetic data; queries are noisy copies of corpus rows.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+from services.Milvus.CompactVectors import compare_modes  # noqa: E402
+
+DIMENSION = 384
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--embeddings", help=".npy matrix of real embeddings")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.embeddings:
+        corpus = np.load(args.embeddings, mmap_mode="r")[: args.rows]
+        corpus = np.asarray(corpus, dtype=np.float32)
+    else:
+        corpus = fixtures.make_clustered_embeddings(args.rows, DIMENSION)
+    rng = np.random.default_rng(7)
+    # ? Paraphrase-like queries: a corpus row plus noise, so neighbours are meaningful
+    rows = rng.choice(len(corpus), min(args.queries, len(corpus)), replace=False)
+    queries = corpus[rows] + 0.3 * rng.normal(size=(len(rows), corpus.shape[1])) / (
+        np.sqrt(corpus.shape[1])
+    )
+
+    report = compare_modes(
+        corpus, queries, top_k=args.top_k, rerank_factor=args.rerank_factor
+    )
+    print(
+        f"rows={len(corpus)} dim={corpus.shape[1]} queries={len(queries)} "
+        f"top_k={args.top_k} rerank_factor={args.rerank_factor}"
+    )
+    for name, row in report.items():
+        print(
+            f"{name:<16} {row['bytes_per_vector']:>7.0f} B/vec {row['vector_mb']:>9.2f} MB "
+            f"(-{row['saved_pct']:>4.1f}%)  recall@{args.top_k} {row['recall']:.4f} "
+            f"(lost {row['recall_lost']:.4f})  rerank disk {row['rerank_disk_mb']:.2f} MB"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"rows": len(corpus), "top_k": args.top_k, "modes": report}, f, indent=2
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Accuracy/speed check of the embedding inference backends.
+
+Run from the src folder:
+    python benchmarks/embedder_backends.py [--sample 1000] [--min-cosine 0.99] [--json out.json]
+
+Encodes a sample of test case descriptions (latest processed dataset, or synthetic
+sentences when none exists) with every backend and reports the cosine agreement
+with the fp32 PyTorch reference and the speedup. Exits with code 1 if a backend
+falls below --min-cosine.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.Milvus.MilvusEmbedder import BACKENDS, compare_backends  # noqa: E402
+
+WORDS = (
+    "verify user login page error message timeout network retry upload file "
+    "priority report dashboard export settings permission admin session cache"
+).split()
+
+
+# TODO: Sample descriptions from the latest processed dataset, or synthesize sentences
+def load_sample(size: int, seed: int = 0) -> list:
+    from dataLoaders.ProcessedDataset import ProcessedDataset
+
+    dataset = ProcessedDataset()
+    if dataset.latest_path() is not None:
+        texts = dataset.load()["description"].dropna().astype(str).tolist()
+        if texts:
+            random.Random(seed).shuffle(texts)
+            return texts[:size]
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(WORDS, k=rng.randint(5, 40))).capitalize()
+        for _ in range(size)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="all-MiniLM-L6-v2")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--sample", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    texts = load_sample(args.sample)
+    report = compare_backends(
+        texts,
+        model_name=args.model,
+        backends=tuple(args.backends),
+        repeat=args.repeat,
+        min_cosine=args.min_cosine,
+    )
+
+    print(f"{len(texts)} texts, reference: torch")
+    for backend, row in report.items():
+        status = "OK  " if row["accepted"] else "FAIL"
+        print(
+            f"{status} {backend:<10} {row['texts_per_sec']:>9.1f} texts/s  "
+            f"x{row['speedup']:<5} cos mean {row['mean_cosine']:.5f}  min {row['min_cosine']:.5f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"texts": len(texts), "backends": report}, f, indent=2)
+    return 0 if all(row["accepted"] for row in report.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
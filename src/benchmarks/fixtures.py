@@ -0,0 +1,86 @@
+"""
+Synthetic, deterministic fixtures for the pipeline benchmarks.
+
+Everything is generated from a seed, so two runs at the same scale benchmark
+identical data and results stay comparable across commits.
+"""
+
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+WORDS = (
+    "verify user login page error message timeout network retry upload file "
+    "priority report dashboard export settings permission admin session cache "
+    "alarm shelf card port laser threshold optical power link fault recovery"
+).split()
+PRIORITIES = ["P1", "P2", "P3", "High", "Medium", "Low"]
+AREAS = [f"Area {i}" for i in range(12)]
+STATUSES = ["Pass", "Fail", "Blocked", "Not Run"]
+
+
+# TODO: One test case sheet with the raw (uncleaned) column names seen in real workbooks
+def make_testcases(rows: int, seed: int = 0, prefix: str = "TC") -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "TC ID": [f"{prefix}-{i:05d}" for i in range(rows)],
+            "Description": [
+                # ? Padding spaces give clean_data real work to do
+                "  " + " ".join(rng.choices(WORDS, k=rng.randint(5, 60))) + " "
+                for _ in range(rows)
+            ],
+            "Priority": [rng.choice(PRIORITIES) for _ in range(rows)],
+            "Functional Area": [rng.choice(AREAS) for _ in range(rows)],
+            "Status": [rng.choice(STATUSES) for _ in range(rows)],
+            "Comments": [
+                rng.choice(["", " see log ", None, "retest"]) for _ in range(rows)
+            ],
+        }
+    )
+
+
+# TODO: Write workbooks with several test case sheets plus one non-test-case sheet each
+def make_workbooks(
+    folder: str, workbooks: int = 3, sheets: int = 3, rows: int = 200, seed: int = 0
+) -> list:
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    for w in range(workbooks):
+        path = os.path.join(folder, f"synthetic_plan_{w}.xlsx")
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            pd.DataFrame({"Revision": ["0.1", "0.2"], "Author": ["a", "b"]}).to_excel(
+                writer, sheet_name="History", index=False
+            )
+            for s in range(sheets):
+                make_testcases(
+                    rows, seed=seed + w * 100 + s, prefix=f"W{w}S{s}"
+                ).to_excel(writer, sheet_name=f"Tests {s}", index=False)
+        paths.append(path)
+    return paths
+
+
+# TODO: Random unit vectors shaped like all-MiniLM-L6-v2 output
+def make_embeddings(rows: int, dimension: int = 384, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(rows, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+# TODO: Unit vectors grouped around topic centers (closer to real sentence embeddings than pure noise)
+def make_clustered_embeddings(
+    rows: int,
+    dimension: int = 384,
+    clusters: int = 50,
+    spread: float = 0.6,
+    seed: int = 0,
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimension))
+    vectors = centers[rng.integers(0, clusters, rows)] + spread * rng.normal(
+        size=(rows, dimension)
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
@@ -0,0 +1,426 @@
+"""
+Per-stage micro-benchmarks of the ingestion and search pipeline.
+
+Run from the src folder:
+    python benchmarks/pipeline_benchmark.py run [--scale 1] [--repeat 5] [--only clean search] [--out results.json]
+    python benchmarks/pipeline_benchmark.py compare baseline.json results.json [--threshold 0.15]
+
+Every stage runs on synthetic fixtures (benchmarks/fixtures.py) in a temporary
+folder; Milvus is replaced by an in-memory LocalDataManager. `compare` exits
+with code 1 when a stage's median time regressed by more than --threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures  # noqa: E402
+
+# ? name -> (setup(ctx) -> state, run(state) -> rows); setup is untimed and runs before every repetition
+BENCHMARKS = {}
+
+
+class Context:
+    # TODO: Lazily built, shared fixtures for one benchmark run
+    def __init__(self, workdir: str, scale: float = 1.0):
+        self.workdir = workdir
+        self.scale = scale
+        self._cache = {}
+
+    def rows(self, base: int) -> int:
+        return max(1, int(base * self.scale))
+
+    def _get(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def workbooks(self):
+        return self._get(
+            "workbooks",
+            lambda: fixtures.make_workbooks(
+                os.path.join(self.workdir, "raw"), rows=self.rows(300)
+            ),
+        )
+
+    def converted(self):
+        # ? Parsed sheets per workbook, the input of combineAllTCs
+        def build():
+            from dataLoaders.DataLoaderClass import DataLoaderClass
+
+            loader = DataLoaderClass()
+            loader.loadFiles(self.workbooks())
+            with contextlib.redirect_stdout(io.StringIO()):
+                loader.convert2CSV()
+            return loader.convertedCSVFileData
+
+        return self._get("converted", build)
+
+    def combined_csv(self):
+        def build():
+            path = os.path.join(self.workdir, "combined.csv")
+            frames = [
+                fixtures.make_testcases(self.rows(5000), seed=i) for i in range(4)
+            ]
+            import pandas as pd
+
+            combined = pd.concat(frames, ignore_index=True)
+            combined.columns = [
+                c.lower().replace(" ", "") for c in combined.columns
+            ]  # ? Same names convert2CSV produces
+            combined.to_csv(path, index=False)
+            return path
+
+        return self._get("combined_csv", build)
+
+    def texts(self):
+        return self._get(
+            "texts",
+            lambda: fixtures.make_testcases(self.rows(2000), seed=7)["Description"]
+            .str.strip()
+            .tolist(),
+        )
+
+    def embeddings(self, rows):
+        return self._get(
+            ("embeddings", rows), lambda: fixtures.make_embeddings(rows, seed=rows)
+        )
+
+
+# TODO: Excel parse — header probe + full parse of every test case sheet
+def _setup_parse(ctx):
+    from dataLoaders.DataLoaderClass import DataLoaderClass
+
+    return DataLoaderClass(), ctx.workbooks()
+
+
+def _run_parse(state):
+    loader, paths = state
+    loader.loadFiles(paths)
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.convert2CSV()
+    return sum(len(df) for df in loader.convertedCSVFileData.values())
+
+
+BENCHMARKS["excel_parse"] = (_setup_parse, _run_parse)
+
+
+# TODO: Combine — concat the per-workbook frames and write the processed CSV
+def _setup_combine(ctx):
+    from dataLoaders.DataLoaderClass import DataLoaderClass
+
+    loader = DataLoaderClass()
+    loader.convertedCSVFileData = dict(ctx.converted())
+    out = os.path.join(ctx.workdir, "processed")
+    shutil.rmtree(out, ignore_errors=True)
+    return loader, out
+
+
+def _run_combine(state):
+    loader, out = state
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.combineAllTCs(save_folder=out)
+    return len(loader.finalCombinedCSV)
+
+
+BENCHMARKS["combine"] = (_setup_combine, _run_combine)
+
+
+# TODO: Load — parse the combined CSV into a DataFrame
+def _setup_load(ctx):
+    from dataLoaders.CSVLoaderClass import CSVDataLoader
+
+    return CSVDataLoader(ctx.combined_csv())
+
+
+def _run_load(loader):
+    loader.load_csv()
+    return len(loader.df)
+
+
+BENCHMARKS["load_csv"] = (_setup_load, _run_load)
+
+
+# TODO: Clean — drop empty rows and strip strings (fresh copy every repetition)
+def _setup_clean(ctx):
+    loader = _setup_load(ctx)
+    if "clean_source" not in ctx._cache:
+        loader.load_csv()
+        ctx._cache["clean_source"] = loader.df
+    loader.df = ctx._cache["clean_source"].copy()
+    return loader
+
+
+def _run_clean(loader):
+    loader.clean_data()
+    return len(loader.df)
+
+
+BENCHMARKS["clean"] = (_setup_clean, _run_clean)
+
+
+# TODO: Text extraction — the description column as a list of strings
+def _setup_extract(ctx):
+    loader = _setup_clean(ctx)
+    loader.clean_data()
+    return loader
+
+
+def _run_extract(loader):
+    return len(loader.extract_text_column("description"))
+
+
+BENCHMARKS["extract_text"] = (_setup_extract, _run_extract)
+
+
+# TODO: Embedding serialize/deserialize — CSV text format vs binary .npy store
+def _setup_serialize(ctx, fmt):
+    from services.Milvus.EmbeddingDataManager import EmbeddingDataManager
+
+    rows = ctx.rows(5000)
+    texts = (ctx.texts() * (rows // len(ctx.texts()) + 1))[:rows]
+    return (
+        EmbeddingDataManager(None),
+        texts,
+        ctx.embeddings(rows),
+        os.path.join(ctx.workdir, f"embeddings_{fmt}"),
+    )
+
+
+def _run_serialize_csv(state):
+    manager, texts, vectors, base = state
+    manager.save_to_csv(texts, vectors, base + ".csv")
+    descriptions, _ = manager.load_from_csv(base + ".csv")
+    return len(descriptions)
+
+
+def _run_serialize_npy(state):
+    manager, texts, vectors, base = state
+    manager.save_to_npy(texts, vectors, base)
+    descriptions, embeddings, _ = manager.load_from_npy(base, mmap=False)
+    return len(descriptions)
+
+
+BENCHMARKS["serialize_csv"] = (
+    lambda ctx: _setup_serialize(ctx, "csv"),
+    _run_serialize_csv,
+)
+BENCHMARKS["serialize_npy"] = (
+    lambda ctx: _setup_serialize(ctx, "npy"),
+    _run_serialize_npy,
+)
+
+
+# TODO: Encode — real model, cache disabled (skipped when sentence-transformers is missing)
+def _setup_encode(ctx):
+    if "embedder" not in ctx._cache:
+        from services.Milvus.MilvusEmbedder import MilvusEmbedder
+
+        ctx._cache["embedder"] = MilvusEmbedder(cache_dir=None)
+    return ctx._cache["embedder"], ctx.texts()[: ctx.rows(500)]
+
+
+def _run_encode(state):
+    embedder, texts = state
+    return len(embedder.encode(texts, show_progress_bar=False))
+
+
+BENCHMARKS["encode"] = (_setup_encode, _run_encode)
+
+
+# TODO: Insert — batched writes into the in-memory vector store
+def _setup_insert(ctx):
+    from services.Milvus.LocalDataManager import LocalDataManager
+
+    rows = ctx.rows(20000)
+    vectors = ctx.embeddings(rows)
+    meta = {
+        "priority": ["P1", "P2", "P3", "P4"] * (rows // 4 + 1),
+        "functionalarea": [f"Area {i % 12}" for i in range(rows)],
+    }
+    meta = {k: v[:rows] for k, v in meta.items()}
+    store = LocalDataManager("bench", persist_dir=None)
+    return store, list(range(rows)), vectors, ["text"] * rows, meta
+
+
+def _run_insert(state):
+    store, ids, vectors, texts, meta = state
+    store.batch_insert_embeddings(ids, vectors, texts, metadata=meta)
+    return len(ids)
+
+
+BENCHMARKS["insert"] = (_setup_insert, _run_insert)
+
+
+# TODO: Search — top-10 for a batch of queries, unfiltered and filtered
+def _setup_search(ctx, filtered=False):
+    if "search_store" not in ctx._cache:
+        state = _setup_insert(ctx)
+        _run_insert(state)
+        ctx._cache["search_store"] = state[0]
+    queries = fixtures.make_embeddings(ctx.rows(200), seed=99)
+    return (
+        ctx._cache["search_store"],
+        queries,
+        ({"priority": "P1"} if filtered else None),
+    )
+
+
+def _run_search(state):
+    store, queries, filters = state
+    return len(store.search_many(queries, top_k=10, filters=filters))
+
+
+BENCHMARKS["search"] = (_setup_search, _run_search)
+BENCHMARKS["search_filtered"] = (
+    lambda ctx: _setup_search(ctx, filtered=True),
+    _run_search,
+)
+
+
+# TODO: Time one stage: warm-up + `repeat` timed runs, each after a fresh setup
+def run_benchmark(name, ctx, repeat: int = 5) -> dict:
+    setup, run = BENCHMARKS[name]
+    try:
+        run(setup(ctx))  # ? warm-up (imports, fixture generation, page cache)
+    except ImportError as e:
+        return {"skipped": f"missing dependency: {e}"}
+    times, rows = [], 0
+    for _ in range(repeat):
+        state = setup(ctx)
+        started = time.perf_counter()
+        rows = run(state)
+        times.append(time.perf_counter() - started)
+    median = statistics.median(times)
+    return {
+        "rows": rows,
+        "repeat": repeat,
+        "median_s": round(median, 6),
+        "min_s": round(min(times), 6),
+        "max_s": round(max(times), 6),
+        "rows_per_sec": round(rows / median, 1) if median else 0.0,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_run(args):
+    names = args.only or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {unknown} (known: {list(BENCHMARKS)})")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pipeline_bench_") as workdir:
+        ctx = Context(workdir, scale=args.scale)
+        for name in names:
+            results[name] = run_benchmark(name, ctx, repeat=args.repeat)
+            row = results[name]
+            if "skipped" in row:
+                print(f"[SKIP] {name:<16} {row['skipped']}")
+            else:
+                print(
+                    f"[OK  ] {name:<16} {row['median_s'] * 1000:>10.2f} ms "
+                    f"{row['rows_per_sec']:>12.1f} rows/s ({row['rows']} rows)"
+                )
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+        },
+        "benchmarks": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.out}")
+    return 0
+
+
+# TODO: Compare two result files; a stage regresses when its median grew by more than the threshold
+def compare(baseline: dict, current: dict, threshold: float = 0.15) -> list:
+    rows = []
+    for name, base in baseline["benchmarks"].items():
+        cur = current["benchmarks"].get(name)
+        if cur is None or "median_s" not in base or "median_s" not in cur:
+            rows.append((name, None, "missing"))
+            continue
+        change = cur["median_s"] / base["median_s"] - 1 if base["median_s"] else 0.0
+        if change > threshold:
+            status = "REGRESSED"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, change, status))
+    return rows
+
+
+def cmd_compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["meta"].get("scale") != current["meta"].get("scale"):
+        print("Warning: results were recorded at different --scale values.")
+
+    regressed = False
+    for name, change, status in compare(baseline, current, args.threshold):
+        delta = f"{change * 100:+7.1f}%" if change is not None else "    n/a"
+        print(f"{status:<10} {name:<16} {delta}")
+        regressed |= status == "REGRESSED"
+    return 1 if regressed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="Run the benchmarks")
+    p_run.add_argument("--scale", type=float, default=1.0, help="Fixture size factor")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--only", nargs="+", help=f"Subset of {list(BENCHMARKS)}")
+    p_run.add_argument("--out", help="Write results to this JSON file")
+    p_run.set_defaults(func=cmd_run)
+
+    p_cmp = sub.add_parser("compare", help="Flag regressions against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument(
+        "--threshold", type=float, default=0.15, help="Allowed median slowdown"
+    )
+    p_cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Startup-time regression guard for the entry points.
+
+Run from the src folder:
+    python benchmarks/startup_benchmark.py [--repeat 5] [--json out.json]
+
+Each check imports one entry path in a fresh interpreter, records the median
+wall time and fails (exit code 1) if it exceeds its budget or pulls in a heavy
+module that path should never load.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "matplotlib",
+    "seaborn",
+    "tkinter",
+    "pymilvus",
+]
+
+# ? name: (code to run, modules that must NOT be imported, budget in seconds)
+CHECKS = {
+    "mainApp import": ("import mainApp", HEAVY_MODULES + ["pandas"], 0.5),
+    "cli --help": (
+        "import mainApp, contextlib, io\n"
+        "with contextlib.suppress(SystemExit), contextlib.redirect_stdout(io.StringIO()):\n"
+        "    mainApp.main(['--help'])",
+        HEAVY_MODULES + ["pandas"],
+        0.5,
+    ),
+    "search path": (
+        "import mainApp\n"
+        "import services.Milvus.MilvusEmbedder\n"
+        "import services.Milvus.MilvusSearchCLI\n"
+        "import services.Milvus.LocalDataManager",
+        ["torch", "sentence_transformers", "matplotlib", "seaborn", "tkinter"],
+        2.0,
+    ),
+    "inspect path": (
+        "import dataLoaders.CSVDataInspector\nimport dataLoaders.DataLoaderClass",
+        [
+            "torch",
+            "sentence_transformers",
+            "matplotlib",
+            "seaborn",
+            "tkinter",
+            "pymilvus",
+        ],
+        2.0,
+    ),
+}
+
+
+# TODO: Run one check in a fresh interpreter; returns (seconds, forbidden modules that got imported)
+def run_once(code: str, forbidden: list):
+    probe = (
+        f"{code}\nimport sys, json\n"
+        f"print(json.dumps([m for m in {forbidden!r} if m in sys.modules]))"
+    )
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", probe], cwd=SRC_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"Check failed to run:\n{proc.stderr}")
+    return elapsed, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget (slow CI)",
+    )
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args(argv)
+
+    results, failed = {}, False
+    for name, (code, forbidden, budget) in CHECKS.items():
+        timings, leaked = [], set()
+        for _ in range(args.repeat):
+            elapsed, loaded = run_once(code, forbidden)
+            timings.append(elapsed)
+            leaked.update(loaded)
+        median = statistics.median(timings)
+        budget *= args.budget_scale
+        ok = median <= budget and not leaked
+        failed |= not ok
+        results[name] = {
+            "median_s": round(median, 4),
+            "budget_s": budget,
+            "leaked_modules": sorted(leaked),
+            "ok": ok,
+        }
+        status = "OK  " if ok else "FAIL"
+        extra = f" leaked: {sorted(leaked)}" if leaked else ""
+        print(
+            f"[{status}] {name:<16} {median * 1000:8.1f} ms (budget {budget * 1000:.0f} ms){extra}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,158 @@
 import os
 
-import matplotlib.pyplot as plt  # For plotting clean bar charts of categorical data
+import numpy as np
 import pandas as pd
-import seaborn as sns
+
+# ? Above this many rows the profile switches to sketches and sampling unless told otherwise
+APPROXIMATE_ROWS = 1_000_000
+
+
+# TODO: K-minimum-values sketch of the number of distinct values (one vectorized hash pass)
+def approx_distinct(series: pd.Series, k: int = 1024) -> int:
+    values = series.dropna()
+    if values.empty:
+        return 0
+    hashes = pd.util.hash_pandas_object(
+        values, index=False, categorize=False
+    ).to_numpy()
+    # ? Only the smallest hashes matter: partition, then dedupe that small slice (no full sort)
+    window = min(len(hashes), 8 * k)
+    smallest = np.unique(np.partition(hashes, window - 1)[:window])
+    if len(smallest) < k:
+        if window == len(hashes):
+            return len(smallest)
+        smallest = np.unique(
+            hashes
+        )  # ? Heavily repeated values: fall back to an exact pass
+        if len(smallest) < k:
+            return len(smallest)
+    kth = smallest[k - 1]
+    # ? The k-th smallest of n uniform 64-bit hashes sits near k/n of the hash range
+    return int(round((k - 1) / (float(kth) / 2.0**64)))
+
+
+class ProfileReport:
+    # TODO: Structured result of CSVDataInspector.profile (one entry per column)
+    def __init__(self, rows: int, columns: dict, approximate: bool, sample_rows: int):
+        """
+        columns: {name: {dtype, non_null, missing, missing_pct, distinct, top, numeric?}}
+        approximate: Distinct counts are sketches and top values come from a sample of sample_rows
+        """
+        self.rows = rows
+        self.columns = columns
+        self.approximate = approximate
+        self.sample_rows = sample_rows
+
+    @property
+    def shape(self) -> tuple:
+        return self.rows, len(self.columns)
+
+    def missing(self) -> pd.DataFrame:
+        df = pd.DataFrame(
+            {
+                "Missing Count": {c: s["missing"] for c, s in self.columns.items()},
+                "Missing %": {c: s["missing_pct"] for c, s in self.columns.items()},
+            }
+        ).sort_values("Missing Count", ascending=False)
+        return df[df["Missing Count"] > 0]
+
+    def numeric(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {c: s["numeric"] for c, s in self.columns.items() if "numeric" in s}
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "approximate": self.approximate,
+            "sample_rows": self.sample_rows,
+            "columns": self.columns,
+        }
 
 
 # TODO: Inspect and summarize CSV data
 class CSVDataInspector:
     # TODO: Initialize with a CSV file path or a pandas DataFrame
-    def __init__(self, data):
+    def __init__(self, data, copy: bool = True):
         """
         Args: data (str or pd.DataFrame): Path to CSV file or a DataFrame.
+              copy (bool): Deep-copy a given DataFrame; False inspects it in place (read-only use).
         """
         if isinstance(data, str):
             if not os.path.exists(data):
                 raise FileNotFoundError(f"CSV file not found: {data}")
             self.df = pd.read_csv(data)
         elif isinstance(data, pd.DataFrame):
-            self.df = data.copy()
+            self.df = data.copy() if copy else data
         else:
             raise ValueError("Input must be a file path or a pandas DataFrame.")
+        self.report = None
+
+    # TODO: Compute every statistic in one pass over the columns; returns a ProfileReport
+    def profile(
+        self,
+        top_n: int = 5,
+        approximate: bool = None,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ) -> ProfileReport:
+        """
+        approximate: Sketch distinct counts and sample top-N (default: only above APPROXIMATE_ROWS rows)
+        sample_size: Rows sampled for the approximate top-N counts
+        """
+        rows = len(self.df)
+        if approximate is None:
+            approximate = rows > APPROXIMATE_ROWS
+        sample = (
+            self.df.sample(n=sample_size, random_state=seed)
+            if approximate and rows > sample_size
+            else self.df
+        )
+        scale = rows / len(sample) if len(sample) else 1.0
+
+        columns = {}
+        for col in self.df.columns:
+            series = self.df[col]
+            non_null = int(series.count())
+            stats = {
+                "dtype": str(series.dtype),
+                "non_null": non_null,
+                "missing": rows - non_null,
+                "missing_pct": (
+                    round((rows - non_null) / rows * 100, 2) if rows else 0.0
+                ),
+            }
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(
+                series
+            ):
+                described = series.describe()
+                stats["numeric"] = {k: float(v) for k, v in described.items()}
+            elif approximate:
+                counts = sample[col].value_counts(dropna=False)
+                # ? No value seen only once in the sample (Good-Turing): the sample saw every
+                #   category, so only high-cardinality columns pay for the full-column sketch
+                if len(sample) < rows and (counts > 1).all():
+                    stats["distinct"] = int(len(counts) - counts.index.isna().sum())
+                else:
+                    stats["distinct"] = approx_distinct(series)
+                counts = counts.head(top_n)
+            else:
+                # ? One hash pass yields both the distinct count and the top values
+                counts = series.value_counts(dropna=False)
+                stats["distinct"] = int(len(counts) - counts.index.isna().sum())
+                counts = counts.head(top_n)
+            if "numeric" not in stats:
+                stats["top"] = [
+                    [None if pd.isna(value) else str(value), int(round(count * scale))]
+                    for value, count in counts.items()
+                ]
+            columns[str(col)] = stats
+
+        self.report = ProfileReport(rows, columns, approximate, len(sample))
+        return self.report
+
+    def _get_report(self) -> ProfileReport:
+        return self.report if self.report is not None else self.profile()
 
     # TODO: Provide a summary of the DataFrame
     def overview(self):
@@ -32,44 +165,70 @@ class CSVDataInspector:
     def info(self):
         print("\n🧠 Data Types & Non-null Info")
         print("-" * 40)
-        print(self.df.info())
+        report = self._get_report()
+        print(
+            pd.DataFrame(
+                {
+                    "Dtype": {c: s["dtype"] for c, s in report.columns.items()},
+                    "Non-Null Count": {
+                        c: s["non_null"] for c, s in report.columns.items()
+                    },
+                }
+            )
+        )
+        print(f"Memory usage: {self.df.memory_usage(deep=False).sum() / 2**20:.2f} MB")
 
     # TODO: Show descriptive statistics for numeric columns
     def describe(self):
         print("\n📈 Descriptive Statistics")
         print("-" * 40)
-        print(self.df.describe())
+        numeric = self._get_report().numeric()
+        print(numeric if not numeric.empty else "No numeric columns.")
 
     # TODO: Count and percentage of missing values per column
     def missing_values(self):
         print("\n❗ Missing Values")
         print("-" * 40)
-        null_counts = self.df.isnull().sum()
-        null_perc = (null_counts / len(self.df)) * 100
-        missing_df = pd.DataFrame(
-            {"Missing Count": null_counts, "Missing %": null_perc}
-        ).sort_values("Missing Count", ascending=False)
-        print(missing_df[missing_df["Missing Count"] > 0])
+        print(self._get_report().missing())
 
     # TODO: Show top N unique values per categorical column
     def unique_counts(self, top_n=5):
-        print("\n🔢 Unique Value Counts (Top categories)")
+        report = self._get_report()
+        label = " (approximate)" if report.approximate else ""
+        print(f"\n🔢 Unique Value Counts (Top categories){label}")
         print("-" * 40)
-        for col in self.df.select_dtypes(include="object").columns:
-            print(f"\nColumn: {col}")
-            print(self.df[col].value_counts(dropna=False).head(top_n))
+        for col, stats in report.columns.items():
+            if "top" not in stats:
+                continue
+            print(f"\nColumn: {col} ({stats['distinct']} distinct)")
+            for value, count in stats["top"][:top_n]:
+                print(f"  {str(value)[:60]!s:<62} {count}")
 
-    # TODO: Run all reports in sequence
-    def run_full_report(self):
+    # TODO: Run all reports from a single profiling pass
+    def run_full_report(self, top_n=5, approximate=None) -> ProfileReport:
+        self.profile(top_n=top_n, approximate=approximate)
         self.overview()
         self.info()
         self.describe()
         self.missing_values()
-        self.unique_counts()
+        self.unique_counts(top_n)
+        return self.report
 
     # TODO: Plot distributions of specified categorical columns side-by-side in one figure.
-    def plot_specific_categorical_distributions(self, columns=None):
-        """Args: columns (list): List of column names to plot."""
+    def plot_specific_categorical_distributions(self, columns=None, output_path=None):
+        """
+        Args: columns (list): List of column names to plot.
+              output_path (str): Save the figure here instead of opening a window (headless, non-blocking).
+        Returns: str: The saved file path, or None when shown interactively.
+        """
+        # ? Plotting libraries are slow to import; load them only when a plot is requested
+        import matplotlib
+
+        if output_path:
+            matplotlib.use("Agg")  # ? File-only backend: no window, never blocks
+        import matplotlib.pyplot as plt  # For plotting clean bar charts of categorical data
+        import seaborn as sns
+
         n = len(columns)
         fig, axes = plt.subplots(1, n, figsize=(10 * n, 10))
         if n == 1:
@@ -84,7 +243,7 @@ class CSVDataInspector:
 
             value_counts = self.df[col].value_counts(dropna=False)
             sns.barplot(
-                x=value_counts.index,
+                x=value_counts.index.astype(str),
                 y=value_counts.values,
                 palette="muted",
                 edgecolor="black",
@@ -109,4 +268,11 @@ class CSVDataInspector:
             ax.grid(axis="y", linestyle="--", alpha=0.3)
 
         plt.tight_layout()
+        if output_path:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            fig.savefig(output_path, dpi=100)
+            plt.close(fig)
+            print(f"Plot saved at: {os.path.abspath(output_path)}")
+            return output_path
         plt.show()
+        return None
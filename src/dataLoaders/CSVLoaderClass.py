@@ -1,8 +1,95 @@
 import logging  # Logs status/errors instead of printing
 import os
+import time
 
 import pandas as pd
 
+# ? Known low-cardinality columns of the combined test case CSV, read straight into categoricals
+DEFAULT_DTYPES = {
+    "priority": "category",
+    "functionalarea": "category",
+    "status": "category",
+    "sourcefile": "category",
+    "release": "category",
+}
+
+
+# TODO: Deep memory usage of a DataFrame in MB (object/str columns included)
+def memory_mb(df: pd.DataFrame) -> float:
+    return round(df.memory_usage(deep=True).sum() / 2**20, 2)
+
+
+# TODO: Trim leading/trailing whitespace of every text column without a per-cell Python call
+def strip_strings(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if not pd.api.types.is_string_dtype(categories):
+                continue
+            stripped = categories.str.strip()
+            if stripped.is_unique:
+                # ? Only the (few) categories are stripped, not every row
+                df[col] = series.cat.rename_categories(stripped)
+            else:
+                # ? " P1" and "P1" collapse into one category
+                df[col] = series.astype(object).str.strip().astype("category")
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(
+            series
+        ):
+            stripped = series.str.strip()
+            # ? .str yields NaN for non-string cells (e.g. ints in object columns); keep those as-is
+            df[col] = stripped.where(stripped.notna() | series.isna(), series)
+    return df
+
+
+# TODO: Convert text columns with few distinct values to categoricals
+def categorize(
+    df: pd.DataFrame,
+    max_unique_ratio: float = 0.5,
+    max_categories: int = 1000,
+    exclude: tuple = ("description",),
+) -> pd.DataFrame:
+    """
+    max_unique_ratio: Distinct/non-null values above this ratio keep the column as text
+    max_categories: Columns with more distinct values keep the column as text
+    exclude: Free-text columns that are never converted
+    """
+    for col in df.columns:
+        series = df[col]
+        if col in exclude or not (
+            pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+        ):
+            continue
+        non_null = series.count()
+        if non_null == 0:
+            continue
+        unique = series.nunique(dropna=True)
+        if unique <= max_categories and unique / non_null <= max_unique_ratio:
+            df[col] = series.astype("category")
+    return df
+
+
+# TODO: Concatenate chunks whose categoricals have different categories without falling back to object
+def concat_chunks(frames: list) -> pd.DataFrame:
+    if not frames:
+        return pd.DataFrame()
+    categorical = [
+        col
+        for col in frames[0].columns
+        if all(
+            col in f.columns and isinstance(f[col].dtype, pd.CategoricalDtype)
+            for f in frames
+        )
+    ]
+    for col in categorical:
+        union = pd.api.types.union_categoricals(
+            [f[col] for f in frames], ignore_order=True
+        ).categories
+        for f in frames:
+            f[col] = f[col].cat.set_categories(union)
+    return pd.concat(frames, ignore_index=True)
+
 
 class CSVDataLoader:
     # TODO: Initialize with the full path of the CSV file
@@ -15,30 +102,86 @@ class CSVDataLoader:
 
         logging.info(f"CSVDataLoader initialized with file: {filepath}")
 
+    # TODO: Wrap an in-memory frame (e.g. DataLoaderClass.finalCombinedCSV) — no file round trip
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, source: str = "<memory>"):
+        """
+        The loader takes ownership: clean_data() modifies the frame in place.
+        """
+        loader = cls.__new__(cls)
+        loader.filepath = source
+        loader.df = df
+        logging.info(f"CSVDataLoader initialized with in-memory frame: {df.shape}")
+        return loader
+
+    # TODO: Explicit dtypes for the columns present in the file (header-only read)
+    def _dtype_map(self, dtypes: dict = None) -> dict:
+        dtypes = DEFAULT_DTYPES if dtypes is None else dtypes
+        header = pd.read_csv(self.filepath, nrows=0).columns
+        return {col: dtype for col, dtype in dtypes.items() if col in header}
+
     # TODO: Load CSV into a pandas DataFrame
-    def load_csv(self):
+    def load_csv(
+        self, engine: str = "pyarrow", dtypes: dict = None, chunksize: int = None
+    ):
+        """
+        engine: "pyarrow" (multi-threaded parser) or "c" (pandas default); pyarrow falls back to "c"
+        dtypes: {column: dtype} applied where the column exists (defaults to DEFAULT_DTYPES)
+        chunksize: Rows per chunk; each chunk is cleaned and categorized before the next is read,
+                   so the raw text of the whole file is never held at once
+        """
+        started = time.perf_counter()
         try:
-            self.df = pd.read_csv(self.filepath)
-            logging.info(f"CSV loaded successfully with shape: {self.df.shape}")
+            dtype_map = self._dtype_map(dtypes)
+            if chunksize:
+                self.df = concat_chunks(list(self.iter_chunks(chunksize, dtypes)))
+            else:
+                try:
+                    self.df = pd.read_csv(self.filepath, engine=engine, dtype=dtype_map)
+                except (ImportError, ValueError) as e:
+                    if engine == "c":
+                        raise
+                    logging.warning(f"{engine} CSV engine failed ({e}); using 'c'.")
+                    self.df = pd.read_csv(self.filepath, dtype=dtype_map)
+            logging.info(
+                f"CSV loaded successfully with shape: {self.df.shape} "
+                f"in {time.perf_counter() - started:.3f}s ({memory_mb(self.df)} MB)"
+            )
         except Exception as e:
             logging.error(f"Failed to load CSV: {e}")
             raise
 
+    # TODO: Stream the CSV as cleaned, typed chunks (for combined files too large to hold comfortably)
+    def iter_chunks(self, chunksize: int = 50_000, dtypes: dict = None):
+        dtype_map = self._dtype_map(dtypes)
+        # ? The pyarrow engine cannot stream, so chunks come from the C parser
+        for chunk in pd.read_csv(self.filepath, dtype=dtype_map, chunksize=chunksize):
+            chunk.dropna(how="all", inplace=True)
+            yield categorize(strip_strings(chunk))
+
     # TODO: Clean data — drop empty rows, trim strings, etc.
-    def clean_data(self):
+    def clean_data(self, categorize_columns: bool = True):
+        """
+        categorize_columns: Convert low-cardinality text columns to categoricals afterwards
+        """
         if self.df is None:
             raise ValueError("Data not loaded. Call `load_csv()` first.")
 
+        started = time.perf_counter()
+        before = memory_mb(self.df)
+
         # Drop rows where all elements are NaN
         self.df.dropna(how="all", inplace=True)
 
         # Strip leading/trailing spaces from string columns only
-        for col in self.df.select_dtypes(include=["object"]).columns:
-            self.df[col] = self.df[col].map(
-                lambda x: x.strip() if isinstance(x, str) else x
-            )
+        strip_strings(self.df)
+        if categorize_columns:
+            categorize(self.df)
 
-        logging.info("Data cleaned: NaNs dropped, strings stripped.")
+        logging.info(
+            f"Data cleaned: NaNs dropped, strings stripped in "
+            f"{time.perf_counter() - started:.3f}s (memory {before} MB -> {memory_mb(self.df)} MB)."
+        )
 
     # TODO: Extract specific text columns (like 'description' for embedding)
     def extract_text_column(self, column_name: str) -> list:
@@ -55,6 +198,15 @@ class CSVDataLoader:
         )
         return texts
 
+    # TODO: Per-column dtype and deep memory usage (MB), largest first
+    def memory_report(self) -> pd.DataFrame:
+        if self.df is None:
+            raise ValueError("Data not loaded. Call `load_csv()` first.")
+        usage = self.df.memory_usage(deep=True, index=False) / 2**20
+        return pd.DataFrame(
+            {"dtype": self.df.dtypes.astype(str), "memory_mb": usage.round(3)}
+        ).sort_values("memory_mb", ascending=False)
+
     # TODO: (Optional) Return the whole DataFrame for inspection
     def get_dataframe(self):
         return self.df
@@ -1,54 +1,259 @@
+import glob  # Batch mode: discover workbooks in data/raw
 import os  # For path handling and folder creation
-from tkinter import Tk  # Provides the GUI to open a file dialog
-from tkinter.filedialog import askopenfilenames
+import time
+from concurrent.futures import ProcessPoolExecutor  # Parallel sheet parsing
 
 import pandas as pd  # Used for reading and manipulating Excel files.
 
+from dataLoaders.ProcessedDataset import ProcessedDataset
+from dataLoaders.WorkbookCache import WorkbookCache
 from services.HelperClass import HelperClass  # User Defined Class
 
 helper = HelperClass()
 
 
+# TODO: Reads only the header row of a sheet (no data rows are materialized).
+def _probeHeader(xl, sheet_name) -> list:
+    return list(xl.parse(sheet_name, nrows=0).columns)
+
+
+# TODO: Fully parses one qualifying sheet and normalizes its columns (module-level so worker processes can pickle it).
+def _parseSheet(task, xl=None):
+    """
+    Args: task (tuple): (workbook path, sheet name).
+          xl (pd.ExcelFile): Already-open workbook; worker processes open their own.
+    Returns: pd.DataFrame: Sheet with cleaned column names and a 'sourcefile' column.
+    """
+    fname, sheet_name = task
+    if xl is None:
+        xl = pd.ExcelFile(fname)
+    df = xl.parse(sheet_name)
+    df.columns = [helper.cleanColumnName(str(col)) for col in df.columns]
+    # ? Source workbook is part of the stable test case key used for delta ingestion
+    df["sourcefile"] = os.path.basename(fname)
+    return df
+
+
+# TODO: Normalized column names of a raw header row, matching what _parseSheet produces.
+def _sheetColumns(header) -> list:
+    """
+    Args: header (tuple): Cell values of the first row (blank cells become "Unnamed: <i>" like pandas).
+    Returns: list: Cleaned names; repeats get a numeric suffix ("priority", "priority1").
+    """
+    header = list(header)
+    while header and header[-1] is None:
+        header.pop()
+    columns, seen = [], {}
+    for i, cell in enumerate(header):
+        name = helper.cleanColumnName(f"Unnamed: {i}" if cell is None else str(cell))
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        columns.append(name if count == 0 else f"{name}{count}")
+    return columns
+
+
+# TODO: Normalized columns of every sheet with a TCID column, reading only each sheet's first row.
+def _probeWorkbook(fname) -> dict:
+    """
+    Returns: dict: {sheet name: normalized columns} in workbook order.
+    """
+    if not fname.lower().endswith((".xlsx", ".xlsm")):
+        # ? openpyxl cannot read legacy .xls; pandas (xlrd) parses those instead
+        xl = pd.ExcelFile(fname)
+        headers = {name: _probeHeader(xl, name) for name in xl.sheet_names}
+    else:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(fname, read_only=True, data_only=True)
+        try:
+            headers = {
+                ws.title: next(ws.iter_rows(max_row=1, values_only=True), ())
+                for ws in wb.worksheets
+            }
+        finally:
+            wb.close()
+    return {
+        name: _sheetColumns(header)
+        for name, header in headers.items()
+        if helper.isTCIDPresent([str(cell) for cell in header if cell is not None])
+    }
+
+
+# TODO: Streams the given sheets of one workbook as DataFrame chunks of at most chunk_rows rows.
+def _iterWorkbookChunks(fname, sheets: dict, chunk_rows: int = 5000):
+    """
+    Args: sheets (dict): {sheet name: normalized columns} from _probeWorkbook.
+    Yields: pd.DataFrame: Raw cell values under the normalized columns plus 'sourcefile'.
+    Only one chunk of rows is alive at a time (read-only openpyxl parses the sheet XML lazily).
+    Completely blank rows are skipped.
+    """
+    source = os.path.basename(fname)
+    if not fname.lower().endswith((".xlsx", ".xlsm")):
+        # ? No row iterator for .xls: parse the whole sheet, then hand it out in slices
+        xl = pd.ExcelFile(fname)
+        for sheet_name in sheets:
+            df = _parseSheet((fname, sheet_name), xl)
+            df = df.dropna(how="all", subset=df.columns.drop("sourcefile"))
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start : start + chunk_rows]
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fname, read_only=True, data_only=True)
+    try:
+        for sheet_name, columns in sheets.items():
+            width = len(columns)
+            rows = wb[sheet_name].iter_rows(min_row=2, values_only=True)
+            buffer = []
+            for row in rows:
+                row = list(row[:width])
+                if all(cell is None for cell in row):
+                    continue
+                buffer.append(row + [None] * (width - len(row)))
+                if len(buffer) >= chunk_rows:
+                    yield pd.DataFrame(buffer, columns=columns).assign(
+                        sourcefile=source
+                    )
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns).assign(sourcefile=source)
+    finally:
+        wb.close()
+
+
 class DataLoaderClass:
-    def __init__(self):
+    def __init__(self, cache: WorkbookCache = None):
         self.excelFiles = []  # List of selected Excel files
         self.excelFilesData = {}  # Dict of ExcelFile objects keyed by filename
         self.convertedCSVFileData = {}  # Dict of CSV dataframes keyed by CSV filename
         self.finalCombinedCSV = None  # Final combined dataframe
+        self.finalSnapshotPath = None  # Snapshot written by streamAllTCs
+        self.finalSnapshotRows = 0  # Rows streamed into that snapshot
+        self.cache = cache  # Optional WorkbookCache for parsed workbooks
 
     # TODO: Uploads Excel files and loads them into pandas ExcelFile objects.
-    def uploadFiles(self):
+    def uploadFiles(self, open_files: bool = True):
+        """
+        Args: open_files (bool): False only records the selection (streamAllTCs opens files itself).
+        """
+        # ? tkinter is only needed for the dialog; imported here so batch mode stays GUI-free
+        from tkinter import Tk  # Provides the GUI to open a file dialog
+        from tkinter.filedialog import askopenfilenames
+
         Tk().withdraw()  # Hide the main Tkinter window
         filepaths = askopenfilenames(
             title="Select Excel Test Plan Files",
             filetypes=[("Excel files", "*.xls *.xlsx")],
         )
+        self.loadFiles(filepaths, open_files=open_files)
+
+        if not self.excelFiles:
+            print("No Excel files were selected.")
+
+    # TODO: Loads the given Excel files without any dialog; cached workbooks skip openpyxl entirely.
+    def loadFiles(self, filepaths, open_files: bool = True):
         self.excelFiles = list(filepaths)
+        if not open_files:
+            return
 
         for fname in self.excelFiles:
+            if self.cache is not None:
+                cached = self.cache.get(fname)
+                if cached is not None:
+                    self.convertedCSVFileData[fname] = cached
+                    continue
             try:
                 self.excelFilesData[fname] = pd.ExcelFile(fname)
             except Exception as e:
                 print(f"Failed to load {fname}: {e}")
 
-        if not self.excelFiles:
-            print("No Excel files were selected.")
+    # TODO: Lists Excel files in a folder (batch mode), optionally only new/modified ones.
+    def listRawFiles(self, raw_folder: str = "../data/raw", only_changed: bool = False):
+        filepaths = sorted(
+            glob.glob(os.path.join(raw_folder, "*.xlsx"))
+            + glob.glob(os.path.join(raw_folder, "*.xls"))
+        )
+        # ? Skip Excel lock files ("~$name.xlsx") left behind by open workbooks
+        filepaths = [f for f in filepaths if not os.path.basename(f).startswith("~$")]
+        if only_changed and self.cache is not None:
+            filepaths = [f for f in filepaths if self.cache.isStale(f)]
+        return filepaths
+
+    # TODO: Polls a folder and re-runs load/convert/combine whenever a workbook is added or modified.
+    def watchRawFolder(
+        self,
+        raw_folder: str = "../data/raw",
+        interval: float = 5.0,
+        on_change=None,
+        parallel: bool = False,
+        keep=None,
+    ):
+        """
+        Args: raw_folder (str): Folder to watch.
+              interval (float): Seconds between polls.
+              on_change (callable): Called with the combined DataFrame after each refresh.
+              parallel (bool): Parse changed sheets in a process pool (see convert2CSV).
+              keep (int): Snapshots retained in data/processed (see combineAllTCs).
+        """
+        if self.cache is None:
+            raise ValueError("watchRawFolder needs a WorkbookCache to detect changes.")
+
+        known = {}
+        print(f"Watching {os.path.abspath(raw_folder)} (Ctrl+C to stop)...")
+        try:
+            while True:
+                current = {
+                    f: os.stat(f).st_mtime for f in self.listRawFiles(raw_folder)
+                }
+                if current != known:
+                    changed = self.listRawFiles(raw_folder, only_changed=True)
+                    print(f"Detected {len(changed)} new/modified workbook(s).")
+                    self.excelFilesData = {}
+                    self.convertedCSVFileData = {}
+                    self.finalCombinedCSV = None
+                    # ? Unchanged workbooks come straight from the cache; only `changed` get parsed
+                    self.loadFiles(list(current))
+                    self.convert2CSV(parallel=parallel)
+                    self.combineAllTCs(keep=keep)
+                    known = current
+                    if on_change is not None and self.finalCombinedCSV is not None:
+                        on_change(self.finalCombinedCSV)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
 
     # TODO: Converts sheets containing test case ID columns into cleaned CSV files.
-    def convert2CSV(self):
+    def convert2CSV(self, parallel: bool = False, max_workers: int = None):
+        """
+        Args: parallel (bool): Parse qualifying sheets in a process pool across cores.
+              max_workers (int): Pool size (defaults to the CPU count).
+        """
+        # ? Header-only probe: only sheets whose first row has a TCID column get fully parsed
+        tasks = []
         for fname, xl in self.excelFilesData.items():
-            combined_df_list = []
             for sheet_name in xl.sheet_names:
-                df = xl.parse(sheet_name)
-                if helper.isTCIDPresent(df.columns):
-                    cleaned_columns = [
-                        helper.cleanColumnName(col) for col in df.columns
-                    ]
-                    df.columns = cleaned_columns
-                    combined_df_list.append(df)
+                if helper.isTCIDPresent(_probeHeader(xl, sheet_name)):
+                    tasks.append((fname, sheet_name))
+
+        if parallel and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                # ? map() yields in submission order, so output stays deterministic
+                parsed = list(pool.map(_parseSheet, tasks))
+        else:
+            parsed = [_parseSheet(task, self.excelFilesData[task[0]]) for task in tasks]
+
+        sheetsByFile = {fname: [] for fname in self.excelFilesData}
+        for (fname, _), df in zip(tasks, parsed):
+            sheetsByFile[fname].append(df)
 
+        for fname, combined_df_list in sheetsByFile.items():
             if combined_df_list:
                 combined_df = pd.concat(combined_df_list, ignore_index=True)
+                if self.cache is not None:
+                    self.cache.put(fname, combined_df)
+                    # ? Same normalization as a cache hit, so both paths yield identical frames
+                    combined_df = WorkbookCache.normalizeForStorage(combined_df)
                 # No intermediate CSV saving here
                 self.convertedCSVFileData[fname] = (
                     combined_df  # Use original Excel filename as key
@@ -57,22 +262,83 @@ class DataLoaderClass:
             else:
                 print(f"No sheets with valid test case ID columns found in {fname}")
 
-    # TODO: Combines all converted CSV dataframes into one final dataframe.
-    def combineAllTCs(self, save_folder: str = "../data/processed"):
+        # ? Cached workbooks were added during loadFiles; restore the selection order
+        self.convertedCSVFileData = {
+            fname: self.convertedCSVFileData[fname]
+            for fname in self.excelFiles
+            if fname in self.convertedCSVFileData
+        }
+
+    # TODO: Combines all converted CSV dataframes into one final dataframe and snapshots it.
+    def combineAllTCs(
+        self, save_folder: str = "../data/processed", fmt: str = "parquet", keep=None
+    ):
+        """
+        Args: fmt (str): Snapshot format, "parquet" (default) or "csv"; None skips the snapshot.
+              keep (int): Snapshots retained in save_folder (None keeps all).
+        """
         combinedDF_list = list(self.convertedCSVFileData.values())
         if combinedDF_list:
             combinedDF = pd.concat(combinedDF_list, ignore_index=True)
-            self.finalCombinedCSV = combinedDF
-            os.makedirs(save_folder, exist_ok=True)
-            timestamp = helper.get_timestamp()
-            filename = f"combined_testcases_{timestamp}.csv"
-            save_path = os.path.join(save_folder, filename)
+            # ? Same normalization the Parquet snapshot gets, so the in-memory handoff matches a reload
+            self.finalCombinedCSV = WorkbookCache.normalizeForStorage(combinedDF)
+            if fmt is None:
+                return
 
             try:
-                combinedDF.to_csv(save_path, index=False)
+                save_path = ProcessedDataset(save_folder, keep=keep).save(
+                    self.finalCombinedCSV, fmt=fmt
+                )
                 full_path = os.path.abspath(save_path)  # Get absolute path
-                print(f"Final combined CSV saved at: {full_path}")
+                print(f"Final combined dataset saved at: {full_path}")
             except Exception as e:
-                print(f"Error saving final combined CSV: {e}")
+                print(f"Error saving final combined dataset: {e}")
         else:
             print("No converted CSV data to combine.")
+
+    # TODO: Streams every qualifying sheet straight into a new processed snapshot, chunk by chunk.
+    def streamAllTCs(
+        self,
+        save_folder: str = "../data/processed",
+        chunk_rows: int = 5000,
+        fmt: str = "parquet",
+        keep=None,
+    ):
+        """
+        Bounded-memory alternative to convert2CSV + combineAllTCs: no ExcelFile, per-workbook
+        frame or combined frame is kept, so peak memory follows chunk_rows, not the workbooks.
+        Args: chunk_rows (int): Rows per chunk written to the snapshot.
+        Returns: str: Snapshot path (every column stored as text), or None if no sheet has a TCID column.
+        """
+        workbooks = {}
+        columns = {}
+        for fname in self.excelFiles:
+            try:
+                sheets = _probeWorkbook(fname)
+            except Exception as e:
+                print(f"Failed to load {fname}: {e}")
+                continue
+            if not sheets:
+                print(f"No sheets with valid test case ID columns found in {fname}")
+                continue
+            workbooks[fname] = sheets
+            # ? Same first-seen column order pd.concat gives the in-memory path
+            for sheet_columns in sheets.values():
+                columns.update(dict.fromkeys(sheet_columns + ["sourcefile"]))
+
+        if not workbooks:
+            print("No converted CSV data to combine.")
+            return None
+
+        dataset = ProcessedDataset(save_folder, keep=keep)
+        with dataset.open_writer(list(columns), fmt=fmt) as writer:
+            for fname, sheets in workbooks.items():
+                for chunk in _iterWorkbookChunks(fname, sheets, chunk_rows):
+                    writer.write(chunk)
+                print(f"Streamed data for: {fname}")
+        self.finalSnapshotPath = writer.path
+        self.finalSnapshotRows = writer.rows
+        print(
+            f"Final combined dataset saved at: {os.path.abspath(writer.path)} ({writer.rows} rows)"
+        )
+        return writer.path
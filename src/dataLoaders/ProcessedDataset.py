@@ -0,0 +1,221 @@
+import glob
+import json
+import logging
+import os
+
+import pandas as pd
+
+from dataLoaders.WorkbookCache import WorkbookCache
+from services.HelperClass import HelperClass
+
+helper = HelperClass()
+
+
+class ProcessedDataset:
+    # TODO: Versioned Parquet snapshots of the combined test cases, tracked by a manifest
+    def __init__(self, folder: str = "../data/processed", keep: int = None):
+        """
+        Args: folder (str): Holds combined_testcases_<timestamp>.parquet files and manifest.json.
+              keep (int): Snapshots to retain after each save (None keeps everything).
+        """
+        self.folder = folder
+        self.keep = keep
+        self.manifest_path = os.path.join(folder, "manifest.json")
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {"latest": None, "versions": []}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Processed dataset manifest unreadable, rebuilding: {e}")
+            return {"latest": None, "versions": []}
+
+    def _save_manifest(self, manifest: dict):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    # TODO: Write a new snapshot, record it as latest and apply retention; returns its path
+    def save(self, df: pd.DataFrame, fmt: str = "parquet") -> str:
+        """
+        Args: fmt (str): "parquet" (typed, columnar) or "csv" (legacy text export).
+        """
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Unknown processed dataset format '{fmt}'.")
+        os.makedirs(self.folder, exist_ok=True)
+        filename = f"combined_testcases_{helper.get_timestamp()}.{fmt}"
+        path = os.path.join(self.folder, filename)
+
+        tmp_path = f"{path}.tmp"
+        if fmt == "parquet":
+            WorkbookCache.normalizeForStorage(df).to_parquet(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        self._record(
+            filename, len(df), {col: str(dtype) for col, dtype in df.dtypes.items()}
+        )
+        return path
+
+    # TODO: Record a finished snapshot file as the latest version and apply retention
+    def _record(self, filename: str, rows: int, columns: dict):
+        manifest = self._load_manifest()
+        manifest["versions"] = [
+            v for v in manifest["versions"] if v["file"] != filename
+        ] + [
+            {
+                "file": filename,
+                "rows": int(rows),
+                "columns": columns,
+                "created": helper.get_timestamp("%Y-%m-%dT%H:%M:%S"),
+            }
+        ]
+        manifest["latest"] = filename
+        self._save_manifest(manifest)
+        logging.info(
+            f"Processed dataset saved: {os.path.join(self.folder, filename)} ({rows} rows)"
+        )
+
+        if self.keep:
+            self.prune(self.keep)
+
+    # TODO: Start a snapshot that is written chunk by chunk (see SnapshotWriter)
+    def open_writer(self, columns: list, fmt: str = "parquet"):
+        return SnapshotWriter(self, columns, fmt=fmt)
+
+    # TODO: Path of the newest snapshot (manifest first, then legacy CSVs by name); None if empty
+    def latest_path(self):
+        latest = self._load_manifest().get("latest")
+        if latest and os.path.exists(os.path.join(self.folder, latest)):
+            return os.path.join(self.folder, latest)
+        files = sorted(
+            glob.glob(os.path.join(self.folder, "combined_testcases_*.parquet"))
+            + glob.glob(os.path.join(self.folder, "combined_testcases_*.csv")),
+            key=os.path.basename,
+        )
+        return files[-1] if files else None
+
+    # TODO: Read a snapshot (latest by default) into a DataFrame
+    def load(self, path: str = None) -> pd.DataFrame:
+        path = path or self.latest_path()
+        if path is None:
+            raise FileNotFoundError(f"No processed dataset found in {self.folder}")
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path)
+        else:
+            from dataLoaders.CSVLoaderClass import CSVDataLoader
+
+            loader = CSVDataLoader(path)
+            loader.load_csv()
+            df = loader.df
+        logging.info(f"Processed dataset loaded from {path} ({len(df)} rows)")
+        return df
+
+    # TODO: Delete all but the `keep` newest snapshots (the manifest's latest is always kept)
+    def prune(self, keep: int) -> list:
+        manifest = self._load_manifest()
+        tracked = [v["file"] for v in manifest["versions"]]
+        untracked = [
+            os.path.basename(p)
+            for p in glob.glob(os.path.join(self.folder, "combined_testcases_*"))
+            if not p.endswith(".tmp") and os.path.basename(p) not in tracked
+        ]
+        # ? Timestamps in the names sort chronologically; legacy files count as the oldest
+        ordered = sorted(untracked) + tracked
+        doomed = [
+            f for f in ordered[: max(0, len(ordered) - keep)] if f != manifest["latest"]
+        ]
+
+        for filename in doomed:
+            try:
+                os.remove(os.path.join(self.folder, filename))
+            except OSError as e:
+                logging.warning(f"Could not delete old snapshot {filename}: {e}")
+        manifest["versions"] = [
+            v for v in manifest["versions"] if v["file"] not in doomed
+        ]
+        self._save_manifest(manifest)
+        if doomed:
+            logging.info(f"Pruned {len(doomed)} old processed snapshots.")
+        return doomed
+
+
+class SnapshotWriter:
+    # TODO: Appends DataFrame chunks to a new snapshot; the manifest only sees it once close() succeeds
+    def __init__(self, dataset: ProcessedDataset, columns: list, fmt: str = "parquet"):
+        """
+        Args: columns (list): Final column order; chunks are reindexed to it (missing columns -> null).
+              fmt (str): "parquet" (one row group per chunk) or "csv".
+        Every column is stored as text, since a chunk cannot know the types of the rows still to come.
+        """
+        if fmt not in ("parquet", "csv"):
+            raise ValueError(f"Unknown processed dataset format '{fmt}'.")
+        os.makedirs(dataset.folder, exist_ok=True)
+        self.dataset = dataset
+        self.columns = list(columns)
+        self.fmt = fmt
+        self.filename = f"combined_testcases_{helper.get_timestamp()}.{fmt}"
+        self.path = os.path.join(dataset.folder, self.filename)
+        self.tmp_path = f"{self.path}.tmp"
+        self.rows = 0
+
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._schema = pa.schema([(col, pa.string()) for col in self.columns])
+            self._writer = pq.ParquetWriter(self.tmp_path, self._schema)
+        else:
+            self._writer = open(self.tmp_path, "w", encoding="utf-8", newline="")
+            pd.DataFrame(columns=self.columns).to_csv(self._writer, index=False)
+
+    # TODO: Cells as strings (nulls kept), in the snapshot's column order
+    def _as_text(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        chunk = chunk.reindex(columns=self.columns)
+        for col in self.columns:
+            values = chunk[col].astype(object)
+            chunk[col] = values.where(values.isna(), values.astype(str))
+        return chunk
+
+    # TODO: Append one chunk
+    def write(self, chunk: pd.DataFrame):
+        chunk = self._as_text(chunk)
+        if self.fmt == "parquet":
+            import pyarrow as pa
+
+            self._writer.write_table(
+                pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            )
+        else:
+            chunk.to_csv(self._writer, header=False, index=False)
+        self.rows += len(chunk)
+
+    # TODO: Finish the file, publish it under its final name and record it in the manifest
+    def close(self) -> str:
+        self._writer.close()
+        os.replace(self.tmp_path, self.path)
+        self.dataset._record(
+            self.filename, self.rows, {col: "str" for col in self.columns}
+        )
+        return self.path
+
+    # TODO: Drop a partially written snapshot (the manifest is left untouched)
+    def abort(self):
+        try:
+            self._writer.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,147 @@
+import hashlib  # Content hash of each workbook
+import json
+import logging
+import os
+
+import pandas as pd
+
+# ! Bump whenever convert2CSV changes how sheets are parsed/normalized; old entries are then ignored
+PARSER_VERSION = 1
+
+
+class WorkbookCache:
+    # TODO: Cache normalized per-workbook DataFrames as Parquet under data/interim
+    def __init__(self, cache_dir: str = "../data/interim/workbooks"):
+        """
+        Args: cache_dir (str): Folder holding '<hash>_<path hash>_v<parser>.parquet' files and index.json.
+        """
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+        self._pruneOldVersions()
+
+    def _load_index(self) -> dict:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Workbook cache index unreadable, starting fresh: {e}")
+            return {}
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    # TODO: Delete a cached Parquet file unless another index entry still points at it
+    def _removeFile(self, filename: str):
+        if any(entry.get("file") == filename for entry in self.index.values()):
+            return
+        try:
+            os.remove(os.path.join(self.cache_dir, filename))
+        except FileNotFoundError:
+            pass
+
+    # TODO: Drop entries and files written by older parser versions (they are never read again)
+    def _pruneOldVersions(self):
+        stale = [
+            key
+            for key, entry in self.index.items()
+            if entry.get("parser_version") != PARSER_VERSION
+        ]
+        for key in stale:
+            self._removeFile(self.index.pop(key)["file"])
+        # ? Old-version files the index lost track of (current-version ones may be mid-put)
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".parquet") and not filename.endswith(
+                f"_v{PARSER_VERSION}.parquet"
+            ):
+                self._removeFile(filename)
+        if stale:
+            self._save_index()
+            logging.info(f"Workbook cache dropped {len(stale)} outdated entries.")
+
+    # TODO: SHA-256 of the workbook bytes
+    @staticmethod
+    def fileHash(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    # TODO: Resolve the cache entry for a workbook, re-hashing only when mtime/size changed
+    def _lookup(self, path: str):
+        key = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.index.get(key)
+        if entry and entry["parser_version"] == PARSER_VERSION:
+            if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                return key, entry, None
+            # ? Touched but possibly unchanged file: the content hash decides
+            content_hash = self.fileHash(path)
+            if content_hash == entry["hash"]:
+                entry["mtime"] = stat.st_mtime
+                self._save_index()
+                return key, entry, content_hash
+            return key, None, content_hash
+        return key, None, None
+
+    # TODO: True if the workbook has no valid cache entry (new or modified since last parse)
+    def isStale(self, path: str) -> bool:
+        _, entry, _ = self._lookup(path)
+        return entry is None or not os.path.exists(
+            os.path.join(self.cache_dir, entry["file"])
+        )
+
+    # TODO: Return the cached DataFrame for a workbook, or None on a miss
+    def get(self, path: str):
+        _, entry, _ = self._lookup(path)
+        if entry is None:
+            return None
+        cache_file = os.path.join(self.cache_dir, entry["file"])
+        if not os.path.exists(cache_file):
+            return None
+        df = pd.read_parquet(cache_file)
+        if "sourcefile" in df.columns:
+            # ? Entries written before path-keyed file names may come from an identical copy
+            df["sourcefile"] = os.path.basename(path)
+        logging.info(f"Workbook cache hit for '{os.path.basename(path)}'.")
+        return df
+
+    # TODO: Store a parsed workbook's DataFrame and record it in the index
+    def put(self, path: str, df: pd.DataFrame):
+        key, _, content_hash = self._lookup(path)
+        content_hash = content_hash or self.fileHash(path)
+        stat = os.stat(path)
+        # ? The frame carries a per-file 'sourcefile' (feeds the stable IDs), so identical
+        #   workbooks under different names must not share one Parquet file
+        path_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        filename = f"{content_hash[:32]}_{path_hash}_v{PARSER_VERSION}.parquet"
+        self.normalizeForStorage(df).to_parquet(
+            os.path.join(self.cache_dir, filename), index=False
+        )
+        previous = self.index.get(key, {}).get("file")
+        self.index[key] = {
+            "hash": content_hash,
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+            "parser_version": PARSER_VERSION,
+            "file": filename,
+        }
+        self._save_index()
+        # ? The superseded version of this workbook is never read again
+        if previous and previous != filename:
+            self._removeFile(previous)
+
+    # TODO: Excel columns often mix numbers and text; store those as strings so Parquet accepts them
+    @staticmethod
+    def normalizeForStorage(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        for col in df.select_dtypes(include=["object", "string"]).columns:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return df
@@ -1,119 +1,630 @@
-# For logging, file discovery, and path ops
+# For logging, CLI parsing, file discovery, and path ops
+import argparse
 import logging
-import glob
 import os
 
-# Custom Modules Import
-from dataLoaders.CSVDataInspector import CSVDataInspector
-from dataLoaders.CSVLoaderClass import CSVDataLoader
-from dataLoaders.DataLoaderClass import DataLoaderClass
-# from services.Milvus.MilvusConnector import MilvusConnector
-# from services.Milvus.MilvusDataManager import MilvusDataManager
-# from services.Milvus.MilvusEmbedder import MilvusEmbedder
-# from services.Milvus.MilvusSearchCLI import MilvusSearchCLI
+from services.Instrumentation import recorder, span
 
+# ! Keep this module free of heavy imports (pandas, torch, matplotlib, tkinter, pymilvus).
+#   Each subcommand imports only the subsystems it needs; see benchmarks/startup_benchmark.py.
 
-def main():
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+# ? "milvus" needs the docker-compose stack; "local" runs an exact in-process NumPy search
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "milvus")
+
+# ? "torch" (fp32 reference), "onnx" or "onnx-int8"; all write into the same 384-dim collection
+EMBEDDER_BACKEND = os.getenv("EMBEDDER_BACKEND", "torch")
+
+# ? Encoding worker processes for `ingest` (unset: one per core; 1 encodes in-process)
+ENCODE_WORKERS = int(os.getenv("ENCODE_WORKERS", "0")) or os.cpu_count() or 1
+
+# ? Inspection plots are written here instead of opening a window (set automatically when headless)
+PLOTS_DIR = os.getenv("PLOTS_DIR")
+
+# ? Processed snapshots kept in data/processed (unset: keep all)
+PROCESSED_KEEP = int(os.getenv("PROCESSED_KEEP", "0")) or None
+
+# ? Folder for run_<timestamp>.json + metrics.prom (unset: timings are only logged)
+METRICS_DIR = os.getenv("METRICS_DIR")
+
+# ? Pooled Milvus connections shared by concurrent insert/search workers
+MILVUS_POOL_SIZE = int(os.getenv("MILVUS_POOL_SIZE", "4"))
+
+# ? Milvus vector storage: "float32", "float16" (half the memory) or "binary" (sign bits, 1/32);
+#   compact modes rerank RERANK_FACTOR x top_k candidates against full-precision vectors on disk
+VECTOR_MODE = os.getenv("VECTOR_MODE", "float32")
+RERANK_FACTOR = int(os.getenv("RERANK_FACTOR", "4"))
+RERANK_DIR = "../data/interim/rerank_vectors"
+
+# ? Each compact mode gets its own collection, so switching modes never mixes schemas
+COLLECTION_NAME = "test_plan_embeddings" + (
+    "" if VECTOR_MODE == "float32" else f"_{VECTOR_MODE}"
+)
+EMBEDDING_DIM = 384
+
+
+# TODO: Build the vector store for the chosen backend; returns (data_manager, connector or None)
+def build_data_manager(
+    backend: str, collection_name: str, dimension: int, num_rows: int = None
+):
+    """
+    num_rows: Expected collection size, used to pick the index of a newly created collection
+    """
+    if backend == "local":
+        from services.Milvus.LocalDataManager import LocalDataManager
+
+        data_manager = LocalDataManager(collection_name, dimension=dimension)
+        logging.info(f"Using local vector store for '{collection_name}'.")
+        return data_manager, None
+
+    if backend != "milvus":
+        raise ValueError(
+            f"Unknown vector backend '{backend}' (use 'milvus' or 'local')."
+        )
+
+    from services.Milvus.MilvusConnector import MilvusConnector
+    from services.Milvus.MilvusDataManager import MilvusDataManager
+
+    connector = MilvusConnector(pool_size=MILVUS_POOL_SIZE)
+    connector.connect()
+    logging.info("Connected to Milvus.")
+
+    if not connector.has_collection(collection_name):
+        logging.info(f"Collection '{collection_name}' does not exist. Creating...")
+        connector.create_collection(collection_name, dimension, vector_mode=VECTOR_MODE)
+        connector.create_index(collection_name, num_rows=num_rows)
+        connector.create_scalar_indexes(collection_name)
+        logging.info(f"Collection '{collection_name}' created and indexed.")
+    else:
+        logging.info(f"Collection '{collection_name}' already exists.")
+
+    rerank_store = None
+    if VECTOR_MODE != "float32":
+        from services.Milvus.LocalDataManager import LocalDataManager
+
+        # ? Full-precision copy, memory-mapped from disk; only candidate rows are read per search
+        rerank_store = LocalDataManager(
+            collection_name, dimension, persist_dir=RERANK_DIR, scalar_fields={}
+        )
+    data_manager = MilvusDataManager(
+        connector,
+        collection_name,
+        rerank_store=rerank_store,
+        rerank_factor=RERANK_FACTOR,
     )
-    logging.info("Starting Milvus Embedding Pipeline...")
+    return data_manager, connector
+
+
+# TODO: Step 1 — select/load Excel workbooks and combine their test case sheets
+def load_workbooks(
+    raw_folder: str = None,
+    parallel: bool = False,
+    stream: bool = False,
+    chunk_rows: int = 5000,
+):
+    """
+    stream: Write the snapshot chunk by chunk (bounded memory); finalCombinedCSV stays None
+    """
+    from dataLoaders.DataLoaderClass import DataLoaderClass
+    from dataLoaders.WorkbookCache import WorkbookCache
+
+    logging.info("Step 1: Uploading and processing Excel files...")
+    dataLoader = DataLoaderClass(cache=None if stream else WorkbookCache())
+    # ? A raw folder (flag or RAW_DATA_DIR) -> batch mode, no Tk file dialog
+    raw_folder = raw_folder or os.getenv("RAW_DATA_DIR")
+    if raw_folder:
+        dataLoader.loadFiles(dataLoader.listRawFiles(raw_folder), open_files=not stream)
+    else:
+        dataLoader.uploadFiles(open_files=not stream)
+    if stream:
+        with span("stream_workbooks") as s:
+            dataLoader.streamAllTCs(chunk_rows=chunk_rows, keep=PROCESSED_KEEP)
+            s.rows = dataLoader.finalSnapshotRows
+        logging.info("Excel files streamed successfully.")
+        return dataLoader
+    with span("convert_workbooks") as s:
+        dataLoader.convert2CSV(parallel=parallel)
+        s.rows = sum(len(df) for df in dataLoader.convertedCSVFileData.values())
+    with span("combine") as s:
+        dataLoader.combineAllTCs(keep=PROCESSED_KEEP)
+        if dataLoader.finalCombinedCSV is not None:
+            s.rows = len(dataLoader.finalCombinedCSV)
+    logging.info("Excel files loaded and converted successfully.")
+    return dataLoader
+
+
+# TODO: The combined test cases of this run: the in-memory frame, or the snapshot a streaming load wrote
+def combined_testcases(dataLoader):
+    if dataLoader.finalCombinedCSV is not None:
+        return dataLoader.finalCombinedCSV
+    if dataLoader.finalSnapshotPath is None:
+        raise ValueError("No test cases found in the selected workbooks.")
+    from dataLoaders.ProcessedDataset import ProcessedDataset
+
+    with span("load_processed") as s:
+        df = ProcessedDataset().load(dataLoader.finalSnapshotPath)
+        s.rows = len(df)
+    return df
+
+
+# TODO: Step 2 — inspection report and plots
+def inspect_data(df, plots_dir: str = PLOTS_DIR):
+    from dataLoaders.CSVDataInspector import CSVDataInspector
+
+    logging.info("Step 2: Running CSV inspection and plots...")
+    if plots_dir is None and os.name != "nt" and not os.getenv("DISPLAY"):
+        plots_dir = "../reports/figures"
+    output_path = (
+        os.path.join(plots_dir, "categorical_distributions.png") if plots_dir else None
+    )
+    with span("inspect", rows=len(df)):
+        # ? Read-only inspection: no deep copy of the combined frame
+        inspector = CSVDataInspector(df, copy=False)
+        with span("inspect.profile", rows=len(df)):
+            inspector.run_full_report()
+        with span("inspect.plot"):
+            inspector.plot_specific_categorical_distributions(
+                columns=["functionalarea", "priority"], output_path=output_path
+            )
+    logging.info("CSV inspection completed.")
+
+
+# TODO: Step 3 — take the combined frame (or the latest processed snapshot), clean it and assign stable IDs
+def load_processed(df=None):
+    """
+    df: Combined frame handed over in-process by load_workbooks; None reads the latest snapshot
+    """
+    from dataLoaders.CSVLoaderClass import CSVDataLoader
+    from dataLoaders.ProcessedDataset import ProcessedDataset
+    from services.Milvus.IncrementalIngestor import assign_stable_ids
 
+    if df is not None:
+        logging.info("Step 3: Using the combined test cases from this run...")
+        csvLoader = CSVDataLoader.from_dataframe(df)
+    else:
+        logging.info("Step 3: Loading the latest processed dataset...")
+        with span("load_processed") as s:
+            dataset = ProcessedDataset()
+            if dataset.latest_path() is None:
+                raise FileNotFoundError("No combined testcases dataset found!")
+            csvLoader = CSVDataLoader.from_dataframe(
+                dataset.load(), source=dataset.latest_path()
+            )
+            s.rows = len(csvLoader.df)
+    with span("clean", rows=len(csvLoader.df)):
+        csvLoader.clean_data()
+    with span("extract_text", rows=len(csvLoader.df)):
+        csvLoader.extract_text_column("description")
+
+    # ? IDs come from (source workbook, tcid) so they survive reorders and new workbooks
+    with span("assign_ids", rows=len(csvLoader.df)):
+        df_metadata = assign_stable_ids(csvLoader.df)
+
+    valid = df_metadata["description"].fillna("").astype(str).str.strip() != ""
+    if not valid.any():
+        raise ValueError("No valid descriptions found after cleaning!")
+    logging.info(f"Loaded {int(valid.sum())} valid descriptions.")
+    return df_metadata, valid
+
+
+# TODO: Step 5 — encode descriptions and write them to the vector store
+def ingest_embeddings(
+    df_metadata, valid, embedder, data_manager, connector=None, incremental=True
+):
+    """
+    embedder / data_manager / connector: Opened (and closed) by the caller, see cmd_ingest
+    """
+    from services.Milvus.IncrementalIngestor import IncrementalIngestor
+
+    ingestor = IncrementalIngestor(embedder, data_manager)
+    if incremental:
+        logging.info("Step 5: Syncing changed test cases into the vector store...")
+        with span("ingest_sync", rows=len(df_metadata)):
+            summary = ingestor.sync(df_metadata)
+        logging.info(f"Incremental sync finished: {summary}")
+    else:
+        logging.info("Step 5: Re-encoding and upserting every test case...")
+        # ? Upserts by stable id (re-runs never duplicate rows) and the sync state is written,
+        #   so the next delta sync only sends what changed after this full load
+        with span("ingest_full", rows=int(valid.sum())):
+            summary = ingestor.sync(df_metadata.loc[valid], batch_size=16, full=True)
+        logging.info(f"Full load finished: {summary}")
+
+    if connector is not None:
+        reselect_index(data_manager, connector)
+    update_keyword_index(df_metadata.loc[valid])
+    return summary
+
+
+# TODO: Switch to the index type the collection's current size calls for (see IndexTuner.select_index)
+def reselect_index(data_manager, connector):
+    from services.Milvus.IndexTuner import clear_search_params
+
+    data_manager.flush()  # ? num_entities only counts flushed rows
+    if connector.reselect_index(COLLECTION_NAME) is not None:
+        # ? ef / nprobe tuned for the old index type no longer apply
+        clear_search_params(COLLECTION_NAME)
+        data_manager.search_params = None
+
+
+# TODO: Sync the exact-match keyword index (TCIDs + description tokens) with the ingested rows
+def update_keyword_index(df_metadata):
+    from services.Milvus.KeywordIndex import KeywordIndex
+
+    with span("keyword_index", rows=len(df_metadata)):
+        keyword_index = KeywordIndex.for_collection(COLLECTION_NAME)
+        keyword_index.sync(df_metadata)
+        keyword_index.save()
+    return keyword_index
+
+
+# TODO: Step 6 — interactive search REPL
+def run_search(
+    embedder, data_manager, df_metadata=None, keyword_index=None, fuse=False
+):
+    from services.Milvus.MilvusSearchCLI import MilvusSearchCLI
+
+    logging.info("Step 6: Launching interactive CLI...")
+    cli = MilvusSearchCLI(
+        embedder,
+        data_manager,
+        df_metadata=df_metadata,
+        keyword_index=keyword_index,
+        fuse=fuse,
+    )
+    cli.interactive_cli()
+
+
+# TODO: `ingest` — workbooks -> cleaned test cases -> vector store
+def cmd_ingest(args):
+    if args.watch:
+        return watch_ingest(args)
+    dataLoader = load_workbooks(
+        args.raw_dir, args.parallel, stream=args.stream, chunk_rows=args.chunk_rows
+    )
+    df_metadata, valid = load_processed(combined_testcases(dataLoader))
+
+    from services.Milvus.MilvusEmbedder import MilvusEmbedder
+
+    logging.info(f"Step 4: Opening '{args.backend}' vector store...")
+    data_manager, connector = build_data_manager(
+        args.backend, COLLECTION_NAME, EMBEDDING_DIM, num_rows=int(valid.sum())
+    )
+    try:
+        # ? Worker pool, embedding cache and Milvus pool are released even if the sync fails
+        with MilvusEmbedder(
+            backend=args.embedder_backend, num_workers=args.encode_workers
+        ) as embedder:
+            ingest_embeddings(
+                df_metadata,
+                valid,
+                embedder,
+                data_manager,
+                connector,
+                incremental=not args.full,
+            )
+    finally:
+        if connector is not None:
+            connector.disconnect()
+    logging.info("Ingestion finished.")
+
+
+# TODO: `ingest --watch` — poll the raw folder and delta-sync every added or modified workbook
+def watch_ingest(args):
+    if args.stream or args.full:
+        raise ValueError("--watch cannot be combined with --stream or --full.")
+
+    from dataLoaders.DataLoaderClass import DataLoaderClass
+    from dataLoaders.WorkbookCache import WorkbookCache
+    from services.Milvus.MilvusEmbedder import MilvusEmbedder
+
+    raw_folder = args.raw_dir or os.getenv("RAW_DATA_DIR") or "../data/raw"
+    logging.info(f"Step 4: Opening '{args.backend}' vector store...")
+    data_manager, connector = build_data_manager(
+        args.backend, COLLECTION_NAME, EMBEDDING_DIM
+    )
     try:
-        logging.info("Step 1: Uploading and processing Excel files...")
-        dataLoader = DataLoaderClass()
-        dataLoader.uploadFiles()
-        dataLoader.convert2CSV()
-        dataLoader.combineAllTCs()
-        logging.info("Excel files loaded and converted successfully.")
-
-        logging.info("Step 2: Running CSV inspection and plots...")
-        inspector = CSVDataInspector(dataLoader.finalCombinedCSV)
-        inspector.run_full_report()
-        inspector.plot_specific_categorical_distributions(
-            columns=["functionalarea", "priority"]
+        # ? One warm model and store for the whole session; each refresh is a delta sync
+        with MilvusEmbedder(
+            backend=args.embedder_backend, num_workers=args.encode_workers
+        ) as embedder:
+
+            def on_change(df):
+                try:
+                    df_metadata, valid = load_processed(df)
+                    with span("watch_refresh", rows=len(df_metadata)):
+                        ingest_embeddings(
+                            df_metadata, valid, embedder, data_manager, connector
+                        )
+                except Exception:
+                    # ? A bad or half-saved workbook must not end the session; the next change retries
+                    logging.exception("Refresh failed; waiting for the next change.")
+
+            DataLoaderClass(cache=WorkbookCache()).watchRawFolder(
+                raw_folder,
+                interval=args.interval,
+                on_change=on_change,
+                parallel=args.parallel,
+                keep=PROCESSED_KEEP,
+            )
+    finally:
+        if connector is not None:
+            connector.disconnect()
+
+
+# TODO: `inspect` — workbooks -> inspection report and plots (no model, no vector store)
+def cmd_inspect(args):
+    dataLoader = load_workbooks(
+        args.raw_dir, args.parallel, stream=args.stream, chunk_rows=args.chunk_rows
+    )
+    inspect_data(combined_testcases(dataLoader), plots_dir=args.plots_dir or PLOTS_DIR)
+
+
+# TODO: Metadata for post-filters and the keyword index, shared by `search` and `serve`
+def load_search_context(no_keyword: bool = False):
+    from dataLoaders.ProcessedDataset import ProcessedDataset
+
+    df_metadata = None
+    if ProcessedDataset().latest_path() is not None:
+        # ? Metadata is only needed for filters on fields the store cannot pre-filter
+        df_metadata, valid = load_processed()
+
+    keyword_index = None
+    if not no_keyword:
+        from services.Milvus.KeywordIndex import KeywordIndex
+
+        keyword_index = KeywordIndex.for_collection(COLLECTION_NAME)
+        if not len(keyword_index) and df_metadata is not None:
+            # ? Collections ingested before the keyword index existed: build it once now
+            keyword_index = update_keyword_index(df_metadata.loc[valid])
+    return df_metadata, keyword_index
+
+
+# TODO: `search` — query an already ingested collection (locally, or through a running `serve`)
+def cmd_search(args):
+    if args.server:
+        from services.Milvus.MilvusSearchCLI import MilvusSearchCLI
+        from services.Milvus.SearchServer import RemoteSearchClient
+
+        cli = MilvusSearchCLI(None, None, client=RemoteSearchClient(args.server))
+        cli.interactive_cli()
+        return
+
+    from services.Milvus.MilvusEmbedder import MilvusEmbedder
+
+    data_manager, connector = build_data_manager(
+        args.backend, COLLECTION_NAME, EMBEDDING_DIM
+    )
+    try:
+        df_metadata, keyword_index = load_search_context(args.no_keyword)
+        with MilvusEmbedder(backend=args.embedder_backend) as embedder:
+            run_search(
+                embedder,
+                data_manager,
+                df_metadata=df_metadata,
+                keyword_index=keyword_index,
+                fuse=args.fuse,
+            )
+    finally:
+        if connector is not None:
+            connector.disconnect()
+
+
+# TODO: `serve` — long-running search service with a warm model and micro-batched queries
+def cmd_serve(args):
+    from services.Milvus.MilvusEmbedder import MilvusEmbedder
+    from services.Milvus.SearchServer import SearchServer
+
+    data_manager, connector = build_data_manager(
+        args.backend, COLLECTION_NAME, EMBEDDING_DIM
+    )
+    try:
+        # ? Same post-filters and keyword routing as the in-process CLI
+        df_metadata, keyword_index = load_search_context(args.no_keyword)
+        # ? The embedder outlives every request; its worker pool and cache close once the server stops
+        with MilvusEmbedder(backend=args.embedder_backend) as embedder:
+            server = SearchServer(
+                embedder,
+                data_manager,
+                host=args.host,
+                port=args.port,
+                window_ms=args.window_ms,
+                max_batch=args.max_batch,
+                df_metadata=df_metadata,
+                keyword_index=keyword_index,
+                fuse=args.fuse,
+            )
+            server.serve_forever()
+    finally:
+        if connector is not None:
+            connector.disconnect()
+
+
+# TODO: `tune` — optionally re-pick the index for the current size, then sweep nprobe/ef against exact ground truth
+def cmd_tune(args):
+    from services.Milvus.IndexTuner import IndexTuner
+
+    data_manager, connector = build_data_manager(
+        "milvus", COLLECTION_NAME, EMBEDDING_DIM
+    )
+    if args.reindex:
+        connector.rebuild_index(COLLECTION_NAME)
+    tuner = IndexTuner(data_manager, top_k=args.top_k, target_recall=args.target_recall)
+    report = tuner.tune(num_queries=args.queries)
+
+    print(f"Index: {report['index'].get('index_type')} ({report['rows']} rows)")
+    print(
+        f"{'setting':<14}{'recall@' + str(report['top_k']):>10}{'p50 ms':>10}{'p95 ms':>10}"
+    )
+    for point in report["curve"]:
+        setting = f"{point['param']}={point['value']}"
+        print(
+            f"{setting:<14}{point['recall']:>10.4f}{point['p50_ms']:>10.2f}{point['p95_ms']:>10.2f}"
         )
-        logging.info("CSV inspection completed.")
+    print(f"Chosen: {report['chosen']}")
+    connector.disconnect()
 
-        logging.info("Step 3: Loading processed CSV...")
-        files = sorted(glob.glob("../data/processed/combined_testcases_*.csv"))
-        if not files:
-            raise FileNotFoundError("No combined testcases CSV found!")
-        latest_file = files[-1]
 
-        csvLoader = CSVDataLoader(latest_file)
-        csvLoader.load_csv()
-        csvLoader.clean_data()
-        descriptions = csvLoader.extract_text_column("description")
-        df_metadata = csvLoader.df.copy()
-
-        if "id" not in df_metadata.columns:
-            df_metadata.reset_index(inplace=True)
-            df_metadata.rename(columns={"index": "id"}, inplace=True)
-        else:
-            df_metadata["id"] = df_metadata["id"].astype(int)
-
-        filtered = [(i, d) for i, d in enumerate(descriptions) if d and d.strip()]
-        if not filtered:
-            raise ValueError("No valid descriptions found after cleaning!")
-        ids, descriptions = zip(*filtered)
-        ids = [int(i) + 1 for i in ids]
-        logging.info(f"Loaded {len(ids)} valid descriptions.")
-
-    #     logging.info("Step 4: Connecting to Milvus...")
-    #     connector = MilvusConnector()
-    #     connector.connect()
-    #     logging.info("Connected to Milvus.")
-
-    #     COLLECTION_NAME = "test_plan_embeddings"
-    #     EMBEDDING_DIM = 384
-
-    #     if not connector.has_collection(COLLECTION_NAME):
-    #         logging.info(f"Collection '{COLLECTION_NAME}' does not exist. Creating...")
-    #         connector.create_collection(COLLECTION_NAME, EMBEDDING_DIM)
-    #         connector.create_index(COLLECTION_NAME)
-    #         logging.info(f"Collection '{COLLECTION_NAME}' created and indexed.")
-    #     else:
-    #         logging.info(f"Collection '{COLLECTION_NAME}' already exists.")
-
-    #     embedder = MilvusEmbedder()
-    #     data_manager = MilvusDataManager(connector, COLLECTION_NAME)
-
-    #     logging.info("Step 5: Generating and inserting embeddings in batches...")
-
-    #     BATCH_SIZE = 16  # Use smaller batch size to prevent memory overload
-    #     total = len(descriptions)
-
-    #     for start in range(0, total, BATCH_SIZE):
-    #         end = min(start + BATCH_SIZE, total)
-    #         batch_descriptions = descriptions[start:end]
-    #         batch_ids = ids[start:end]
-
-    #         try:
-    #             logging.info(f"Encoding batch {start} to {end}...")
-    #             batch_embeddings = embedder.encode(
-    #                 batch_descriptions, batch_size=BATCH_SIZE
-    #             )
-    #             logging.info(f"Inserting batch {start} to {end} into Milvus...")
-    #             data_manager.batch_insert_embeddings(
-    #                 batch_ids, batch_embeddings, batch_descriptions
-    #             )
-    #             logging.info(f"Batch {start} to {end} inserted successfully.")
-    #         except Exception as e:
-    #             logging.error(f"Error processing batch {start}-{end}: {e}")
-
-    #     logging.info("All embeddings inserted.")
-
-    #     logging.info("Step 6: Launching interactive CLI...")
-    #     cli = MilvusSearchCLI(embedder, data_manager, df_metadata=df_metadata)
-    #     cli.interactive_cli()
-
-    #     logging.info("Shutting down...")
-    #     connector.disconnect()
-    #     logging.info("Disconnected from Milvus. Pipeline finished.")
+# TODO: No subcommand — original flow: load, inspect and prepare the processed data
+def cmd_default(args):
+    dataLoader = load_workbooks(
+        args.raw_dir, args.parallel, stream=args.stream, chunk_rows=args.chunk_rows
+    )
+    df = combined_testcases(dataLoader)
+    inspect_data(df)
+    load_processed(df)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Test plan embedding pipeline")
+    parser.set_defaults(
+        func=cmd_default, raw_dir=None, parallel=False, stream=False, chunk_rows=5000
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=METRICS_DIR,
+        help="Write a JSON run report and metrics.prom here (default: $METRICS_DIR)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="STAGE",
+        help="Capture cProfile + tracemalloc for one span, e.g. clean or embedder.model_encode",
+    )
+    sub = parser.add_subparsers(dest="command")
+
+    def add_load_args(p):
+        p.add_argument(
+            "--raw-dir", help="Read every workbook in this folder (no dialog)"
+        )
+        p.add_argument(
+            "--parallel", action="store_true", help="Parse sheets in a process pool"
+        )
+        p.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stream rows into the processed snapshot (bounded memory, no workbook cache)",
+        )
+        p.add_argument(
+            "--chunk-rows", type=int, default=5000, help="Rows per chunk with --stream"
+        )
+
+    def add_backend_arg(p):
+        p.add_argument(
+            "--backend",
+            choices=["milvus", "local"],
+            default=VECTOR_BACKEND,
+            help="Vector store backend (default: $VECTOR_BACKEND or milvus)",
+        )
+        p.add_argument(
+            "--embedder-backend",
+            choices=["torch", "onnx", "onnx-int8"],
+            default=EMBEDDER_BACKEND,
+            help="Embedding inference backend (default: $EMBEDDER_BACKEND or torch)",
+        )
+
+    def add_keyword_args(p):
+        p.add_argument(
+            "--fuse",
+            action="store_true",
+            help="Fuse keyword-index hits into semantic results (reciprocal rank fusion)",
+        )
+        p.add_argument(
+            "--no-keyword",
+            action="store_true",
+            help="Disable routing of ID/keyword lookups to the keyword index",
+        )
 
+    p_ingest = sub.add_parser("ingest", help="Load workbooks and ingest embeddings")
+    add_load_args(p_ingest)
+    add_backend_arg(p_ingest)
+    p_ingest.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-encode and upsert every row instead of a delta sync",
+    )
+    p_ingest.add_argument(
+        "--encode-workers",
+        type=int,
+        default=ENCODE_WORKERS,
+        help="Encoding processes (default: $ENCODE_WORKERS or one per core)",
+    )
+    p_ingest.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and sync every added or modified workbook in --raw-dir",
+    )
+    p_ingest.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between folder polls with --watch",
+    )
+    p_ingest.set_defaults(func=cmd_ingest)
+
+    p_inspect = sub.add_parser("inspect", help="Load workbooks and run the data report")
+    add_load_args(p_inspect)
+    p_inspect.add_argument(
+        "--plots-dir",
+        help="Save plots here instead of showing them (default: $PLOTS_DIR)",
+    )
+    p_inspect.set_defaults(func=cmd_inspect)
+
+    p_search = sub.add_parser("search", help="Interactive semantic search")
+    add_backend_arg(p_search)
+    p_search.add_argument(
+        "--server", help="URL of a running `serve` instance (thin-client mode)"
+    )
+    add_keyword_args(p_search)
+    p_search.set_defaults(func=cmd_search)
+
+    p_serve = sub.add_parser(
+        "serve", help="Run the local micro-batching search service"
+    )
+    add_backend_arg(p_serve)
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument(
+        "--window-ms", type=float, default=10, help="Micro-batch collection window"
+    )
+    p_serve.add_argument("--max-batch", type=int, default=64)
+    add_keyword_args(p_serve)
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_tune = sub.add_parser(
+        "tune", help="Recall/latency sweep of the Milvus index search params"
+    )
+    p_tune.add_argument("--top-k", type=int, default=10)
+    p_tune.add_argument(
+        "--queries", type=int, default=200, help="Sampled query vectors"
+    )
+    p_tune.add_argument("--target-recall", type=float, default=0.95)
+    p_tune.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rebuild the vector index for the current row count first",
+    )
+    p_tune.set_defaults(func=cmd_tune)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    logging.info("Starting Milvus Embedding Pipeline...")
+    if args.profile:
+        recorder.enable_profiling(args.profile)
+
+    try:
+        with span(f"command.{args.command or 'default'}"):
+            args.func(args)
     except Exception as e:
         logging.exception(f"Pipeline failed due to error: {e}")
+    finally:
+        recorder.log_summary()
+        if args.metrics_dir:
+            recorder.write(args.metrics_dir)
 
 
 if __name__ == "__main__":
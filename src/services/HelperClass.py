@@ -1,3 +1,4 @@
+import hashlib  # Stable hashing for IDs and content fingerprints
 import re  # Regular expressions to remove unwanted characters
 from datetime import datetime  # For generating timestamps
 
@@ -22,6 +23,33 @@ class HelperClass:
         cleaned_cols = [self.cleanColumnName(col) for col in columns]
         return "tcid" in cleaned_cols
 
+    # TODO: Returns the original name of the column that normalizes to 'tcid' (or None).
+    def findTCIDColumn(self, columns: list[str]):
+        """Args: columns (list[str]): List of column names.
+        Returns: str | None: The matching column name as it appears in `columns`.
+        """
+        for col in columns:
+            if self.cleanColumnName(str(col)) == "tcid":
+                return col
+        return None
+
+    # TODO: Derives a stable positive int64 ID from a source workbook and a test case ID.
+    def stableID(self, source: str, tcid: str) -> int:
+        """
+        Args: source (str): Source workbook name. tcid (str): Normalized test case ID.
+        Returns: int: ID that stays the same across runs, reorders and new workbooks.
+        """
+        digest = hashlib.blake2b(f"{source}|{tcid}".encode("utf-8"), digest_size=8)
+        return int.from_bytes(digest.digest(), "big") & ((1 << 63) - 1)
+
+    # TODO: Returns a short fingerprint of row content used to detect changed rows.
+    def contentHash(self, *values) -> str:
+        """Args: values: Row values that feed the embedding/metadata.
+        Returns: str: Hex digest that changes whenever any value changes.
+        """
+        joined = "\x1f".join("" if v is None else str(v) for v in values)
+        return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
     # TODO: Returns the current timestamp formatted as a string.
     def get_timestamp(self, fmt: str = "%Y%m%d_%H%M%S") -> str:
         """
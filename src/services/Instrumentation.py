@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+# TODO: Peak resident memory of this process in bytes (psutil when available, getrusage otherwise)
+def peak_rss_bytes() -> int:
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        # ? Windows reports a true peak; elsewhere fall back to getrusage below
+        if hasattr(info, "peak_wset"):
+            return int(info.peak_wset)
+    except ImportError:
+        info = None
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ? ru_maxrss is KiB on Linux, bytes on macOS
+        return int(peak if sys.platform == "darwin" else peak * 1024)
+    except ImportError:
+        return int(info.rss) if info is not None else 0
+
+
+# TODO: Current resident memory of this process in bytes (0 if it cannot be read)
+def current_rss_bytes() -> int:
+    try:
+        import psutil
+
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+    try:
+        # ? Linux without psutil: second field of statm is resident pages
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class Span:
+    # TODO: One timed region; set `rows` inside the block to get a throughput
+    def __init__(self, name: str, parent: str = None, rows: int = None):
+        self.name = name
+        self.parent = parent
+        self.rows = rows
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        # ? How far RSS rose above its level at span start (the span's own peak, not the process')
+        self.rss_delta_bytes = 0
+        self.error = None
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "rows": self.rows,
+            "rows_per_sec": (
+                round(self.rows / self.wall_s, 1) if self.rows and self.wall_s else None
+            ),
+            "peak_rss_delta_mb": round(self.rss_delta_bytes / 2**20, 1),
+            "error": self.error,
+        }
+
+
+class RunRecorder:
+    # TODO: Collects spans for one pipeline run and exports them as JSON and Prometheus text
+    def __init__(self, max_spans: int = 10000):
+        """
+        max_spans: Individual spans kept for the report (aggregates always cover every span)
+        """
+        self.max_spans = max_spans
+        self.spans = []
+        self.totals = {}
+        self.started = time.time()
+        self.profile_stage = None
+        self.profile_dir = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiling = (
+            False  # ? Only one span at a time may own cProfile/tracemalloc
+        )
+
+    # TODO: Capture a cProfile + tracemalloc snapshot the next time `stage` runs
+    def enable_profiling(
+        self, stage: str, output_dir: str = "../data/interim/profiles"
+    ):
+        self.profile_stage = stage
+        self.profile_dir = output_dir
+
+    # TODO: Time a block: wall time, process CPU time, rows and RSS growth; nests per thread
+    @contextmanager
+    def span(self, name: str, rows: int = None):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        span = Span(name, parent=stack[-1].name if stack else None, rows=rows)
+        stack.append(span)
+
+        profiler = self._claim_profile(name)
+
+        rss_start, peak_start = current_rss_bytes(), peak_rss_bytes()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.wall_s = time.perf_counter() - wall
+            # ? Process-wide CPU: overlapping spans on other threads are included
+            span.cpu_s = time.process_time() - cpu
+            span.rss_delta_bytes = self._rss_delta(rss_start, peak_start)
+            stack.pop()
+            if profiler is not None:
+                self._stop_profile(name, profiler)
+            self._record(span)
+
+    # TODO: RSS growth of a span over its starting RSS
+    @staticmethod
+    def _rss_delta(rss_start: int, peak_start: int) -> int:
+        """
+        The process high-water mark only reflects a span if it rose during it; otherwise the RSS
+        still held at the end is the best available lower bound of the span's peak.
+        """
+        peak_end = peak_rss_bytes()
+        delta = current_rss_bytes() - rss_start
+        if peak_end > peak_start:
+            delta = max(delta, peak_end - rss_start)
+        return max(0, delta)
+
+    def _record(self, span: Span):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(span)
+            total = self.totals.setdefault(
+                span.name,
+                {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "rows": 0, "errors": 0},
+            )
+            total["count"] += 1
+            total["wall_s"] += span.wall_s
+            total["cpu_s"] += span.cpu_s
+            total["rows"] += span.rows or 0
+            total["errors"] += span.error is not None
+            total["rss_delta_bytes"] = max(
+                total.get("rss_delta_bytes", 0), span.rss_delta_bytes
+            )
+
+    # TODO: Start profiling if this span is the requested stage and no other span is profiling
+    def _claim_profile(self, name: str):
+        with self._lock:
+            # ? Concurrent threads in the same stage: only the first one profiles
+            if name != self.profile_stage or self._profiling:
+                return None
+            self._profiling = True
+        try:
+            return self._start_profile()
+        except Exception:
+            with self._lock:
+                self._profiling = False
+            raise
+
+    def _start_profile(self):
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profile(self, name: str, profiler):
+        import pstats
+        import tracemalloc
+
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        with self._lock:
+            # ? One snapshot per run is enough; later spans of the same stage run unprofiled
+            self.profile_stage = None
+            self._profiling = False
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.profile_dir, f"{name}_{stamp}")
+        profiler.dump_stats(base + ".prof")
+        with open(base + "_cpu.txt", "w") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+        with open(base + "_alloc.txt", "w") as f:
+            for stat in snapshot.statistics("lineno")[:40]:
+                f.write(f"{stat}\n")
+        logging.info(
+            f"Profile of '{name}' written to {base}.prof / _cpu.txt / _alloc.txt"
+        )
+
+    # TODO: Machine-readable run report: per-stage aggregates plus individual spans
+    def report(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {
+                    "count": t["count"],
+                    "wall_s": round(t["wall_s"], 6),
+                    "cpu_s": round(t["cpu_s"], 6),
+                    "rows": t["rows"],
+                    "rows_per_sec": (
+                        round(t["rows"] / t["wall_s"], 1)
+                        if t["rows"] and t["wall_s"]
+                        else None
+                    ),
+                    "errors": t["errors"],
+                    "peak_rss_delta_mb": round(t["rss_delta_bytes"] / 2**20, 1),
+                }
+                for name, t in self.totals.items()
+            }
+            spans = [s.as_dict() for s in self.spans]
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "duration_s": round(time.time() - self.started, 3),
+            "peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+            "stages": stages,
+            "spans": spans,
+        }
+
+    # TODO: Prometheus text exposition (e.g. for the node_exporter textfile collector)
+    def prometheus(self, prefix: str = "testplan_pipeline") -> str:
+        metrics = [
+            ("span_count", "counter", "Spans recorded", "count"),
+            ("span_wall_seconds_total", "counter", "Wall time in spans", "wall_s"),
+            ("span_cpu_seconds_total", "counter", "Process CPU time in spans", "cpu_s"),
+            ("span_rows_total", "counter", "Rows processed in spans", "rows"),
+            ("span_errors_total", "counter", "Spans that raised", "errors"),
+            (
+                "span_peak_rss_delta_bytes",
+                "gauge",
+                "Largest RSS growth within one span",
+                "rss_delta_bytes",
+            ),
+        ]
+        with self._lock:
+            totals = {name: dict(t) for name, t in self.totals.items()}
+        lines = []
+        for suffix, kind, help_text, key in metrics:
+            metric = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}.")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, t in sorted(totals.items()):
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{span="{label}"}} {t[key]}')
+        lines.append(f"# TYPE {prefix}_peak_rss_bytes gauge")
+        lines.append(f"{prefix}_peak_rss_bytes {peak_rss_bytes()}")
+        return "\n".join(lines) + "\n"
+
+    # TODO: Write run_<timestamp>.json and metrics.prom into output_dir; returns the JSON path
+    def write(self, output_dir: str) -> str:
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started))
+        json_path = os.path.join(output_dir, f"run_{stamp}.json")
+        with open(json_path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        # ? Textfile collectors read the file at any time, so swap it in atomically
+        prom_path = os.path.join(output_dir, "metrics.prom")
+        with open(prom_path + ".tmp", "w") as f:
+            f.write(self.prometheus())
+        os.replace(prom_path + ".tmp", prom_path)
+        logging.info(f"Run report written to {json_path} and {prom_path}")
+        return json_path
+
+    # TODO: One log line per stage, slowest first
+    def log_summary(self, top: int = 15):
+        stages = self.report()["stages"]
+        for name, s in sorted(stages.items(), key=lambda kv: -kv[1]["wall_s"])[:top]:
+            rate = f", {s['rows_per_sec']} rows/sec" if s["rows_per_sec"] else ""
+            logging.info(
+                f"[timing] {name}: {s['wall_s']:.3f}s wall, {s['cpu_s']:.3f}s cpu, "
+                f"{s['count']}x{rate}, peak +{s['peak_rss_delta_mb']} MB"
+            )
+
+
+# ? Process-wide recorder used by mainApp and the pipeline stages
+recorder = RunRecorder()
+
+
+def span(name: str, rows: int = None):
+    return recorder.span(name, rows)
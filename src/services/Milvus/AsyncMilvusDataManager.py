@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from services.Milvus.QueryCache import normalize_prompt
+
+
+class AsyncMilvusDataManager:
+    # TODO: asyncio front end of a MilvusDataManager / LocalDataManager (blocking calls run in executors)
+    def __init__(
+        self,
+        data_manager,
+        embedder=None,
+        max_concurrency: int = None,
+        encode_workers: int = 1,
+        encode_window_ms: float = 5,
+        max_encode_batch: int = 64,
+    ):
+        """
+        data_manager: Synchronous store; with Milvus each call borrows its own pooled connection
+        embedder: MilvusEmbedder for raw text queries (encoding never runs on the event loop)
+        max_concurrency: Store calls in flight at once (default: the connector's pool size, else 4)
+        encode_workers: Threads running embedder.encode
+        encode_window_ms: Concurrent text queries arriving within this window share one encode call
+        max_encode_batch: Upper bound of texts per coalesced encode call
+        """
+        self.data_manager = data_manager
+        self.embedder = embedder
+        connector = getattr(data_manager, "connector", None)
+        self.max_concurrency = max_concurrency or getattr(connector, "pool_size", 4)
+        self.encode_window = encode_window_ms / 1000.0
+        self.max_encode_batch = max_encode_batch
+        self._io_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="milvus-io"
+        )
+        self._encode_pool = ThreadPoolExecutor(
+            max_workers=encode_workers, thread_name_prefix="milvus-encode"
+        )
+        # ? Semaphores bind to the running loop, so they are created on first use
+        self._slots = None
+        self._pending = []  # ? (text, future) waiting for the next coalesced encode
+        self._flush_handle = None
+        self._tasks = set()  # ? The loop only keeps weak references to tasks
+
+    @property
+    def collection_name(self):
+        return self.data_manager.collection_name
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    # TODO: Run a blocking store call on the I/O pool, at most max_concurrency at a time
+    async def _call(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        async with self._semaphore():
+            return await loop.run_in_executor(
+                self._io_pool, lambda: fn(*args, **kwargs)
+            )
+
+    # TODO: Encode texts on the encode pool; returns one vector per text
+    async def encode(self, texts: list, batch_size: int = 32):
+        if self.embedder is None:
+            raise ValueError("Raw text queries need an embedder.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._encode_pool,
+            lambda: self.embedder.encode(
+                list(texts), batch_size=batch_size, show_progress_bar=False
+            ),
+        )
+
+    # TODO: Encode one query text, sharing an encode call with other texts that arrive within the window
+    async def encode_query(self, text: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((normalize_prompt(text), future))
+        if len(self._pending) >= self.max_encode_batch:
+            self._flush_encodes()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(
+                self.encode_window, self._flush_encodes
+            )
+        return await future
+
+    def _flush_encodes(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._encode_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _encode_batch(self, batch):
+        try:
+            vectors = await self.encode([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+    # TODO: Insert rows in batches; up to max_concurrency batches are written concurrently
+    async def insert(self, ids, embeddings, texts, metadata=None, batch_size=500):
+        total = len(ids)
+
+        async def insert_batch(start):
+            end = min(start + batch_size, total)
+            batch_meta = (
+                {k: v[start:end] for k, v in metadata.items()} if metadata else None
+            )
+            await self._call(
+                self.data_manager.insert_embeddings,
+                ids[start:end],
+                embeddings[start:end],
+                texts[start:end],
+                batch_meta,
+            )
+
+        await asyncio.gather(
+            *(insert_batch(start) for start in range(0, total, batch_size))
+        )
+        logging.info(
+            f"Async insert of {total} rows into '{self.collection_name}' completed."
+        )
+
+    # TODO: Insert or overwrite records by primary key
+    async def upsert(self, ids, embeddings, texts, metadata=None):
+        await self._call(
+            self.data_manager.upsert_embeddings, ids, embeddings, texts, metadata
+        )
+
+    # TODO: Delete records by primary key
+    async def delete(self, ids):
+        await self._call(self.data_manager.delete_by_ids, ids)
+
+    async def flush(self):
+        await self._call(self.data_manager.flush)
+
+    # TODO: Top-k for one query vector or raw text
+    async def search(self, query, top_k=5, filters=None, expr=None):
+        if isinstance(query, str):
+            query = await self.encode_query(query)
+        return await self._call(
+            self.data_manager.search, query, top_k=top_k, filters=filters, expr=expr
+        )
+
+    # TODO: Many queries (vectors or raw texts) in one store call; same options as the sync search_many
+    async def search_many(self, queries, top_k=5, batch_size=32, **kwargs):
+        if len(queries) and isinstance(queries[0], str):
+            queries = await self.encode(
+                [normalize_prompt(q) for q in queries], batch_size=batch_size
+            )
+        return await self._call(
+            self.data_manager.search_many, queries, top_k=top_k, **kwargs
+        )
+
+    # TODO: Shut the executors down (pending calls finish first)
+    def close(self):
+        self._io_pool.shutdown(wait=True)
+        self._encode_pool.shutdown(wait=True)
+
+    # TODO: Encode whatever is still queued, wait for in-flight encode batches, then close
+    async def aclose(self):
+        self._flush_encodes()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+        return False
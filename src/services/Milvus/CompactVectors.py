@@ -0,0 +1,140 @@
+import numpy as np
+
+# ? "float32": FLOAT_VECTOR (reference), "float16": FLOAT16_VECTOR, "binary": sign bits in a BINARY_VECTOR
+VECTOR_MODES = ("float32", "float16", "binary")
+
+
+# TODO: Bytes one stored vector takes in a mode (raw vector data, index overhead not included)
+def bytes_per_vector(mode: str, dimension: int) -> float:
+    if mode not in VECTOR_MODES:
+        raise ValueError(f"Unknown vector mode '{mode}' (use one of {VECTOR_MODES}).")
+    return {"float32": 4.0, "float16": 2.0, "binary": 1 / 8}[mode] * dimension
+
+
+# TODO: Convert float vectors to what the mode's vector field accepts on insert/search
+def to_storage(vectors, mode: str):
+    if mode == "float32":
+        return vectors
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    if mode == "float16":
+        return list(matrix.astype(np.float16))
+    if mode == "binary":
+        # ? One bit per dimension: 1 where the component is positive (dimension must be a multiple of 8)
+        return [row.tobytes() for row in np.packbits(matrix > 0, axis=1)]
+    raise ValueError(f"Unknown vector mode '{mode}' (use one of {VECTOR_MODES}).")
+
+
+# TODO: Decode vectors read back from a collection into a float32 matrix (binary -> +-1 per bit)
+def from_storage(values, mode: str, dimension: int) -> np.ndarray:
+    rows = []
+    for value in values:
+        if isinstance(value, (list, tuple)) and value and isinstance(value[0], bytes):
+            value = value[0]  # ? pymilvus wraps binary/float16 query output in a list
+        if mode == "binary":
+            bits = np.unpackbits(np.frombuffer(bytes(value), dtype=np.uint8))
+            rows.append(bits[:dimension].astype(np.float32) * 2 - 1)
+        elif isinstance(value, (bytes, bytearray)):
+            rows.append(np.frombuffer(value, dtype=np.float16).astype(np.float32))
+        else:
+            rows.append(np.asarray(value, dtype=np.float32))
+    return np.asarray(rows, dtype=np.float32).reshape(-1, dimension)
+
+
+def _unit(matrix) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+# TODO: Order candidates by exact cosine against their full-precision vectors
+def rerank(query, candidate_vectors, top_k: int) -> tuple:
+    """
+    candidate_vectors: Full-precision vectors of the candidates; NaN rows (unknown ids) sort last
+    Returns: (positions into candidate_vectors, cosine scores), best first, at most top_k
+    """
+    q = _unit(np.asarray(query, dtype=np.float32)[None, :])[0]
+    scores = _unit(np.nan_to_num(candidate_vectors, nan=0.0)) @ q
+    scores[np.isnan(candidate_vectors).any(axis=1)] = -np.inf
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return order, scores[order]
+
+
+# TODO: Memory and recall@k of every mode against exact float32 cosine search (brute force, no server)
+def compare_modes(
+    vectors,
+    queries,
+    top_k: int = 10,
+    rerank_factor: int = 4,
+    modes: tuple = VECTOR_MODES,
+    chunk_size: int = 256,
+) -> dict:
+    """
+    rerank_factor: Candidates fetched per result before the full-precision rerank (1 disables it)
+    Returns: {mode or "<mode>+rerank": {bytes_per_vector, vector_mb, saved_pct, recall, recall_lost,
+              rerank_disk_mb}}
+    """
+    corpus, q = _unit(vectors), _unit(queries)
+    n, dimension = corpus.shape
+    k = min(top_k, n)
+    wide = min(n, k * rerank_factor)
+    encoded = {
+        "float32": corpus,
+        "float16": corpus.astype(np.float16).astype(np.float32),
+        # ? +-1 vectors: the dot product is dimension - 2 * Hamming distance, same ranking
+        "binary": np.where(corpus > 0, 1.0, -1.0).astype(np.float32),
+    }
+
+    hits = {}
+    for start in range(0, len(q), chunk_size):
+        block = q[start : start + chunk_size]
+        exact_scores = block @ corpus.T
+        truth = _top_k(exact_scores, k)
+        for mode in modes:
+            query_block = (
+                np.where(block > 0, 1.0, -1.0).astype(np.float32)
+                if mode == "binary"
+                else block
+            )
+            scores = query_block @ encoded[mode].T
+            variants = [(mode, k)]
+            if rerank_factor > 1 and mode != "float32":
+                variants.append((f"{mode}+rerank", wide))
+            for name, limit in variants:
+                found = _top_k(scores, limit)
+                if limit > k:
+                    # ? Rescore the widened candidates with the full-precision vectors
+                    exact = np.take_along_axis(exact_scores, found, axis=1)
+                    found = np.take_along_axis(
+                        found, np.argsort(-exact, axis=1)[:, :k], axis=1
+                    )
+                hits[name] = hits.get(name, 0) + sum(
+                    len(set(t) & set(f)) for t, f in zip(truth, found)
+                )
+
+    baseline = bytes_per_vector("float32", dimension) * n
+    report = {}
+    for name, count in hits.items():
+        mode = name.split("+")[0]
+        size = bytes_per_vector(mode, dimension) * n
+        recall = count / (len(q) * k)
+        report[name] = {
+            "bytes_per_vector": bytes_per_vector(mode, dimension),
+            "vector_mb": round(size / 2**20, 2),
+            "saved_pct": round((1 - size / baseline) * 100, 1),
+            "recall": round(recall, 4),
+            "recall_lost": round(1 - recall, 4),
+            # ? The rerank copy lives on disk (memory-mapped); only candidates are read
+            "rerank_disk_mb": (
+                round(baseline / 2**20, 2) if name.endswith("+rerank") else 0.0
+            ),
+        }
+    return report
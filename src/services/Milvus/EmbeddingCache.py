@@ -0,0 +1,152 @@
+import hashlib  # Content-addressed cache keys
+import logging
+import os
+import sqlite3  # Single-file on-disk key/value store, no extra dependency
+import threading
+import time
+
+import numpy as np
+
+
+class EmbeddingCache:
+    # TODO: Open (or create) an on-disk embedding cache bounded to max_bytes of vector data
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Args: cache_dir (str): Folder holding the cache database.
+              max_bytes (int): Upper bound on stored vector bytes before eviction kicks in.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, "embeddings.sqlite")
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+        # ? Running total of stored vector bytes: one scan on open, then kept up to date on writes
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        logging.info(f"Embedding cache opened at '{self.db_path}'.")
+
+    # TODO: Build the cache key from (model name, normalize flag, text hash)
+    @staticmethod
+    def make_key(model_name: str, normalize: bool, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model_name}|{int(bool(normalize))}|{text_hash}"
+
+    # TODO: Look up many keys at once; returns {key: float32 vector} for the hits only
+    def get_many(self, keys: list) -> dict:
+        found = {}
+        if not keys:
+            return found
+
+        with self._lock:
+            # ? SQLite caps bound parameters per statement, so query in slices
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    # TODO: Store freshly encoded vectors, then evict least recently used entries if over budget
+    def put_many(self, keys: list, vectors):
+        if len(keys) != len(vectors):
+            raise ValueError("Keys and vectors length mismatch.")
+        if not keys:
+            return
+
+        now = time.time()
+        rows = {}  # ? Last vector wins for keys repeated within one call
+        for key, vec in zip(keys, vectors):
+            vec = np.asarray(vec, dtype=np.float32)
+            rows[key] = (key, int(vec.shape[0]), vec.tobytes(), now)
+        rows = list(rows.values())
+
+        with self._lock:
+            # ? Replaced entries give their old bytes back to the running total
+            replaced = 0
+            unique_keys = [row[0] for row in rows]
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                replaced += self._conn.execute(
+                    "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+                    f" WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._total_bytes += sum(len(row[2]) for row in rows) - replaced
+            self._evict()
+
+    # TODO: Drop least recently used vectors until the stored bytes fit max_bytes
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        excess = self._total_bytes - self.max_bytes
+        freed = 0
+        evicted = []
+        for key, size in self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access ASC"
+        ):
+            evicted.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evicted)
+        self._conn.commit()
+        self._total_bytes -= freed
+        logging.info(f"Embedding cache evicted {len(evicted)} entries ({freed} bytes).")
+
+    # TODO: Number of cached vectors (useful for debugging)
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    # TODO: Remove every cached vector
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._total_bytes = 0
+        logging.info("Embedding cache cleared.")
+
+    # TODO: Close the underlying database file
+    def close(self):
+        with self._lock:
+            self._conn.close()
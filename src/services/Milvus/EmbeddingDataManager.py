@@ -1,9 +1,13 @@
 import pandas as pd
+import numpy as np
 import os
 import logging
-from MilvusEmbedder import MilvusEmbedder
-from MilvusDataManager import MilvusDataManager
-from MilvusConnector import MilvusConnector
+from services.Milvus.MilvusEmbedder import MilvusEmbedder
+from services.Milvus.MilvusDataManager import MilvusDataManager
+from services.Milvus.MilvusConnector import MilvusConnector
+
+# ? Small row groups let load_rows/load_rows_by_id skip most of a large sidecar
+SIDECAR_ROW_GROUP = 65536
 
 
 class EmbeddingDataManager:
@@ -27,7 +31,13 @@ class EmbeddingDataManager:
         if not texts:
             raise ValueError("Empty text list provided for embedding.")
         logging.info(f"Generating embeddings for {len(texts)} texts.")
-        embeddings = self.embedder.encode(texts, batch_size=batch_size)
+        # ? The embedder checks its persistent cache first; only misses reach the model
+        embeddings = self.embedder.encode(list(texts), batch_size=batch_size)
+        cache = getattr(self.embedder, "cache", None)
+        if cache is not None:
+            logging.info(
+                f"Embedding cache totals: {cache.hits} hits, {cache.misses} misses."
+            )
         return embeddings
 
     # TODO: Save your embeddings (and corresponding texts) to disk as CSV
@@ -64,14 +74,147 @@ class EmbeddingDataManager:
         logging.info(f"Loaded {len(descriptions)} embeddings from CSV '{filepath}'.")
         return descriptions, embeddings
 
-    # TODO: Push embeddings + descriptions to Milvus using auto-generated integer IDs
-    def insert_into_milvus(self, descriptions: list, embeddings: list):
+    # TODO: Resolve the matrix (.npy) and sidecar (.parquet) paths for a binary embeddings store
+    @staticmethod
+    def _binary_paths(basepath: str):
+        root, ext = os.path.splitext(basepath)
+        if ext in (".npy", ".parquet"):
+            basepath = root
+        return f"{basepath}.npy", f"{basepath}.parquet"
+
+    # TODO: Save embeddings as a float32 .npy matrix plus a columnar sidecar for descriptions and ids
+    def save_to_npy(self, descriptions: list, embeddings, basepath: str, ids=None):
+        """
+        Args: descriptions (list): Texts matching each embedding row.
+              embeddings (array-like): 2-D array of vectors, stored as float32.
+              basepath (str): Path without extension; '<basepath>.npy' and '<basepath>.parquet' are written.
+              ids (list): Optional ids per row (defaults to row position).
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError("Embeddings must be a 2-D array of vectors.")
+        if len(descriptions) != matrix.shape[0]:
+            raise ValueError("Descriptions and embeddings length mismatch.")
+        if ids is None:
+            ids = range(matrix.shape[0])
+        elif len(ids) != matrix.shape[0]:
+            raise ValueError("Ids and embeddings length mismatch.")
+
+        matrix_path, sidecar_path = self._binary_paths(basepath)
+        os.makedirs(os.path.dirname(os.path.abspath(matrix_path)), exist_ok=True)
+        np.save(matrix_path, np.ascontiguousarray(matrix))
+        pd.DataFrame(
+            {"id": np.asarray(ids, dtype=np.int64), "description": list(descriptions)}
+        ).to_parquet(sidecar_path, index=False, row_group_size=SIDECAR_ROW_GROUP)
+        logging.info(
+            f"Saved {matrix.shape[0]} embeddings (dim={matrix.shape[1]}) to '{matrix_path}'."
+        )
+
+    # TODO: Load a binary embeddings store; the matrix is memory-mapped (zero-copy) by default
+    def load_from_npy(self, basepath: str, mmap: bool = True):
+        """
+        Returns: (descriptions, embeddings, ids) where embeddings is a float32 np.ndarray
+                 (np.memmap when mmap=True, so slicing rows only reads those rows).
+        """
+        matrix_path, sidecar_path = self._binary_paths(basepath)
+        for path in (matrix_path, sidecar_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Embeddings file not found: {path}")
+
+        embeddings = np.load(matrix_path, mmap_mode="r" if mmap else None)
+        sidecar = pd.read_parquet(sidecar_path)
+        if len(sidecar) != embeddings.shape[0]:
+            raise ValueError(
+                f"Sidecar '{sidecar_path}' has {len(sidecar)} rows but matrix has {embeddings.shape[0]}."
+            )
+
+        logging.info(f"Loaded {embeddings.shape[0]} embeddings from '{matrix_path}'.")
+        return sidecar["description"].tolist(), embeddings, sidecar["id"].to_numpy()
+
+    # TODO: Read only rows [start, stop) of a binary embeddings store
+    def load_rows(self, basepath: str, start: int, stop: int):
+        import pyarrow.parquet as pq
+
+        matrix_path, sidecar_path = self._binary_paths(basepath)
+        embeddings = np.load(matrix_path, mmap_mode="r")
+        start, stop = max(0, start), min(stop, embeddings.shape[0])
+
+        # ? Only the row groups overlapping [start, stop) are read from the sidecar
+        sidecar_file = pq.ParquetFile(sidecar_path)
+        groups, first_row, offset = [], None, 0
+        for i in range(sidecar_file.num_row_groups):
+            rows = sidecar_file.metadata.row_group(i).num_rows
+            if offset < stop and offset + rows > start:
+                groups.append(i)
+                first_row = offset if first_row is None else first_row
+            offset += rows
+        if not groups or start >= stop:
+            return [], np.array(embeddings[0:0]), np.empty(0, dtype=np.int64)
+        sidecar = sidecar_file.read_row_groups(groups, columns=["id", "description"])
+        sidecar = sidecar.slice(start - first_row, stop - start)
+        return (
+            sidecar.column("description").to_pylist(),
+            np.array(embeddings[start:stop]),
+            sidecar.column("id").to_numpy(),
+        )
+
+    # TODO: Read only the rows with the given ids (in store order) of a binary embeddings store
+    def load_rows_by_id(self, basepath: str, ids: list):
+        import pyarrow.parquet as pq
+
+        matrix_path, sidecar_path = self._binary_paths(basepath)
+        embeddings = np.load(matrix_path, mmap_mode="r")
+        wanted = [int(i) for i in ids]
+        # ? The id column alone gives the matrix positions; descriptions are read through a
+        #   filter on id, so row groups whose id statistics exclude every wanted id are skipped
+        all_ids = pq.read_table(sidecar_path, columns=["id"]).column("id").to_numpy()
+        positions = np.flatnonzero(np.isin(all_ids, wanted))
+        sidecar = pq.read_table(
+            sidecar_path, columns=["id", "description"], filters=[("id", "in", wanted)]
+        )
+        return (
+            sidecar.column("description").to_pylist(),
+            np.array(embeddings[positions]),
+            sidecar.column("id").to_numpy(),
+        )
+
+    # TODO: Migrate an existing CSV export (from save_to_csv) to the binary format
+    def convert_csv_to_npy(self, csv_path: str, basepath: str = None):
+        if basepath is None:
+            basepath = os.path.splitext(csv_path)[0]
+        if not os.path.exists(csv_path):
+            raise FileNotFoundError(f"CSV file not found: {csv_path}")
+
+        df = pd.read_csv(csv_path)
+        if "description" not in df.columns or "embedding" not in df.columns:
+            raise ValueError(
+                "CSV missing required columns 'description' and/or 'embedding'."
+            )
+
+        # ? Parse the whole embedding column in one vectorized pass instead of per row
+        flat = ",".join(df["embedding"].astype(str))
+        matrix = np.array(flat.split(","), dtype=np.float32)
+        if len(df) and matrix.size % len(df):
+            raise ValueError("Embeddings in CSV do not share a single dimension.")
+        matrix = matrix.reshape(len(df), -1)
+
+        ids = df["id"].tolist() if "id" in df.columns else None
+        self.save_to_npy(df["description"].tolist(), matrix, basepath, ids=ids)
+        logging.info(f"Converted '{csv_path}' to binary store '{basepath}'.")
+        return basepath
+
+    # TODO: Push embeddings + descriptions to Milvus; pass stable ids (see IncrementalIngestor) to avoid positional IDs
+    def insert_into_milvus(
+        self, descriptions: list, embeddings: list, ids: list = None
+    ):
         if not self.data_manager:
             raise RuntimeError(
                 "MilvusDataManager not initialized. Provide connector and collection_name."
             )
 
-        ids = list(range(1, len(descriptions) + 1))
+        if ids is None:
+            # ? Positional IDs shift on any reorder; only suitable for a full rebuild
+            ids = list(range(1, len(descriptions) + 1))
         result = self.data_manager.insert_embeddings(ids, embeddings, descriptions)
         logging.info(
             f"Inserted {len(ids)} records into Milvus collection '{self.collection_name}'."
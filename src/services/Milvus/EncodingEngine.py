@@ -0,0 +1,158 @@
+import logging
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+_worker_model = None  # One SentenceTransformer per worker process
+
+
+# TODO: Pool initializer — load the model once per worker and pin its thread count
+def _init_worker(model_name: str, threads_per_worker: int, backend: str = "torch"):
+    global _worker_model
+    from services.Milvus.MilvusEmbedder import load_sentence_model
+
+    if backend == "torch":
+        import torch
+
+        torch.set_num_threads(threads_per_worker)
+        _worker_model = load_sentence_model(model_name, backend)
+    else:
+        # ? sentence_transformers still imports torch, but ONNX inference threads are
+        #   onnxruntime's own, so the cap goes into its session options instead
+        _worker_model = load_sentence_model(
+            model_name, backend, threads=threads_per_worker
+        )
+
+
+# TODO: Encode one length-homogeneous chunk; returns (input positions, float32 embeddings)
+def _encode_chunk(task):
+    positions, texts, batch_size, normalize = task
+    embeddings = _worker_model.encode(
+        texts,
+        batch_size=batch_size,
+        show_progress_bar=False,
+        normalize_embeddings=normalize,
+        convert_to_numpy=True,
+    )
+    return positions, np.asarray(embeddings, dtype=np.float32)
+
+
+class EncodingEngine:
+    # TODO: Multi-process encoder: texts are bucketed by token length and spread over worker processes
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        num_workers: int = None,
+        batch_size: int = 32,
+        chunk_batches: int = 4,
+        normalize: bool = True,
+        backend: str = "torch",
+    ):
+        """
+        model_name: SentenceTransformer model each worker loads
+        num_workers: Worker processes (defaults to the CPU count); threads are split evenly among them
+        batch_size: Model batch size inside a worker
+        chunk_batches: Batches per task sent to a worker (bigger = less IPC, coarser load balancing)
+        normalize: Unit-normalize embeddings (matches MilvusEmbedder default)
+        backend: Inference backend each worker loads (see MilvusEmbedder.BACKENDS)
+        """
+        self.model_name = model_name
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.chunk_size = batch_size * chunk_batches
+        self.normalize = normalize
+        self.backend = backend
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // self.num_workers)
+        self.last_stats = None
+        self._pool = None
+        self._tokenizer = None
+
+    # TODO: Start the worker pool on first use ('spawn' avoids forking a process that holds torch state)
+    def _get_pool(self):
+        if self._pool is None:
+            ctx = mp.get_context("spawn")
+            self._pool = ctx.Pool(
+                self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.model_name, self.threads_per_worker, self.backend),
+            )
+            logging.info(
+                f"Encoding engine started {self.num_workers} workers "
+                f"({self.threads_per_worker} threads each)."
+            )
+        return self._pool
+
+    # TODO: Token count per text (model tokenizer when available, word count otherwise)
+    def _token_lengths(self, texts: list) -> np.ndarray:
+        if self._tokenizer is None:
+            try:
+                from transformers import AutoTokenizer
+
+                name = self.model_name
+                if "/" not in name:
+                    name = f"sentence-transformers/{name}"
+                self._tokenizer = AutoTokenizer.from_pretrained(name)
+            except Exception as e:
+                logging.info(f"Tokenizer unavailable ({e}); bucketing by word count.")
+                self._tokenizer = False
+        if self._tokenizer:
+            encoded = self._tokenizer(texts, add_special_tokens=True, truncation=False)
+            return np.array([len(ids) for ids in encoded["input_ids"]])
+        return np.array([len(t.split()) for t in texts])
+
+    # TODO: Encode texts; returns a float32 array in input order and records texts/sec
+    def encode(self, texts: list, normalize: bool = None) -> np.ndarray:
+        if normalize is None:
+            normalize = self.normalize
+        if not texts:
+            raise ValueError("Input must be a non-empty list of strings.")
+
+        started = time.perf_counter()
+        # ? Sorting by length makes every chunk (and so every model batch) pad to a similar length
+        order = np.argsort(self._token_lengths(texts), kind="stable")
+        tasks = [
+            (
+                order[start : start + self.chunk_size],
+                [texts[i] for i in order[start : start + self.chunk_size]],
+                self.batch_size,
+                normalize,
+            )
+            for start in range(0, len(texts), self.chunk_size)
+        ]
+
+        output = None
+        for positions, embeddings in self._get_pool().imap_unordered(
+            _encode_chunk, tasks
+        ):
+            if output is None:
+                output = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+            output[positions] = embeddings
+
+        elapsed = time.perf_counter() - started
+        self.last_stats = {
+            "texts": len(texts),
+            "workers": self.num_workers,
+            "seconds": round(elapsed, 3),
+            "texts_per_sec": round(len(texts) / elapsed, 1) if elapsed else 0.0,
+        }
+        logging.info(
+            f"Encoded {len(texts)} texts in {elapsed:.2f}s "
+            f"({self.last_stats['texts_per_sec']} texts/sec, {self.num_workers} workers)."
+        )
+        return output
+
+    # TODO: Stop the worker processes (safe to call more than once)
+    def close(self):
+        if self._pool is not None:
+            # ? encode() always drains its results, so nothing is lost by terminating
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+
+import pandas as pd
+
+from services.HelperClass import HelperClass
+from services.Milvus.IngestionPipeline import IngestionPipeline
+
+helper = HelperClass()
+
+
+# TODO: Add stable 'id' and 'contenthash' columns derived from (source workbook, normalized tcid)
+def assign_stable_ids(
+    df: pd.DataFrame,
+    text_column: str = "description",
+    source_column: str = "sourcefile",
+    content_columns: list = None,
+) -> pd.DataFrame:
+    """
+    content_columns: Extra columns (e.g. filterable metadata) whose changes should also mark a row as changed
+    """
+    df = df.copy()
+    tcid_col = helper.findTCIDColumn(df.columns)
+    sources = (
+        df[source_column].astype(str)
+        if source_column in df.columns
+        else pd.Series("unknown", index=df.index)
+    )
+    texts = df[text_column].fillna("").astype(str).str.strip()
+
+    if tcid_col is not None:
+        tcids = df[tcid_col].astype(str).str.strip().str.lower()
+        missing = df[tcid_col].isna() | (tcids == "")
+    else:
+        logging.warning("No TCID column found; falling back to content-based keys.")
+        tcids = pd.Series("", index=df.index)
+        missing = pd.Series(True, index=df.index)
+
+    # ? Rows without a TCID are keyed on their text so they still stay stable across reorders
+    tcids = tcids.where(~missing, "row:" + texts.map(helper.contentHash))
+
+    # ? Repeated TCIDs inside one workbook get an occurrence suffix instead of colliding
+    occurrence = tcids.groupby([sources, tcids]).cumcount()
+    duplicates = int((occurrence > 0).sum())
+    if duplicates:
+        logging.warning(
+            f"{duplicates} rows share a TCID with an earlier row of the same workbook."
+        )
+    keys = tcids.where(occurrence == 0, tcids + "#" + occurrence.astype(str))
+
+    df["id"] = [helper.stableID(s, k) for s, k in zip(sources, keys)]
+    extra = [c for c in (content_columns or []) if c in df.columns]
+    if extra:
+        df["contenthash"] = [
+            helper.contentHash(t, *vals)
+            for t, vals in zip(texts, df[extra].itertuples(index=False, name=None))
+        ]
+    else:
+        df["contenthash"] = texts.map(helper.contentHash)
+    return df
+
+
+class IncrementalIngestor:
+    # TODO: Track what has already been ingested so re-runs only touch new, changed or deleted rows
+    def __init__(
+        self,
+        embedder,
+        data_manager,
+        state_path: str = None,
+        text_column: str = "description",
+        source_column: str = "sourcefile",
+    ):
+        """
+        embedder: MilvusEmbedder instance used to encode only new/changed rows
+        data_manager: MilvusDataManager instance that receives upserts and deletes
+        state_path: JSON file recording {id: {"hash", "source"}} of the last successful sync
+        text_column: Column that gets embedded
+        source_column: Column holding the source workbook name (added by DataLoaderClass)
+        """
+        self.embedder = embedder
+        self.data_manager = data_manager
+        self.text_column = text_column
+        self.source_column = source_column
+        if state_path is None:
+            local_path = getattr(data_manager, "path", None)
+            if local_path:
+                # ? Local backend keeps its sync state next to its vectors
+                state_path = os.path.join(local_path, "ingest_state.json")
+            else:
+                collection_name = getattr(data_manager, "collection_name", "default")
+                state_path = f"../data/interim/ingest_state_{collection_name}.json"
+        self.state_path = state_path
+        self.state = self._load_state()
+
+    # TODO: Read the previous sync state from disk (empty on first run)
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return {int(k): v for k, v in json.load(f).items()}
+
+    # TODO: Persist the sync state atomically so a crash never leaves a half-written file
+    def _save_state(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({str(k): v for k, v in self.state.items()}, f)
+        os.replace(tmp_path, self.state_path)
+
+    # TODO: Add stable 'id' and 'contenthash' columns (see assign_stable_ids)
+    def assign_ids(self, df: pd.DataFrame) -> pd.DataFrame:
+        return assign_stable_ids(
+            df, self.text_column, self.source_column, self._metadata_columns(df)
+        )
+
+    # TODO: Columns of the frame that map onto the collection's filterable scalar fields
+    def _metadata_columns(self, df: pd.DataFrame) -> list:
+        fields = getattr(self.data_manager, "filterable_fields", dict)()
+        return [name for name in fields if name in df.columns]
+
+    # TODO: Compare the current frame against the last sync; returns (new_ids, changed_ids, deleted_ids)
+    def diff(self, df: pd.DataFrame):
+        current = dict(zip(df["id"], df["contenthash"]))
+        new_ids = [i for i in current if i not in self.state]
+        changed_ids = [
+            i
+            for i in current
+            if i in self.state and self.state[i]["hash"] != current[i]
+        ]
+
+        # ? Only workbooks present in this run can lose rows; others were simply not selected
+        sources = (
+            set(df[self.source_column].astype(str))
+            if self.source_column in df.columns
+            else {"unknown"}
+        )
+        deleted_ids = [
+            i
+            for i, entry in self.state.items()
+            if i not in current and entry["source"] in sources
+        ]
+        return new_ids, changed_ids, deleted_ids
+
+    # TODO: Re-encode and upsert only new/changed rows, delete removed rows, then save the new state
+    def sync(self, df: pd.DataFrame, batch_size: int = 32, full: bool = False) -> dict:
+        """
+        full: Re-encode and upsert every row (e.g. after a model change); still keyed on the stable
+              ids, so re-runs never duplicate rows and the next delta sync starts from this state
+        """
+        # ? Always re-derive hashes so they cover the collection's metadata fields too
+        df = self.assign_ids(df)
+        df = df[df[self.text_column].fillna("").astype(str).str.strip() != ""]
+
+        new_ids, changed_ids, deleted_ids = self.diff(df)
+        logging.info(
+            f"Delta: {len(new_ids)} new, {len(changed_ids)} changed, {len(deleted_ids)} deleted."
+        )
+
+        touched = set(df["id"]) if full else set(new_ids) | set(changed_ids)
+        rows = df[df["id"].isin(touched)]
+        if not rows.empty:
+            ids = rows["id"].astype(int).tolist()
+            texts = rows[self.text_column].astype(str).str.strip().tolist()
+            # ? Upserts are idempotent, so a failed run (IngestionError) is safely redone next time
+            pipeline = IngestionPipeline(
+                self.embedder, self.data_manager, batch_size=batch_size, upsert=True
+            )
+            metadata = {c: rows[c].tolist() for c in self._metadata_columns(rows)}
+            pipeline.run(ids, texts, metadata)
+        if deleted_ids:
+            self.data_manager.delete_by_ids(deleted_ids)
+            self.data_manager.flush()
+
+        sources = (
+            rows[self.source_column].astype(str)
+            if self.source_column in rows.columns
+            else pd.Series("unknown", index=rows.index)
+        )
+        for i, h, s in zip(rows["id"], rows["contenthash"], sources):
+            self.state[int(i)] = {"hash": h, "source": s}
+        for i in deleted_ids:
+            self.state.pop(i, None)
+        self._save_state()
+
+        return {
+            "new": len(new_ids),
+            "changed": len(changed_ids),
+            "deleted": len(deleted_ids),
+            "unchanged": len(df) - len(touched),
+            "reencoded": len(rows),
+        }
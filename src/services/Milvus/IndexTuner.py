@@ -0,0 +1,274 @@
+import copy
+import json
+import logging
+import math
+import os
+import time
+
+import numpy as np
+
+from services.Milvus.CompactVectors import from_storage
+
+SEARCH_PARAMS_DIR = "../data/interim"
+
+# ? Row-count thresholds for AUTO index selection (HNSW keeps full vectors in RAM plus graph links;
+#   IVF_SQ8 stores 1 byte/dim, IVF_PQ compresses further for very large collections)
+HNSW_MAX_ROWS = 1_000_000
+IVF_SQ8_MAX_ROWS = 10_000_000
+BIN_FLAT_MAX_ROWS = 100_000
+
+
+# TODO: Pick index type and build params from the collection size
+def select_index(
+    num_rows: int, dimension: int = 384, metric_type="COSINE", vector_mode="float32"
+) -> dict:
+    """
+    vector_mode: "binary" collections get a Hamming index (metric_type is ignored);
+                 "float16" uses the same index types as float32
+    """
+    if vector_mode == "binary":
+        # ? Bit vectors are tiny: exact BIN_FLAT is fine until the scan itself gets slow
+        if num_rows <= BIN_FLAT_MAX_ROWS:
+            return {"index_type": "BIN_FLAT", "params": {}, "metric_type": "HAMMING"}
+        nlist = int(min(65536, max(64, 4 * math.sqrt(num_rows))))
+        return {
+            "index_type": "BIN_IVF_FLAT",
+            "params": {"nlist": nlist},
+            "metric_type": "HAMMING",
+        }
+    if num_rows <= HNSW_MAX_ROWS:
+        return {
+            "index_type": "HNSW",
+            "params": {"M": 16, "efConstruction": 200},
+            "metric_type": metric_type,
+        }
+    # ? Rule of thumb: nlist ~ 4 * sqrt(rows), clamped to Milvus' [1, 65536]
+    nlist = int(min(65536, max(64, 4 * math.sqrt(num_rows))))
+    if num_rows <= IVF_SQ8_MAX_ROWS:
+        return {
+            "index_type": "IVF_SQ8",
+            "params": {"nlist": nlist},
+            "metric_type": metric_type,
+        }
+    # ? PQ needs m to divide the dimension; ~8 dims per sub-quantizer
+    m = max(d for d in range(1, dimension // 8 + 1) if dimension % d == 0)
+    return {
+        "index_type": "IVF_PQ",
+        "params": {"nlist": nlist, "m": m, "nbits": 8},
+        "metric_type": metric_type,
+    }
+
+
+# TODO: Reasonable untuned search params for an index description
+def default_search_params(index_params: dict, top_k: int = 10) -> dict:
+    index_type = index_params.get("index_type", "IVF_FLAT")
+    metric_type = index_params.get("metric_type", "COSINE")
+    build = index_params.get("params", {}) or {}
+    if isinstance(build, str):
+        build = json.loads(build)
+    if index_type == "HNSW":
+        params = {"ef": max(64, top_k)}
+    elif "IVF" in index_type:
+        params = {"nprobe": max(10, int(build.get("nlist", 128)) // 64)}
+    else:
+        params = {}
+    return {"metric_type": metric_type, "params": params}
+
+
+# TODO: Copy of search params whose HNSW ef is at least the requested limit (Milvus rejects ef < limit)
+def clamp_search_params(search_params: dict, limit: int) -> dict:
+    """
+    Tuned / default ef values are floors: a search asking for more results raises ef to its limit.
+    """
+    params = (search_params or {}).get("params") or {}
+    if "ef" not in params or int(params["ef"]) >= limit:
+        return search_params
+    clamped = copy.deepcopy(search_params)
+    clamped["params"]["ef"] = int(limit)
+    return clamped
+
+
+def search_params_path(collection_name: str) -> str:
+    return os.path.join(SEARCH_PARAMS_DIR, f"search_params_{collection_name}.json")
+
+
+# TODO: Tuned search params persisted by IndexTuner (None if the collection was never tuned)
+def load_search_params(collection_name: str):
+    path = search_params_path(collection_name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)["search_params"]
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Ignoring unreadable search params file {path}: {e}")
+        return None
+
+
+# TODO: Forget persisted search params (they were tuned for an index that has been replaced)
+def clear_search_params(collection_name: str):
+    path = search_params_path(collection_name)
+    if os.path.exists(path):
+        os.remove(path)
+        logging.info(f"Removed stale search params {path}; re-run `tune`.")
+
+
+class IndexTuner:
+    # TODO: Measure recall@k vs latency against exact ground truth and persist the best search params
+    def __init__(self, data_manager, top_k: int = 10, target_recall: float = 0.95):
+        """
+        data_manager: MilvusDataManager of the collection to tune
+        top_k: k used for recall@k and for every timed search
+        target_recall: The fastest setting reaching this recall is chosen
+        """
+        self.data_manager = data_manager
+        self.top_k = top_k
+        self.target_recall = target_recall
+
+    # TODO: Read every (id, vector) of the collection (for exact ground truth)
+    def fetch_corpus(self, batch_size: int = 1000):
+        collection = self.data_manager.connector.collection(
+            self.data_manager.collection_name
+        )
+        collection.load()
+        iterator = collection.query_iterator(
+            batch_size=batch_size, output_fields=["id", "embedding"]
+        )
+        ids, vectors = [], []
+        while True:
+            rows = iterator.next()
+            if not rows:
+                iterator.close()
+                break
+            for row in rows:
+                ids.append(row["id"])
+                vectors.append(row["embedding"])
+        # ? float16 / binary fields come back as bytes; binary decodes to +-1 (cosine ranks like Hamming)
+        dimension = next(
+            f.params["dim"] for f in collection.schema.fields if f.name == "embedding"
+        )
+        mode = getattr(self.data_manager, "vector_mode", lambda: "float32")()
+        return np.asarray(ids, dtype=np.int64), from_storage(vectors, mode, dimension)
+
+    # TODO: Exact cosine top-k ids for each query (brute force)
+    def ground_truth(self, queries, corpus_ids, corpus_vectors, chunk_size=256):
+        def unit(m):
+            norms = np.linalg.norm(m, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            return m / norms
+
+        q, c = unit(np.asarray(queries, np.float32)), unit(corpus_vectors)
+        k = min(self.top_k, len(corpus_ids))
+        truth = []
+        for start in range(0, len(q), chunk_size):
+            scores = q[start : start + chunk_size] @ c.T
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            truth.extend(set(corpus_ids[row].tolist()) for row in top)
+        return truth
+
+    # TODO: Candidate values for the index's search-time knob
+    def candidates(self, index_type: str, nlist: int = 128) -> tuple:
+        if index_type == "HNSW":
+            values = [self.top_k, 16, 32, 64, 128, 256, 512]
+            return "ef", sorted({v for v in values if v >= self.top_k})
+        if "IVF" in index_type:
+            values = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024]
+            return "nprobe", [v for v in values if v <= nlist]
+        return None, [None]
+
+    # TODO: Sweep the knob, report the recall/latency curve, choose and persist the best setting
+    def tune(self, queries=None, num_queries: int = 200, seed: int = 0) -> dict:
+        """
+        queries: Query vectors (default: num_queries vectors sampled from the collection)
+        Returns {index, curve: [{param, value, recall, p50_ms, p95_ms}], chosen, search_params}
+        """
+        corpus_ids, corpus_vectors = self.fetch_corpus()
+        if len(corpus_ids) == 0:
+            raise ValueError(
+                f"Collection '{self.data_manager.collection_name}' is empty."
+            )
+        if queries is None:
+            rng = np.random.default_rng(seed)
+            rows = rng.choice(
+                len(corpus_ids), min(num_queries, len(corpus_ids)), replace=False
+            )
+            queries = corpus_vectors[rows]
+        truth = self.ground_truth(queries, corpus_ids, corpus_vectors)
+
+        index = self.data_manager.index_params()
+        build = index.get("params", {}) or {}
+        if isinstance(build, str):
+            build = json.loads(build)
+        knob, values = self.candidates(
+            index.get("index_type", ""), int(build.get("nlist", 128))
+        )
+
+        # ? The sweep measures the index itself: no full-precision rerank of compact collections
+        extra = {"rerank": False} if hasattr(self.data_manager, "rerank_store") else {}
+        curve = []
+        for value in values:
+            params = {
+                "metric_type": index.get("metric_type", "COSINE"),
+                "params": {knob: value} if knob else {},
+            }
+            latencies, hits = [], 0
+            for query, expected in zip(queries, truth):
+                started = time.perf_counter()
+                result = self.data_manager.search_many(
+                    [query],
+                    top_k=self.top_k,
+                    output_fields=[],
+                    search_params=params,
+                    **extra,
+                )[0]
+                latencies.append(time.perf_counter() - started)
+                hits += len(expected & {r["id"] for r in result})
+            point = {
+                "param": knob,
+                "value": value,
+                "recall": round(hits / sum(len(t) for t in truth), 4),
+                "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+                "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+                "search_params": params,
+            }
+            curve.append(point)
+            logging.info(
+                f"{knob}={value}: recall@{self.top_k}={point['recall']}, p50={point['p50_ms']} ms"
+            )
+
+        good = [p for p in curve if p["recall"] >= self.target_recall]
+        chosen = (
+            min(good, key=lambda p: p["p50_ms"])
+            if good
+            else max(curve, key=lambda p: p["recall"])
+        )
+        if not good:
+            logging.warning(
+                f"No setting reached recall {self.target_recall}; using the most accurate one."
+            )
+
+        report = {
+            "collection": self.data_manager.collection_name,
+            "rows": int(len(corpus_ids)),
+            "queries": int(len(queries)),
+            "top_k": self.top_k,
+            "target_recall": self.target_recall,
+            "index": index,
+            "curve": curve,
+            "chosen": {k: chosen[k] for k in ("param", "value", "recall", "p50_ms")},
+            "search_params": chosen["search_params"],
+        }
+        # ? The chosen ef is a floor for larger searches: search_many raises it to each call's limit
+        self.save(report)
+        self.data_manager.search_params = chosen["search_params"]
+        return report
+
+    # TODO: Persist the report; MilvusDataManager picks search_params up on the next start
+    def save(self, report: dict):
+        path = search_params_path(self.data_manager.collection_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp, path)
+        logging.info(f"Search params saved to {path}: {report['search_params']}")
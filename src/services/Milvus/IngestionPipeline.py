@@ -0,0 +1,225 @@
+import logging
+import queue  # Bounded queues give backpressure between the encode and insert stages
+import threading
+import time
+
+from services.Instrumentation import span
+
+_STOP = object()  # Sentinel telling a worker its input queue is exhausted
+
+
+class IngestionError(RuntimeError):
+    # TODO: Raised after a run when one or more batches failed every retry
+    def __init__(self, failed_batches):
+        self.failed_batches = failed_batches
+        ranges = ", ".join(f"{b['start']}-{b['end']}" for b in failed_batches)
+        super().__init__(
+            f"{len(failed_batches)} batches failed after retries: {ranges}"
+        )
+
+
+class IngestionPipeline:
+    # TODO: Producer/consumer engine that overlaps MilvusEmbedder.encode with Milvus inserts
+    def __init__(
+        self,
+        embedder,
+        data_manager,
+        batch_size: int = 16,
+        encode_workers: int = 1,
+        insert_workers: int = 2,
+        queue_size: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        upsert: bool = False,
+    ):
+        """
+        embedder: MilvusEmbedder instance (encode stage)
+        data_manager: MilvusDataManager instance (insert stage)
+        batch_size: Rows per batch flowing through the pipeline
+        encode_workers / insert_workers: Worker threads per stage
+        queue_size: Max batches waiting between stages before the upstream stage blocks
+        max_retries: Extra attempts per batch and stage before the batch is reported as failed
+        retry_backoff: Base seconds for exponential backoff between attempts
+        upsert: Use upsert_embeddings instead of insert_embeddings (stable-ID delta ingestion)
+        """
+        self.embedder = embedder
+        self.data_manager = data_manager
+        self.batch_size = batch_size
+        self.encode_workers = encode_workers
+        self.insert_workers = insert_workers
+        self.queue_size = queue_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.upsert = upsert
+
+    # TODO: Call fn with retries and exponential backoff; returns (ok, result_or_error)
+    def _with_retries(self, stage, batch, fn):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with span(
+                    f"pipeline.{stage.lower()}_batch",
+                    rows=batch["end"] - batch["start"],
+                ):
+                    return True, fn()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logging.error(
+                        f"{stage} failed for batch {batch['start']}-{batch['end']} "
+                        f"after {attempt + 1} attempts: {e}"
+                    )
+                    return False, e
+                delay = self.retry_backoff * (2**attempt)
+                logging.warning(
+                    f"{stage} failed for batch {batch['start']}-{batch['end']} "
+                    f"(attempt {attempt + 1}), retrying in {delay:.1f}s: {e}"
+                )
+                time.sleep(delay)
+
+    # TODO: Encode stage — pulls text batches, pushes (batch, embeddings) downstream
+    def _encode_worker(self, encode_q, insert_q, state):
+        while True:
+            batch = encode_q.get()
+            if batch is _STOP:
+                break
+            ok, result = self._with_retries(
+                "Encoding",
+                batch,
+                lambda: self.embedder.encode(
+                    list(batch["texts"]), batch_size=self.batch_size
+                ),
+            )
+            if ok:
+                insert_q.put((batch, result))
+            else:
+                self._record_failure(state, batch, "encode", result)
+
+        # ? The last encoder to finish releases every insert worker
+        with state["lock"]:
+            state["encoders_left"] -= 1
+            last = state["encoders_left"] == 0
+        if last:
+            for _ in range(self.insert_workers):
+                insert_q.put(_STOP)
+
+    # TODO: Insert stage — writes encoded batches to Milvus
+    def _insert_worker(self, insert_q, state):
+        write = (
+            self.data_manager.upsert_embeddings
+            if self.upsert
+            else self.data_manager.insert_embeddings
+        )
+        while True:
+            item = insert_q.get()
+            if item is _STOP:
+                break
+            batch, embeddings = item
+            ok, result = self._with_retries(
+                "Insert",
+                batch,
+                lambda: write(
+                    list(batch["ids"]),
+                    embeddings,
+                    list(batch["texts"]),
+                    batch["metadata"],
+                ),
+            )
+            if ok:
+                with state["lock"]:
+                    state["rows_done"] += len(batch["ids"])
+            else:
+                self._record_failure(state, batch, "insert", result)
+
+    @staticmethod
+    def _record_failure(state, batch, stage, error):
+        with state["lock"]:
+            state["failed"].append(
+                {
+                    "start": batch["start"],
+                    "end": batch["end"],
+                    "stage": stage,
+                    "error": str(error),
+                }
+            )
+
+    # TODO: Run the full pipeline; returns run stats and raises IngestionError if any batch was lost
+    def run(self, ids, texts, metadata: dict = None) -> dict:
+        """
+        metadata: Optional {field: list of values} for the collection's scalar (filterable) fields
+        """
+        if len(ids) != len(texts):
+            raise ValueError("Length mismatch among ids and texts.")
+
+        total = len(ids)
+        encode_q = queue.Queue(maxsize=self.queue_size)
+        insert_q = queue.Queue(maxsize=self.queue_size)
+        state = {
+            "lock": threading.Lock(),
+            "encoders_left": self.encode_workers,
+            "rows_done": 0,
+            "failed": [],
+        }
+
+        threads = [
+            threading.Thread(
+                target=self._encode_worker,
+                args=(encode_q, insert_q, state),
+                name=f"encode-{i}",
+                daemon=True,
+            )
+            for i in range(self.encode_workers)
+        ] + [
+            threading.Thread(
+                target=self._insert_worker,
+                args=(insert_q, state),
+                name=f"insert-{i}",
+                daemon=True,
+            )
+            for i in range(self.insert_workers)
+        ]
+
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        # ? Producer: put() blocks while the encoders are behind, bounding memory
+        for start in range(0, total, self.batch_size):
+            end = min(start + self.batch_size, total)
+            encode_q.put(
+                {
+                    "start": start,
+                    "end": end,
+                    "ids": ids[start:end],
+                    "texts": texts[start:end],
+                    "metadata": (
+                        {k: list(v[start:end]) for k, v in metadata.items()}
+                        if metadata
+                        else None
+                    ),
+                }
+            )
+        for _ in range(self.encode_workers):
+            encode_q.put(_STOP)
+
+        for t in threads:
+            t.join()
+
+        logging.info("Flushing collection to seal inserted segments...")
+        with span("pipeline.flush"):
+            self.data_manager.flush()
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            "rows": total,
+            "rows_inserted": state["rows_done"],
+            "failed_batches": len(state["failed"]),
+            "seconds": round(elapsed, 3),
+            "rows_per_sec": round(state["rows_done"] / elapsed, 1) if elapsed else 0.0,
+        }
+        logging.info(
+            f"Pipeline finished: {stats['rows_inserted']}/{total} rows in "
+            f"{stats['seconds']}s ({stats['rows_per_sec']} rows/sec)."
+        )
+
+        if state["failed"]:
+            raise IngestionError(state["failed"])
+        return stats
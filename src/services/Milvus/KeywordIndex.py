@@ -0,0 +1,298 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from services.HelperClass import HelperClass
+
+helper = HelperClass()
+
+KEYWORD_INDEX_DIR = "../data/interim"
+
+# ? Compound tokens keep IDs such as "req-1234", "tc_001" or "4.2.1" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-/:][a-z0-9]+)*")
+# ? A single token with a digit, e.g. "TC-0042", "REQ1234", "4.2.1" (not plain words)
+ID_PATTERN = re.compile(r"^(?=.*\d)[a-z0-9]+(?:[._\-/:#][a-z0-9]+)*$")
+
+
+# TODO: Lower-cased tokens of a text; compound tokens also yield their alphanumeric parts
+def tokenize(text: str) -> list:
+    tokens = []
+    for token in TOKEN_PATTERN.findall(str(text).lower()):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(re.findall(r"[a-z0-9]+", token))
+    return tokens
+
+
+# TODO: Reciprocal rank fusion of several ranked result lists (dicts with an 'id'); returns top_k
+def reciprocal_rank_fusion(result_lists, top_k: int = 5, k: int = 60) -> list:
+    """
+    k: Damping constant; larger values flatten the advantage of the first ranks
+    Each fused hit keeps the fields of its first occurrence and gets the fused 'score'.
+    """
+    scores, hits = {}, {}
+    for results in result_lists:
+        for rank, hit in enumerate(results):
+            scores[hit["id"]] = scores.get(hit["id"], 0.0) + 1.0 / (k + rank + 1)
+            hits.setdefault(hit["id"], hit)
+    ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+    return [{**hits[i], "score": scores[i]} for i in ranked]
+
+
+def keyword_index_path(collection_name: str) -> str:
+    return os.path.join(KEYWORD_INDEX_DIR, f"keyword_index_{collection_name}.json")
+
+
+class KeywordIndex:
+    # TODO: In-memory inverted index over TCIDs and description tokens (BM25) for lookup-style queries
+    def __init__(self, path: str = None, k1: float = 1.2, b: float = 0.75):
+        """
+        path: JSON file holding the indexed rows (None keeps the index in memory only)
+        k1 / b: BM25 term-frequency saturation and length normalization
+        """
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.docs = (
+            {}
+        )  # ? id -> {"hash", "source", "tcid", "text", "terms": {token: tf}, "length"}
+        self.tcids = {}  # ? normalized tcid -> set of ids
+        self.postings = {}  # ? token -> {id: tf}
+        self.total_length = 0
+        self._lock = threading.RLock()
+        if path and os.path.exists(path):
+            self._load()
+
+    # TODO: Index of a collection, persisted under data/interim
+    @classmethod
+    def for_collection(cls, collection_name: str):
+        return cls(keyword_index_path(collection_name))
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                rows = json.load(f)["rows"]
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Keyword index unreadable, starting empty: {e}")
+            return
+        # ? Only the rows are stored; postings are rebuilt (one tokenization pass)
+        for doc_id, (row_hash, source, tcid, text) in rows.items():
+            self._add(int(doc_id), row_hash, source, tcid, text)
+        logging.info(
+            f"Keyword index loaded with {len(self.docs)} rows from {self.path}"
+        )
+
+    # TODO: Write the indexed rows atomically
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            rows = {
+                str(i): [d["hash"], d["source"], d["tcid"], d["text"]]
+                for i, d in self.docs.items()
+            }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "rows": rows}, f)
+        os.replace(tmp_path, self.path)
+
+    def _add(self, doc_id: int, row_hash: str, source: str, tcid, text):
+        tcid = "" if tcid is None else str(tcid).strip().lower()
+        text = "" if text is None else str(text)
+        terms = Counter(tokenize(text))
+        if tcid:
+            terms.update(tokenize(tcid))
+            self.tcids.setdefault(tcid, set()).add(doc_id)
+        for token, tf in terms.items():
+            self.postings.setdefault(token, {})[doc_id] = tf
+        length = sum(terms.values())
+        self.docs[doc_id] = {
+            "hash": row_hash,
+            "source": source,
+            "tcid": tcid,
+            "text": text,
+            "terms": terms,
+            "length": length,
+        }
+        self.total_length += length
+
+    def _remove(self, doc_id: int):
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for token in doc["terms"]:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[token]
+        if doc["tcid"]:
+            ids = self.tcids.get(doc["tcid"], set())
+            ids.discard(doc_id)
+            if not ids:
+                self.tcids.pop(doc["tcid"], None)
+        self.total_length -= doc["length"]
+
+    # TODO: Bring the index in line with a frame of rows (id, tcid, text); only changed rows are re-tokenized
+    def sync(
+        self, df, text_column: str = "description", source_column: str = "sourcefile"
+    ) -> dict:
+        """
+        df: Rows with an 'id' column (assign_stable_ids); 'contenthash' is used when present
+        Indexed rows of the frame's workbooks that are missing from it are removed
+        (rows of workbooks not in this run are kept, as in IncrementalIngestor).
+        """
+        tcid_col = helper.findTCIDColumn(df.columns)
+        tcids = df[tcid_col] if tcid_col is not None else [None] * len(df)
+        texts = df[text_column]
+        sources = (
+            df[source_column].astype(str).tolist()
+            if source_column in df.columns
+            else ["unknown"] * len(df)
+        )
+        hashes = (
+            df["contenthash"]
+            if "contenthash" in df.columns
+            else [helper.contentHash(t, x) for t, x in zip(tcids, texts)]
+        )
+        added = changed = 0
+        seen = set()
+        with self._lock:
+            for doc_id, tcid, text, row_hash, source in zip(
+                df["id"], tcids, texts, hashes, sources
+            ):
+                doc_id = int(doc_id)
+                seen.add(doc_id)
+                if tcid is not None and tcid != tcid:
+                    tcid = None  # ? NaN
+                if text is not None and text != text:
+                    text = None
+                current = self.docs.get(doc_id)
+                if current is not None:
+                    if current["hash"] == row_hash:
+                        continue
+                    self._remove(doc_id)
+                    changed += 1
+                else:
+                    added += 1
+                self._add(doc_id, row_hash, source, tcid, text)
+            present = set(sources)
+            removed = [
+                i
+                for i, doc in self.docs.items()
+                if i not in seen and doc["source"] in present
+            ]
+            for doc_id in removed:
+                self._remove(doc_id)
+        summary = {"added": added, "changed": changed, "removed": len(removed)}
+        logging.info(f"Keyword index synced: {summary} ({len(self.docs)} rows).")
+        return summary
+
+    # TODO: Drop rows by id (e.g. rows deleted from the vector store)
+    def remove(self, ids):
+        with self._lock:
+            for doc_id in ids:
+                self._remove(int(doc_id))
+
+    # TODO: True for queries that are lookups (an ID-shaped token or a "quoted exact string")
+    @staticmethod
+    def is_lookup(query: str) -> bool:
+        query = query.strip()
+        if len(query) > 2 and query[0] == query[-1] and query[0] in "\"'":
+            return True
+        return bool(ID_PATTERN.match(query.lower()))
+
+    def _hit(self, doc_id, score, match):
+        return {
+            "id": doc_id,
+            "score": float(score),
+            "text": self.docs[doc_id]["text"],
+            "match": match,
+        }
+
+    # TODO: Rank a lookup: exact TCID, then "quoted phrase" / ID token occurrences, else BM25 keyword hits
+    def lookup(self, query: str, top_k: int = 5) -> list:
+        """
+        ID-shaped and quoted queries only return rows that contain them exactly ([] otherwise);
+        free text (e.g. for fusion) returns BM25 hits with verbatim matches ranked first.
+        """
+        query = query.strip()
+        lookup = self.is_lookup(query)
+        if len(query) > 2 and query[0] == query[-1] and query[0] in "\"'":
+            query = query[1:-1].strip()
+        normalized = query.lower()
+        tokens = tokenize(normalized)
+
+        with self._lock:
+            if normalized in self.tcids:
+                return [
+                    self._hit(i, 1.0, "tcid") for i in sorted(self.tcids[normalized])
+                ][:top_k]
+            if not tokens:
+                return []
+
+            if lookup:
+                # ? Intersect postings rarest-first, then verify the exact text on the few survivors
+                postings = sorted(
+                    (self.postings.get(t, {}) for t in set(tokens)), key=len
+                )
+                candidates = set(postings[0])
+                for posting in postings[1:]:
+                    candidates.intersection_update(posting)
+                    if not candidates:
+                        break
+                exact = {
+                    i
+                    for i in candidates
+                    if normalized in self.docs[i]["text"].lower()
+                    or normalized == self.docs[i]["tcid"]
+                }
+                scores = self._bm25(tokens, exact)
+                ranked = sorted(exact, key=scores.get, reverse=True)
+                return [self._hit(i, scores[i], "phrase") for i in ranked[:top_k]]
+
+            scores = self._bm25(tokens)
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            # ? Rows containing the query verbatim (e.g. an error message) outrank partial matches
+            head = ranked[: top_k * 10]
+            exact = {i for i in head if normalized in self.docs[i]["text"].lower()}
+            ranked = [i for i in head if i in exact] + [
+                i for i in ranked if i not in exact
+            ]
+            return [
+                self._hit(i, scores[i], "phrase" if i in exact else "keyword")
+                for i in ranked[:top_k]
+            ]
+
+    # TODO: BM25 score per row for the query tokens (only for `candidates` when given)
+    def _bm25(self, tokens, candidates=None) -> dict:
+        n = len(self.docs)
+        if not n or not tokens:
+            return {}
+        avg_length = self.total_length / n
+        scores = {} if candidates is None else dict.fromkeys(candidates, 0.0)
+        for token in set(tokens):
+            posting = self.postings.get(token)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            matches = (
+                posting.items()
+                if candidates is None
+                else ((i, posting[i]) for i in candidates if i in posting)
+            )
+            for doc_id, tf in matches:
+                length = self.docs[doc_id]["length"]
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[doc_id] = (
+                    scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+                )
+        return scores
@@ -0,0 +1,333 @@
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from services.Instrumentation import span
+from services.Milvus.ScalarFields import DEFAULT_SCALAR_FIELDS, normalize_scalar
+
+
+class LocalDataManager:
+    # TODO: In-process drop-in for MilvusDataManager: exact cosine search over a float32 matrix
+    def __init__(
+        self,
+        collection_name: str,
+        dimension: int = 384,
+        persist_dir: str = "../data/interim/local_vectors",
+        scalar_fields: dict = None,
+    ):
+        """
+        collection_name: Name of the local collection (one sub-folder per collection)
+        dimension: Vector dimension (384 for all-MiniLM-L6-v2)
+        persist_dir: Root folder for vectors.npy / ids.npy / meta.parquet (None keeps everything in memory)
+        scalar_fields: {name: max_length} of filterable metadata fields (defaults to DEFAULT_SCALAR_FIELDS)
+        """
+        self.collection_name = collection_name
+        self.dimension = dimension
+        self.scalar_fields = dict(
+            DEFAULT_SCALAR_FIELDS if scalar_fields is None else scalar_fields
+        )
+        self.path = os.path.join(persist_dir, collection_name) if persist_dir else None
+        self.version = 0
+        self.search_params = None  # ? Exact search: nothing to tune
+        self._change_listeners = []
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._id_index = (
+            None  # ? (row order, sorted ids) for get_vectors; rebuilt after writes
+        )
+
+        self._vectors = np.empty((0, dimension), dtype=np.float32)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._meta = pd.DataFrame(columns=["text", *self.scalar_fields])
+        # ? Inserted (ids, vectors, meta) batches not yet merged; concatenated once on the next read
+        self._pending = []
+        self._load()
+
+    # TODO: Memory-map a previously persisted collection (rows are paged in on demand)
+    def _load(self):
+        if not self.path or not os.path.exists(os.path.join(self.path, "vectors.npy")):
+            return
+        self._vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+        self._ids = np.load(os.path.join(self.path, "ids.npy"))
+        self._meta = pd.read_parquet(os.path.join(self.path, "meta.parquet"))
+        self._id_index = None
+        if self._vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Stored vectors have dim {self._vectors.shape[1]}, expected {self.dimension}."
+            )
+        logging.info(
+            f"Local collection '{self.collection_name}' loaded with {len(self._ids)} vectors."
+        )
+
+    # TODO: Same contract as MilvusDataManager.filterable_fields
+    def filterable_fields(self) -> dict:
+        return self.scalar_fields
+
+    # TODO: Register a callback run after every write (e.g. to invalidate search caches)
+    def add_change_listener(self, callback):
+        self._change_listeners.append(callback)
+
+    def _mark_modified(self):
+        self.version += 1
+        self._dirty = True
+        self._id_index = None
+        for callback in self._change_listeners:
+            callback()
+
+    # TODO: Unit-normalize rows so a dot product equals cosine similarity
+    @staticmethod
+    def _normalize(matrix) -> np.ndarray:
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _build_rows(self, ids, embeddings, texts, metadata):
+        if not (len(ids) == len(embeddings) == len(texts)):
+            raise ValueError("Length mismatch among ids, embeddings, and texts.")
+        vectors = self._normalize(embeddings)
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding dim {vectors.shape[1]} does not match collection dim {self.dimension}."
+            )
+        meta = {"text": [str(t) for t in texts]}
+        metadata = metadata or {}
+        for name, max_length in self.scalar_fields.items():
+            values = metadata.get(name)
+            if values is None:
+                values = [""] * len(ids)
+            elif len(values) != len(ids):
+                raise ValueError(f"Length mismatch for metadata field '{name}'.")
+            meta[name] = [normalize_scalar(v, max_length) for v in values]
+        return np.asarray(ids, dtype=np.int64), vectors, pd.DataFrame(meta)
+
+    # TODO: Append rows (duplicate ids are allowed, as with a Milvus insert)
+    def insert_embeddings(self, ids, embeddings, texts, metadata=None):
+        new_ids, vectors, meta = self._build_rows(ids, embeddings, texts, metadata)
+        with self._lock:
+            # ? Appending to the arrays per batch would copy the whole collection every time
+            self._pending.append((new_ids, vectors, meta))
+            self._mark_modified()
+        logging.info(
+            f"Inserted {len(new_ids)} vectors into local collection '{self.collection_name}'."
+        )
+
+    # TODO: Replace rows with matching ids, append the rest
+    def upsert_embeddings(self, ids, embeddings, texts, metadata=None):
+        with self._lock:
+            self._drop_ids(ids)
+            self.insert_embeddings(ids, embeddings, texts, metadata)
+
+    # TODO: Delete rows by primary key
+    def delete_by_ids(self, ids):
+        if not len(ids):
+            return
+        with self._lock:
+            removed = self._drop_ids(ids)
+            self._mark_modified()
+        logging.info(
+            f"Deleted {removed} records from local collection '{self.collection_name}'."
+        )
+
+    # TODO: Merge pending insert batches into the arrays (one concatenation for all of them)
+    def _consolidate(self):
+        with self._lock:
+            if not self._pending:
+                return
+            batches, self._pending = self._pending, []
+            self._ids = np.concatenate([self._ids, *(b[0] for b in batches)])
+            self._vectors = np.concatenate([self._vectors, *(b[1] for b in batches)])
+            frames = [self._meta] if len(self._meta) else []
+            self._meta = pd.concat(frames + [b[2] for b in batches], ignore_index=True)
+
+    def _drop_ids(self, ids) -> int:
+        ids = np.asarray(ids, dtype=np.int64)
+        keep = ~np.isin(self._ids, ids)
+        removed = int((~keep).sum())
+        if removed:
+            self._ids = self._ids[keep]
+            self._vectors = np.asarray(self._vectors)[keep]
+            self._meta = self._meta[keep].reset_index(drop=True)
+        # ? Pending batches are filtered on their own, so upserts do not force a full merge
+        pending = []
+        for batch_ids, vectors, meta in self._pending:
+            keep = ~np.isin(batch_ids, ids)
+            if not keep.all():
+                removed += int((~keep).sum())
+                batch_ids, vectors = batch_ids[keep], vectors[keep]
+                meta = meta[keep].reset_index(drop=True)
+            if len(batch_ids):
+                pending.append((batch_ids, vectors, meta))
+        self._pending = pending
+        return removed
+
+    # TODO: Persist to disk (atomic file swaps) and re-map the matrix read-only
+    def flush(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            os.makedirs(self.path, exist_ok=True)
+            self._consolidate()
+            vectors = np.ascontiguousarray(self._vectors)
+            for name, writer in (
+                ("vectors.npy", lambda f: np.save(f, vectors)),
+                ("ids.npy", lambda f: np.save(f, self._ids)),
+                ("meta.parquet", lambda f: self._meta.to_parquet(f, index=False)),
+            ):
+                target = os.path.join(self.path, name)
+                tmp = f"{target}.tmp"
+                with open(tmp, "wb") as f:
+                    writer(f)
+                os.replace(tmp, target)
+            self._vectors = np.load(
+                os.path.join(self.path, "vectors.npy"), mmap_mode="r"
+            )
+            self._dirty = False
+        logging.info(
+            f"Flushed local collection '{self.collection_name}' ({len(self._ids)} vectors)."
+        )
+
+    # TODO: Insert large datasets in chunks (kept for interface parity with MilvusDataManager)
+    def batch_insert_embeddings(
+        self, ids, embeddings, texts, batch_size=500, metadata=None
+    ):
+        total = len(ids)
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            batch_meta = (
+                {k: v[start:end] for k, v in metadata.items()} if metadata else None
+            )
+            with span("local.insert_batch", rows=end - start):
+                self.insert_embeddings(
+                    ids[start:end], embeddings[start:end], texts[start:end], batch_meta
+                )
+        logging.info("Batch insertion completed.")
+
+    # TODO: Stored (unit-normalized) vectors for ids; NaN rows for unknown ids
+    def get_vectors(self, ids) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        with self._lock:
+            self._consolidate()
+            if self._id_index is None:
+                order = np.argsort(self._ids, kind="stable")
+                self._id_index = (order, self._ids[order])
+            (order, sorted_ids), vectors = self._id_index, self._vectors
+        out = np.full((len(ids), self.dimension), np.nan, dtype=np.float32)
+        if not len(sorted_ids):
+            return out
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        found = sorted_ids[pos] == ids
+        # ? Fancy indexing on the memory map reads only the requested rows from disk
+        out[found] = vectors[order[pos[found]]]
+        return out
+
+    # TODO: Boolean row mask for {field: value} filters (same normalization as insert)
+    def _filter_mask(self, filters):
+        if not filters:
+            return None
+        unknown = [k for k in filters if k not in self.scalar_fields]
+        if unknown:
+            raise ValueError(
+                f"Fields not filterable in '{self.collection_name}': {sorted(unknown)}"
+            )
+        mask = np.ones(len(self._ids), dtype=bool)
+        for key, val in filters.items():
+            value = normalize_scalar(val, self.scalar_fields[key])
+            mask &= (self._meta[key] == value).to_numpy()
+        return mask
+
+    # TODO: Exact cosine top-k for one query vector
+    def search(self, query_embedding, top_k=5, filters=None, expr=None):
+        return self.search_many(
+            [query_embedding], top_k=top_k, filters=filters, expr=expr
+        )[0]
+
+    # TODO: Exact cosine top-k for many queries (matrix product + argpartition)
+    def search_many(
+        self,
+        queries,
+        top_k=5,
+        output_fields=None,
+        filters=None,
+        expr=None,
+        chunk_size=64,
+        embedder=None,
+        batch_size=32,
+        search_params=None,
+        workers=None,
+        rerank=None,
+    ):
+        """
+        Same signature as MilvusDataManager.search_many; search_params, workers and rerank are
+        accepted and ignored (one exact in-process scan, nothing to tune, parallelize or rerank)
+        """
+        if expr:
+            raise ValueError(
+                "Raw Milvus expressions are not supported by the local backend."
+            )
+        if len(queries) == 0:
+            return []
+        if isinstance(queries[0], str):
+            if embedder is None:
+                raise ValueError("Raw text queries need an embedder.")
+            queries = embedder.encode(
+                list(queries), batch_size=batch_size, show_progress_bar=False
+            )
+
+        q = self._normalize(queries)
+        n = q.shape[0]
+        top_ks = list(top_k) if isinstance(top_k, (list, tuple)) else [top_k] * n
+        if output_fields is None:
+            output_fields = ["text"]
+        per_query_fields = (
+            [list(f) for f in output_fields]
+            if output_fields and isinstance(output_fields[0], (list, tuple))
+            else [list(output_fields)] * n
+        )
+
+        with self._lock:
+            self._consolidate()
+            vectors, ids, meta = self._vectors, self._ids, self._meta
+            mask = self._filter_mask(filters)
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            vectors = vectors[rows]
+        else:
+            rows = None
+        total = vectors.shape[0]
+        columns = {c: meta[c].to_numpy() for c in meta.columns}
+
+        all_results = []
+        for start in range(0, n, chunk_size):
+            end = min(start + chunk_size, n)
+            scores = q[start:end] @ vectors.T
+            k = min(max(top_ks[start:end]), total)
+            if k == 0:
+                all_results.extend([] for _ in range(start, end))
+                continue
+            # ? argpartition finds the k best in O(N); only those k get sorted
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for offset in range(end - start):
+                i = start + offset
+                res_list = []
+                for pos, score in zip(top[offset, : top_ks[i]], top_scores[offset]):
+                    row = rows[pos] if rows is not None else pos
+                    res = {"id": int(ids[row]), "score": float(score)}
+                    for field in per_query_fields[i]:
+                        res[field] = columns[field][row] if field in columns else None
+                    res_list.append(res)
+                all_results.append(res_list)
+        return all_results
+
+    def __len__(self):
+        return len(self._ids) + sum(len(b[0]) for b in self._pending)
@@ -1,4 +1,8 @@
 import logging  # For tracking connection lifecycle, errors, creation steps
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
 from pymilvus import (  # Official Milvus Python SDK
     Collection,
@@ -9,50 +13,224 @@ from pymilvus import (  # Official Milvus Python SDK
     utility,
 )
 
+from services.Milvus.CompactVectors import VECTOR_MODES
+from services.Milvus.IndexTuner import select_index
+from services.Milvus.ScalarFields import DEFAULT_SCALAR_FIELDS
+
+# ? Vector field type per storage mode (see CompactVectors)
+VECTOR_DTYPES = {
+    "float32": DataType.FLOAT_VECTOR,
+    "float16": DataType.FLOAT16_VECTOR,
+    "binary": DataType.BINARY_VECTOR,
+}
+
 
 class MilvusConnector:
     # TODO: Store connection details
-    def __init__(self, host: str = "localhost", port: str = "19530"):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: str = "19530",
+        pool_size: int = 4,
+        alias: str = "default",
+        health_check_interval: float = 30.0,
+    ):
+        """
+        pool_size: Aliased connections (one gRPC channel each) handed out to concurrent workers
+        alias: Name of the first connection; the others are "<alias>_1", "<alias>_2", ...
+        health_check_interval: Idle seconds after which a connection is pinged before reuse
+        """
         self.host = host
         self.port = port
+        self.pool_size = max(1, pool_size)
+        self.alias = alias
+        self.aliases = [alias] + [f"{alias}_{i}" for i in range(1, self.pool_size)]
+        self.health_check_interval = health_check_interval
         self.connected = False
+        self._pool = queue.Queue()
+        # ? Bumped by disconnect(); leases from an older generation are not returned to the pool
+        self._generation = 0
+        self._last_used = {}
+        self._collections = {}  # ? (alias, collection name) -> cached Collection handle
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()  # ? Serializes connect()/disconnect()
         # ? Useful for debugging if needed
         logging.basicConfig(level=logging.INFO)
 
     # TODO: Establish a connection to Milvus server (if not already connected)
     def connect(self):
-        if not self.connected:
-            try:
-                connections.connect(alias="default", host=self.host, port=self.port)
-                self.connected = True
-                logging.info(f"Connected to Milvus at {self.host}:{self.port}")
-            except Exception as e:
-                logging.error(f"Connection to Milvus failed: {e}")
-                raise
+        with self._connect_lock:
+            if not self.connected:
+                try:
+                    # ? The first alias connects eagerly; the rest open on first use
+                    self._connect_alias(self.alias)
+                    for alias in self.aliases:
+                        self._pool.put(alias)
+                    self.connected = True
+                    logging.info(
+                        f"Connected to Milvus at {self.host}:{self.port} "
+                        f"(pool of {self.pool_size} connections)"
+                    )
+                except Exception as e:
+                    logging.error(f"Connection to Milvus failed: {e}")
+                    raise
+        return self
+
+    def _connect_alias(self, alias: str):
+        connections.connect(alias=alias, host=self.host, port=self.port)
+        self._last_used[alias] = time.monotonic()
 
     # TODO: Disconnect from Milvus server (if already connected)
     def disconnect(self):
-        if self.connected:
+        with self._connect_lock:
+            if self.connected:
+                try:
+                    for alias in self.aliases:
+                        if connections.has_connection(alias):
+                            connections.disconnect(alias=alias)
+                    self.connected = False
+                    with self._lock:
+                        self._generation += 1
+                        self._pool = queue.Queue()
+                        self._collections.clear()
+                    self._last_used.clear()
+                    logging.info("Disconnected from Milvus.")
+                except Exception as e:
+                    logging.error(f"Oops. Failed to disconnect cleanly: {e}")
+
+    def __enter__(self):
+        return self.connect()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.disconnect()
+        return False
+
+    # TODO: True if the server answers on this connection
+    def is_healthy(self, alias: str = None) -> bool:
+        try:
+            utility.get_server_version(using=alias or self.alias)
+            return True
+        except Exception as e:
+            logging.warning(f"Milvus connection '{alias or self.alias}' unhealthy: {e}")
+            return False
+
+    # TODO: Re-open one connection and drop the collection handles bound to it
+    def reconnect(self, alias: str = None):
+        alias = alias or self.alias
+        with self._lock:
+            self._collections = {
+                key: c for key, c in self._collections.items() if key[0] != alias
+            }
+        try:
+            connections.disconnect(alias=alias)
+        except Exception:
+            pass  # ? Already broken; the fresh connect below is what matters
+        self._connect_alias(alias)
+        logging.info(f"Reconnected Milvus connection '{alias}'.")
+
+    # TODO: Borrow a connection alias for the duration of a block (blocks while all are in use)
+    @contextmanager
+    def acquire(self, timeout: float = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if not self.connected:
+                self.connect()
+            with self._lock:
+                pool, generation = self._pool, self._generation
+            # ? Short waits, so a disconnect() that replaces the pool does not strand waiters
+            wait = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
             try:
-                connections.disconnect(alias="default")
-                self.connected = False
-                logging.info("Disconnected from Milvus.")
-            except Exception as e:
-                logging.error(f"Oops. Failed to disconnect cleanly: {e}")
+                alias = pool.get(timeout=max(0.0, wait))
+                break
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"No Milvus connection free after {timeout}s (pool size {self.pool_size})."
+                    )
+        try:
+            if not connections.has_connection(alias):
+                self._connect_alias(alias)
+            elif time.monotonic() - self._last_used.get(
+                alias, 0
+            ) > self.health_check_interval and not self.is_healthy(alias):
+                self.reconnect(alias)
+            yield alias
+        finally:
+            with self._lock:
+                # ? A lease from before disconnect() holds a closed alias, and connect() puts
+                #   every alias into the new pool, so returning it would create a duplicate
+                current = generation == self._generation
+            if current:
+                self._last_used[alias] = time.monotonic()
+                pool.put(alias)
+
+    # TODO: Cached Collection handle for a connection (no describe round trip after the first call)
+    def collection(self, collection_name: str, alias: str = None) -> Collection:
+        key = (alias or self.alias, collection_name)
+        with self._lock:
+            handle = self._collections.get(key)
+        if handle is None:
+            handle = Collection(collection_name, using=key[0])
+            with self._lock:
+                handle = self._collections.setdefault(key, handle)
+        return handle
+
+    # TODO: Forget cached handles of a collection (after it was dropped or its schema changed)
+    def invalidate(self, collection_name: str):
+        with self._lock:
+            self._collections = {
+                key: c
+                for key, c in self._collections.items()
+                if key[1] != collection_name
+            }
+
+    # TODO: Run operation(collection) on a pooled connection; reconnect and retry if the connection died
+    def execute(self, collection_name: str, operation, retries: int = 1):
+        for attempt in range(retries + 1):
+            with self.acquire() as alias:
+                try:
+                    return operation(self.collection(collection_name, alias))
+                except Exception:
+                    # ? Only a dead connection is retried; request errors surface immediately
+                    if attempt >= retries or self.is_healthy(alias):
+                        raise
+                    logging.warning(
+                        f"Milvus connection '{alias}' dropped; retrying ({attempt + 1}/{retries})."
+                    )
+                    self.reconnect(alias)
 
     # TODO: Check if a collection exists (helps avoid duplicates)
     def has_collection(self, collection_name: str) -> bool:
-        return utility.has_collection(collection_name)
+        return utility.has_collection(collection_name, using=self.alias)
 
     # TODO: Drop a collection if it exists
     def drop_collection(self, collection_name: str):
         # ! Be careful with this — it deletes the entire collection
         if self.has_collection(collection_name):
-            utility.drop_collection(collection_name)
+            utility.drop_collection(collection_name, using=self.alias)
+            self.invalidate(collection_name)
             logging.info(f"Collection '{collection_name}' dropped (deleted).")
 
     # TODO: Create a new collection with a specific schema
-    def create_collection(self, collection_name: str, dimension: int):
+    def create_collection(
+        self,
+        collection_name: str,
+        dimension: int,
+        scalar_fields: dict = None,
+        vector_mode: str = "float32",
+    ):
+        """
+        scalar_fields: {name: max_length} of VARCHAR metadata fields used for pre-filtering
+                       (defaults to DEFAULT_SCALAR_FIELDS; pass {} for the plain schema)
+        vector_mode: "float32" (FLOAT_VECTOR), "float16" (FLOAT16_VECTOR, half the memory) or
+                     "binary" (BINARY_VECTOR of sign bits, 1/32 of the memory; dimension % 8 == 0)
+        """
+        if vector_mode not in VECTOR_MODES:
+            raise ValueError(
+                f"Unknown vector mode '{vector_mode}' (use one of {VECTOR_MODES})."
+            )
+        if vector_mode == "binary" and dimension % 8:
+            raise ValueError("Binary vectors need a dimension divisible by 8.")
         # ? If the collection already exists, skip creation
         if self.has_collection(collection_name):
             logging.info(
@@ -64,22 +242,31 @@ class MilvusConnector:
                 id: primary key (manual, not auto-generated)
                 embedding: the vector field
                 text: raw test case or prompt text (for reference)
+                scalar fields: normalized metadata (e.g. priority) filtered during the ANN search
         """
         fields = [
             FieldSchema(
                 name="id", dtype=DataType.INT64, is_primary=True, auto_id=False
             ),
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dimension),
+            FieldSchema(
+                name="embedding", dtype=VECTOR_DTYPES[vector_mode], dim=dimension
+            ),
             FieldSchema(name="text", dtype=DataType.VARCHAR, max_length=1000),
         ]
+        if scalar_fields is None:
+            scalar_fields = DEFAULT_SCALAR_FIELDS
+        for name, max_length in scalar_fields.items():
+            fields.append(
+                FieldSchema(name=name, dtype=DataType.VARCHAR, max_length=max_length)
+            )
 
         # ? Wrap the fields in a collection schema and create the actual collection
         schema = CollectionSchema(
             fields=fields, description="Test Plan Embedding Collection"
         )
-        collection = Collection(name=collection_name, schema=schema)
+        collection = Collection(name=collection_name, schema=schema, using=self.alias)
         logging.info(
-            f"Collection '{collection_name}' created with vector dimension {dimension}."
+            f"Collection '{collection_name}' created with {vector_mode} vectors of dimension {dimension}."
         )
 
     # TODO: Create an index for the vector in the collection
@@ -87,36 +274,122 @@ class MilvusConnector:
         self,
         collection_name: str,
         field_name: str = "embedding",
-        index_type="IVF_FLAT",
+        index_type="AUTO",
         metric_type="COSINE",
+        params: dict = None,
+        num_rows: int = None,
     ):
+        """
+        index_type: "AUTO" picks HNSW / IVF_SQ8 / IVF_PQ from the row count (see IndexTuner.select_index);
+                    binary fields get BIN_FLAT / BIN_IVF_FLAT with the HAMMING metric
+        params: Build params for an explicit index_type (default {"nlist": 128})
+        num_rows: Expected collection size for AUTO (defaults to the current entity count)
+        """
         if not self.has_collection(
             collection_name
         ):  # Make sure the collection exists before indexing
             raise ValueError(f"Collection '{collection_name}' does not exist.")
-        collection = Collection(
-            name=collection_name
-        )  # Load the collection and prepare the index config
-        index_params = {
-            "index_type": index_type,  # IVF_FLAT is good for moderate-sized datasets
-            "params": {"nlist": 128},  # Tune this based on data size
-            "metric_type": metric_type,  # COSINE is best for semantic similarity
-        }
+        # Load the collection and prepare the index config
+        collection = self.collection(collection_name)
+        if index_type == "AUTO":
+            if num_rows is None:
+                num_rows = collection.num_entities
+            field = next(f for f in collection.schema.fields if f.name == field_name)
+            vector_mode = self.vector_mode_of(field)
+            index_params = select_index(
+                num_rows, field.params["dim"], metric_type, vector_mode
+            )
+        else:
+            index_params = {
+                "index_type": index_type,
+                "params": params or {"nlist": 128},
+                "metric_type": metric_type,  # COSINE is best for semantic similarity
+            }
 
         # Create the index on the vector field
         collection.create_index(field_name=field_name, index_params=index_params)
         logging.info(
-            f"Index created on '{field_name}' using {index_type} with {metric_type} metric."
+            f"Index created on '{field_name}' using {index_params['index_type']} "
+            f"{index_params['params']} with {index_params['metric_type']} metric."
         )
+        return index_params
+
+    # TODO: Storage mode of a vector field schema ("float32", "float16" or "binary")
+    @staticmethod
+    def vector_mode_of(field) -> str:
+        for mode, dtype in VECTOR_DTYPES.items():
+            if field.dtype == dtype:
+                return mode
+        raise ValueError(f"Field '{field.name}' is not a supported vector field.")
+
+    # TODO: Drop and re-create the vector index (e.g. after the collection grew past a threshold)
+    def rebuild_index(
+        self, collection_name: str, field_name: str = "embedding", **kwargs
+    ):
+        collection = self.collection(collection_name)
+        collection.release()
+        collection.drop_index(index_name=self._index_name(collection, field_name))
+        index_params = self.create_index(collection_name, field_name, **kwargs)
+        collection.load()
+        return index_params
+
+    # TODO: Rebuild the AUTO index if the collection's current size calls for another index type
+    def reselect_index(
+        self, collection_name: str, field_name: str = "embedding", metric_type="COSINE"
+    ):
+        """
+        Returns: The new index params if the index was rebuilt, else None
+        """
+        collection = self.collection(collection_name)
+        num_rows = collection.num_entities
+        field = next(f for f in collection.schema.fields if f.name == field_name)
+        current = next(
+            (dict(i.params) for i in collection.indexes if i.field_name == field_name),
+            {},
+        )
+        wanted = select_index(
+            num_rows, field.params["dim"], metric_type, self.vector_mode_of(field)
+        )
+        if current.get("index_type") == wanted["index_type"]:
+            return None
+        logging.info(
+            f"'{collection_name}' has {num_rows} rows: "
+            f"switching index {current.get('index_type')} -> {wanted['index_type']}."
+        )
+        return self.rebuild_index(
+            collection_name, field_name, metric_type=metric_type, num_rows=num_rows
+        )
+
+    @staticmethod
+    def _index_name(collection, field_name: str) -> str:
+        for index in collection.indexes:
+            if index.field_name == field_name:
+                return index.index_name
+        raise ValueError(f"Field '{field_name}' has no index.")
+
+    # TODO: Create scalar (INVERTED) indexes so filter expressions on metadata stay fast
+    def create_scalar_indexes(self, collection_name: str, fields: list = None):
+        if not self.has_collection(collection_name):
+            raise ValueError(f"Collection '{collection_name}' does not exist.")
+        collection = self.collection(collection_name)
+        if fields is None:
+            fields = [
+                f.name
+                for f in collection.schema.fields
+                if f.dtype == DataType.VARCHAR and f.name != "text"
+            ]
+        for field_name in fields:
+            collection.create_index(
+                field_name=field_name,
+                index_params={"index_type": "INVERTED"},
+                index_name=f"{field_name}_idx",
+            )
+            logging.info(f"Scalar index created on '{field_name}'.")
 
     # TODO: List all available collections (useful for debugging)
     def list_collections(self):
         try:
-            return utility.list_collections()
+            return utility.list_collections(using=self.alias)
         except Exception as e:
             logging.error(f"Failed to list collections: {e}")
             return []
-
-    # TODO: Auto-disconnect when object is deleted (if not already disconnected)
-    def __del__(self):
-        self.disconnect()
@@ -1,61 +1,346 @@
-from pymilvus import (
-    Collection,
-)  # Core object in Milvus representing a table of vectorized records.
+from pymilvus import DataType
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.Instrumentation import span
+from services.Milvus.CompactVectors import rerank as rerank_candidates
+from services.Milvus.CompactVectors import to_storage
+from services.Milvus.IndexTuner import (
+    clamp_search_params,
+    default_search_params,
+    load_search_params,
+)
+from services.Milvus.ScalarFields import CORE_FIELDS, normalize_scalar, quote_expr_value
 
 
 class MilvusDataManager:
     # TODO: Stores the Milvus connector and collection name for reuse (should already exist)
-    def __init__(self, connector, collection_name):
+    def __init__(
+        self, connector, collection_name, rerank_store=None, rerank_factor: int = 4
+    ):
+        """
+        rerank_store: LocalDataManager mirroring the full-precision vectors of a float16 / binary
+                      collection (memory-mapped on disk); searches rerank their candidates with it
+        rerank_factor: Candidates fetched per requested result before the rerank
+        """
         self.connector = connector
         self.collection_name = collection_name
+        self.rerank_store = rerank_store
+        self.rerank_factor = rerank_factor
+        self._scalar_fields = None
+        self._vector_mode = None
+        self.version = 0  # Bumped on every write made through this manager
+        self._change_listeners = []
+        self._version_lock = threading.Lock()
+        # ? Tuned by IndexTuner (see `mainApp.py tune`); None -> derived from the index on first search
+        self.search_params = load_search_params(collection_name)
+
+    # TODO: Register a callback run after every write (e.g. to invalidate search caches)
+    def add_change_listener(self, callback):
+        self._change_listeners.append(callback)
+
+    # TODO: Record that the collection changed and notify listeners
+    def _mark_modified(self):
+        with self._version_lock:
+            self.version += 1
+        for callback in self._change_listeners:
+            callback()
+
+    # TODO: Scalar (filterable) fields declared in the collection schema, as {name: max_length}
+    def filterable_fields(self) -> dict:
+        if self._scalar_fields is None:
+            schema = self.connector.collection(self.collection_name).schema
+            self._scalar_fields = {
+                field.name: int(field.params.get("max_length", 256))
+                for field in schema.fields
+                if field.name not in CORE_FIELDS and field.dtype == DataType.VARCHAR
+            }
+        return self._scalar_fields
 
-    # TODO: Insert a single batch of data (IDs, embeddings, text) into Milvus.
-    def insert_embeddings(self, ids, embeddings, texts):
+    # TODO: Storage mode of the embedding field ("float32", "float16" or "binary")
+    def vector_mode(self) -> str:
+        if self._vector_mode is None:
+            schema = self.connector.collection(self.collection_name).schema
+            field = next(f for f in schema.fields if f.name == "embedding")
+            self._vector_mode = self.connector.vector_mode_of(field)
+        return self._vector_mode
+
+    # TODO: Build params of the vector index ({} if the field is not indexed)
+    def index_params(self, field_name: str = "embedding") -> dict:
+        for index in self.connector.collection(self.collection_name).indexes:
+            if index.field_name == field_name:
+                return dict(index.params)
+        return {}
+
+    # TODO: Search params used when none are passed: tuned ones, else defaults for the current index
+    def resolve_search_params(self, top_k: int = 10) -> dict:
+        if self.search_params is None:
+            self.search_params = default_search_params(self.index_params(), top_k)
+            logging.info(
+                f"Using untuned search params {self.search_params} for '{self.collection_name}'."
+            )
+        return self.search_params
+
+    # TODO: Build column-ordered entities, filling scalar fields from the optional metadata dict
+    def _build_entities(self, ids, embeddings, texts, metadata=None):
         if not (len(ids) == len(embeddings) == len(texts)):
             raise ValueError("Length mismatch among ids, embeddings, and texts.")
 
-        collection = Collection(self.collection_name)
-        entities = [ids, embeddings, texts]
-        collection.insert(entities)
+        entities = [ids, to_storage(embeddings, self.vector_mode()), texts]
+        metadata = metadata or {}
+        for name, max_length in self.filterable_fields().items():
+            values = metadata.get(name)
+            if values is None:
+                values = [""] * len(ids)
+            elif len(values) != len(ids):
+                raise ValueError(f"Length mismatch for metadata field '{name}'.")
+            entities.append([normalize_scalar(v, max_length) for v in values])
+        return entities
+
+    # TODO: Insert a single batch of data (IDs, embeddings, text, optional metadata) into Milvus.
+    def insert_embeddings(self, ids, embeddings, texts, metadata=None):
+        entities = self._build_entities(ids, embeddings, texts, metadata)
+        self.connector.execute(self.collection_name, lambda c: c.insert(entities))
+        if self.rerank_store is not None:
+            self.rerank_store.insert_embeddings(ids, embeddings, [""] * len(ids))
+        self._mark_modified()
         logging.info(
             f"Inserted {len(ids)} vectors into collection '{self.collection_name}'."
         )
 
+    # TODO: Insert or overwrite records by primary key (used by delta ingestion).
+    def upsert_embeddings(self, ids, embeddings, texts, metadata=None):
+        entities = self._build_entities(ids, embeddings, texts, metadata)
+        self.connector.execute(self.collection_name, lambda c: c.upsert(entities))
+        if self.rerank_store is not None:
+            self.rerank_store.upsert_embeddings(ids, embeddings, [""] * len(ids))
+        self._mark_modified()
+        logging.info(
+            f"Upserted {len(ids)} vectors into collection '{self.collection_name}'."
+        )
+
+    # TODO: Delete records by primary key.
+    def delete_by_ids(self, ids):
+        if not ids:
+            return
+        id_list = ", ".join(str(int(i)) for i in ids)
+        self.connector.execute(
+            self.collection_name, lambda c: c.delete(expr=f"id in [{id_list}]")
+        )
+        if self.rerank_store is not None:
+            self.rerank_store.delete_by_ids(ids)
+        self._mark_modified()
+        logging.info(
+            f"Deleted {len(ids)} records from collection '{self.collection_name}'."
+        )
+
+    # TODO: Seal pending segments so inserted/deleted data is persisted and searchable.
+    def flush(self):
+        self.connector.execute(self.collection_name, lambda c: c.flush())
+        if self.rerank_store is not None:
+            self.rerank_store.flush()
+        # ? Flushed rows become visible to searches, so cached results are stale now
+        self._mark_modified()
+        logging.info(f"Flushed collection '{self.collection_name}'.")
+
     # TODO: Insert large datasets in chunks to avoid memory overload or performance drops.
-    def batch_insert_embeddings(self, ids, embeddings, texts, batch_size=500):
+    def batch_insert_embeddings(
+        self, ids, embeddings, texts, batch_size=500, metadata=None, workers=None
+    ):
+        """
+        workers: Batches inserted concurrently, each on its own pooled connection
+                 (default: the connector's pool size)
+        """
         total = len(ids)
-        for start in range(0, total, batch_size):
+        started = time.perf_counter()
+        done = [0]
+        progress_lock = threading.Lock()
+
+        def insert_batch(start):
             end = min(start + batch_size, total)
-            logging.info(f"Inserting records {start + 1} to {end}")
-            batch_ids = ids[start:end]
-            batch_emb = embeddings[start:end]
-            batch_texts = texts[start:end]
-            self.insert_embeddings(batch_ids, batch_emb, batch_texts)
-        logging.info("Batch insertion completed.")
+            batch_meta = (
+                {k: v[start:end] for k, v in metadata.items()} if metadata else None
+            )
+            with span("milvus.insert_batch", rows=end - start) as s:
+                self.insert_embeddings(
+                    ids[start:end], embeddings[start:end], texts[start:end], batch_meta
+                )
+            with progress_lock:
+                done[0] += end - start
+                finished = done[0]
+            logging.info(
+                f"Inserted records {start + 1} to {end} "
+                f"({(end - start) / s.wall_s:.0f} rows/sec, {finished / total:.0%} done)"
+            )
+
+        starts = range(0, total, batch_size)
+        workers = min(workers or self.connector.pool_size, len(starts)) or 1
+        if workers == 1:
+            for start in starts:
+                insert_batch(start)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # ? list() re-raises the first failed batch
+                list(pool.map(insert_batch, starts))
+        elapsed = time.perf_counter() - started
+        logging.info(
+            f"Batch insertion completed: {total} rows in {elapsed:.2f}s "
+            f"({total / elapsed if elapsed else 0:.0f} rows/sec, {workers} workers)."
+        )
+
+    # TODO: Translate {field: value} filters on scalar fields into a Milvus boolean expression.
+    def build_filter_expr(self, filters):
+        """
+        Returns: (expr, leftover) where leftover holds filters on fields the collection cannot filter on.
+        """
+        if not filters:
+            return None, {}
+        fields = self.filterable_fields()
+        clauses, leftover = [], {}
+        for key, val in filters.items():
+            if key in fields:
+                value = normalize_scalar(val, fields[key])
+                clauses.append(f"{key} == {quote_expr_value(value)}")
+            else:
+                leftover[key] = val
+        return (" and ".join(clauses) or None), leftover
 
     # TODO: Search the Milvus collection for top-k most similar vectors to a given embedding.
-    def search(self, query_embedding, top_k=5):
-        collection = Collection(self.collection_name)
-        search_params = {
-            "metric_type": "COSINE",
-            "params": {"nprobe": 10},
-        }
-        results = collection.search(
-            [query_embedding],
-            "embedding",
-            param=search_params,
-            limit=top_k,
-            output_fields=["text"],
+    def search(self, query_embedding, top_k=5, filters=None, expr=None):
+        """
+        filters: {field: value} on scalar fields, applied inside the ANN search (pre-filtering)
+        expr: Raw Milvus boolean expression, combined with filters using 'and'
+        """
+        return self.search_many(
+            [query_embedding], top_k=top_k, filters=filters, expr=expr
+        )[0]
+
+    # TODO: Search many queries at once with chunked multi-vector requests; returns one result list per query.
+    def search_many(
+        self,
+        queries,
+        top_k=5,
+        output_fields=None,
+        filters=None,
+        expr=None,
+        chunk_size=64,
+        embedder=None,
+        batch_size=32,
+        search_params=None,
+        workers=None,
+        rerank=None,
+    ):
+        """
+        queries: 2-D array / list of query vectors, or a list of raw texts (encoded in one batch)
+        top_k: int, or a list with one top_k per query
+        output_fields: list of fields, or a list with one field list per query (default ['text'])
+        filters / expr: Same as search(), applied to every query
+        chunk_size: Queries sent per Milvus search request
+        embedder: MilvusEmbedder used when queries are texts
+        search_params: Override of the tuned/default index search params (e.g. {"params": {"ef": 64}})
+        workers: Chunks searched concurrently on pooled connections (default: the connector's pool size)
+        rerank: Fetch rerank_factor x top_k candidates and re-order them by exact cosine against the
+                rerank_store (default: on when a rerank_store is attached); scores are then cosine
+        """
+        if len(queries) == 0:
+            return []
+        if isinstance(queries[0], str):
+            if embedder is None:
+                raise ValueError("Raw text queries need an embedder.")
+            queries = embedder.encode(
+                list(queries), batch_size=batch_size, show_progress_bar=False
+            )
+
+        n = len(queries)
+        top_ks = list(top_k) if isinstance(top_k, (list, tuple)) else [top_k] * n
+        if output_fields is None:
+            output_fields = ["text"]
+        per_query_fields = (
+            [list(f) for f in output_fields]
+            if output_fields and isinstance(output_fields[0], (list, tuple))
+            else [list(output_fields)] * n
         )
-        res_list = []
-        for hits in results:
-            for hit in hits:
-                res_list.append(
-                    {
-                        "id": hit.id,
-                        "score": hit.distance,
-                        "text": hit.entity.get("text"),
-                    }
-                )
-        return res_list
+        if len(top_ks) != n or len(per_query_fields) != n:
+            raise ValueError(
+                "Per-query top_k/output_fields must match the query count."
+            )
+
+        filter_expr, leftover = self.build_filter_expr(filters)
+        if leftover:
+            raise ValueError(
+                f"Fields not filterable in '{self.collection_name}': {sorted(leftover)}"
+            )
+        expr = " and ".join(f"({e})" for e in (filter_expr, expr) if e) or None
+
+        mode = self.vector_mode()
+        if rerank is None:
+            rerank = self.rerank_store is not None and self.rerank_factor > 1
+        if rerank and self.rerank_store is None:
+            raise ValueError("rerank=True needs a rerank_store.")
+        widen = self.rerank_factor if rerank else 1
+        if search_params is None:
+            search_params = self.resolve_search_params(max(top_ks) * widen)
+
+        def search_chunk(start):
+            end = min(start + chunk_size, n)
+            # ? One request per chunk: fetch the widest top_k/fields, then trim per query
+            fields = sorted({f for fl in per_query_fields[start:end] for f in fl})
+            data = (
+                [list(map(float, q)) for q in queries[start:end]]
+                if mode == "float32"
+                else to_storage(queries[start:end], mode)
+            )
+            limit = max(top_ks[start:end]) * widen
+            # ? Cached/tuned ef is a floor; Milvus rejects HNSW searches with ef < limit
+            params = clamp_search_params(search_params, limit)
+            results = self.connector.execute(
+                self.collection_name,
+                lambda c: c.search(
+                    data,
+                    "embedding",
+                    param=params,
+                    limit=limit,
+                    expr=expr,
+                    output_fields=fields,
+                ),
+            )
+            chunk_results = []
+            for offset, hits in enumerate(results):
+                i = start + offset
+                hits = list(hits)
+                if rerank and hits:
+                    # ? Compact scores only pick candidates; exact cosine decides the order
+                    order, scores = rerank_candidates(
+                        queries[i],
+                        self.rerank_store.get_vectors([hit.id for hit in hits]),
+                        top_ks[i],
+                    )
+                    ranked = [
+                        (hits[j], float(score)) for j, score in zip(order, scores)
+                    ]
+                elif mode == "binary":
+                    # ? Hamming distance -> cosine of the +-1 vectors, so higher stays better
+                    dim = len(queries[i])
+                    ranked = [(hit, 1 - 2 * hit.distance / dim) for hit in hits]
+                else:
+                    ranked = [(hit, hit.distance) for hit in hits]
+                res_list = []
+                for hit, score in ranked[: top_ks[i]]:
+                    res = {"id": hit.id, "score": score}
+                    for field in per_query_fields[i]:
+                        res[field] = hit.entity.get(field)
+                    res_list.append(res)
+                chunk_results.append(res_list)
+            return chunk_results
+
+        starts = range(0, n, chunk_size)
+        workers = min(workers or self.connector.pool_size, len(starts))
+        if workers <= 1:
+            chunks = [search_chunk(start) for start in starts]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # ? map() keeps chunk order, so results stay aligned with the queries
+                chunks = list(pool.map(search_chunk, starts))
+        return [res_list for chunk in chunks for res_list in chunk]
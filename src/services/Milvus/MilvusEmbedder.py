@@ -1,34 +1,277 @@
-# HuggingFace-based library optimized for sentence-level embeddings.
-from sentence_transformers import SentenceTransformer
 import logging
+import os
+import platform
+import time
+
+import numpy as np
+
+from services.Instrumentation import span
+from services.Milvus.EmbeddingCache import EmbeddingCache
+
+# ? "torch": reference fp32 PyTorch model; "onnx": exported ONNX graph on onnxruntime;
+#   "onnx-int8": dynamically int8-quantized ONNX graph (both ONNX backends need requirements-onnx.txt)
+BACKENDS = ("torch", "onnx", "onnx-int8")
+# ? Packages each ONNX backend imports on top of sentence-transformers (import name -> pip name)
+ONNX_REQUIREMENTS = {"onnxruntime": "onnxruntime", "optimum": "optimum[onnxruntime]"}
+ONNX_EXPORT_DIR = "../data/interim/onnx_models"
+
+
+# TODO: Pick the int8 kernel set the current CPU supports best
+def _quantization_config() -> str:
+    # ? platform.machine() also works on Windows (os.uname() does not exist there)
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "arm64"
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return "avx2"
+    if "avx512_vnni" in flags:
+        return "avx512_vnni"
+    if "avx512f" in flags:
+        return "avx512"
+    return "avx2"
+
+
+# TODO: Load a SentenceTransformer for the given inference backend (exports/quantizes once, then reuses the files)
+def load_sentence_model(model_name: str, backend: str = "torch", threads: int = None):
+    """
+    threads: Intra-op thread cap for the ONNX backends (e.g. one share of the cores per pool worker)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown embedder backend '{backend}' (use one of {BACKENDS})."
+        )
+
+    if backend != "torch":
+        import importlib.util
+
+        missing = [
+            pip_name
+            for module, pip_name in ONNX_REQUIREMENTS.items()
+            if importlib.util.find_spec(module) is None
+        ]
+        if missing:
+            raise ImportError(
+                f"The '{backend}' embedder backend needs {', '.join(missing)} "
+                f"(pip install -r requirements-onnx.txt)."
+            )
+
+    # ? Imported lazily: torch alone costs seconds of startup.
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    model_kwargs = {}
+    if threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        model_kwargs["session_options"] = session_options
+    if backend == "onnx":
+        return SentenceTransformer(
+            model_name, backend="onnx", model_kwargs=model_kwargs or None
+        )
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    config = _quantization_config()
+    export_dir = os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "__"))
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        logging.info(f"Quantizing '{model_name}' to int8 ({config}) in {export_dir}...")
+        onnx_model = SentenceTransformer(model_name, backend="onnx")
+        onnx_model.save_pretrained(export_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, config, export_dir)
+    return SentenceTransformer(
+        export_dir,
+        backend="onnx",
+        model_kwargs={"file_name": file_name, **model_kwargs},
+    )
 
 
 class MilvusEmbedder:
     # TODO: Loads the SentenceTransformer model at init where Default model: all-MiniLM-L6-v2
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache_dir: str = "../data/interim/embedding_cache",
+        cache_max_bytes: int = 512 * 1024 * 1024,
+        num_workers: int = 1,
+        parallel_threshold: int = 256,
+        backend: str = "torch",
+    ):
+        """
+        model_name: SentenceTransformer model to load
+        cache_dir: Folder for the persistent embedding cache (None disables caching)
+        cache_max_bytes: Size bound of the cache before least recently used vectors are evicted
+        num_workers: >1 sends large encodes to a multi-process, length-bucketed EncodingEngine
+        parallel_threshold: Minimum number of uncached texts before the worker pool is used
+        backend: Inference backend, one of BACKENDS (all produce 384-dim vectors for the same collection)
+        """
+        self.model_name = model_name
+        self.backend = backend
         try:
             # ? This model gives 384-dim embeddings, good for general similarity tasks
-            self.model = SentenceTransformer(model_name)
-            logging.info(f"Embedder initialized with model: {model_name}")
+            self.model = load_sentence_model(model_name, backend)
+            logging.info(
+                f"Embedder initialized with model: {model_name} (backend: {backend})"
+            )
         except Exception as e:
             logging.error(f"Failed to load embedding model '{model_name}': {e}")
             raise
 
+        # ? Quantized vectors differ slightly from fp32 ones, so they get their own cache keys
+        self.cache_namespace = (
+            model_name if backend == "torch" else f"{model_name}@{backend}"
+        )
+
+        self.cache = (
+            EmbeddingCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+        )
+
+        self.engine = None
+        self.parallel_threshold = parallel_threshold
+        if num_workers > 1:
+            from services.Milvus.EncodingEngine import EncodingEngine
+
+            self.engine = EncodingEngine(
+                model_name, num_workers=num_workers, batch_size=32, backend=backend
+            )
+
     # TODO: Generate vector embeddings from a list of input texts
-    def encode(self, texts: list, batch_size: int = 32, normalize: bool = True):
+    def encode(
+        self,
+        texts: list,
+        batch_size: int = 32,
+        normalize: bool = True,
+        show_progress_bar: bool = True,
+    ):
         if not texts or not isinstance(texts, list):
             raise ValueError("Input must be a non-empty list of strings.")
 
-        try:
-            # ? normalize_embeddings=True scales vectors to unit length (optional but good for cosine similarity)
-            embeddings = self.model.encode(
+        # ? Texts repeated inside the batch are encoded once and fanned back out
+        unique_texts = list(dict.fromkeys(texts))
+        vectors = {}
+
+        keys = {}
+        if self.cache is not None:
+            keys = {
+                text: EmbeddingCache.make_key(self.cache_namespace, normalize, text)
+                for text in unique_texts
+            }
+            cached = self.cache.get_many(list(keys.values()))
+            for text, key in keys.items():
+                if key in cached:
+                    vectors[text] = cached[key]
+
+        missing = [text for text in unique_texts if text not in vectors]
+        if missing:
+            try:
+                with span("embedder.model_encode", rows=len(missing)):
+                    encoded = self._encode_missing(
+                        missing, batch_size, normalize, show_progress_bar
+                    )
+            except Exception as e:
+                logging.error(f"Embedding generation failed: {e}")
+                raise
+            encoded = np.asarray(encoded, dtype=np.float32)
+            for text, vec in zip(missing, encoded):
+                vectors[text] = vec
+            if self.cache is not None:
+                self.cache.put_many([keys[text] for text in missing], encoded)
+
+        embeddings = np.stack([vectors[text] for text in texts]).astype(
+            np.float32, copy=False
+        )
+        logging.info(
+            f"Successfully encoded {len(texts)} texts "
+            f"({len(unique_texts)} unique, {len(missing)} sent to the model)."
+        )
+        return embeddings
+
+    # TODO: Run the model on cache misses (worker pool for big jobs, in-process otherwise)
+    def _encode_missing(self, missing, batch_size, normalize, show_progress_bar):
+        if self.engine is not None and len(missing) >= self.parallel_threshold:
+            # ? Big jobs: token-length buckets spread over one model per core
+            return self.engine.encode(missing, normalize=normalize)
+        # ? normalize_embeddings=True scales vectors to unit length (optional but good for cosine similarity)
+        return self.model.encode(
+            missing,
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            normalize_embeddings=normalize,
+        )
+
+    # TODO: Shut down the worker pool and close the embedding cache
+    def close(self):
+        if self.engine is not None:
+            self.engine.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# TODO: Measure cosine agreement and speedup of each backend against the reference backend
+def compare_backends(
+    texts: list,
+    model_name: str = "all-MiniLM-L6-v2",
+    backends: tuple = BACKENDS,
+    reference: str = "torch",
+    batch_size: int = 32,
+    repeat: int = 3,
+    min_cosine: float = 0.99,
+) -> dict:
+    """
+    texts: Representative sample (e.g. test case descriptions)
+    backends: Backends to evaluate; the reference is always included
+    repeat: Timed passes per backend after one warm-up pass (best time is kept)
+    min_cosine: Agreement every vector must reach for a backend to be "accepted"
+    Returns {backend: {seconds, texts_per_sec, speedup, mean_cosine, min_cosine, accepted}}
+    """
+    if not texts:
+        raise ValueError("Input must be a non-empty list of strings.")
+
+    runs = {}
+    for backend in dict.fromkeys((reference, *backends)):
+        model = load_sentence_model(model_name, backend)
+        model.encode(texts[:batch_size], batch_size=batch_size)  # ? warm-up
+        best = None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            vectors = model.encode(
                 texts,
                 batch_size=batch_size,
-                show_progress_bar=True,
-                normalize_embeddings=normalize,
+                show_progress_bar=False,
+                normalize_embeddings=True,
             )
-            logging.info(f"Successfully encoded {len(texts)} texts.")
-            return embeddings
-        except Exception as e:
-            logging.error(f"Embedding generation failed: {e}")
-            raise
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        runs[backend] = (np.asarray(vectors, dtype=np.float32), best)
+
+    ref_vectors, ref_seconds = runs[reference]
+    report = {}
+    for backend, (vectors, seconds) in runs.items():
+        if vectors.shape != ref_vectors.shape:
+            raise ValueError(
+                f"Backend '{backend}' produced shape {vectors.shape}, expected {ref_vectors.shape}."
+            )
+        # ? Both sides are unit-normalized, so the row-wise dot product is the cosine
+        cosines = np.einsum("ij,ij->i", vectors, ref_vectors)
+        report[backend] = {
+            "seconds": round(seconds, 3),
+            "texts_per_sec": round(len(texts) / seconds, 1) if seconds else 0.0,
+            "speedup": round(ref_seconds / seconds, 2) if seconds else 0.0,
+            "mean_cosine": round(float(cosines.mean()), 5),
+            "min_cosine": round(float(cosines.min()), 5),
+            "accepted": bool(cosines.min() >= min_cosine),
+        }
+        logging.info(f"Backend '{backend}': {report[backend]}")
+    return report
@@ -1,38 +1,66 @@
+from services.Milvus.KeywordIndex import reciprocal_rank_fusion
+from services.Milvus.QueryCache import LRUCache, normalize_prompt, vector_hash
+
+
 class MilvusSearchCLI:
     # TODO: Initialize the CLI
-    def __init__(self, embedder, data_manager, df_metadata=None):
+    def __init__(
+        self,
+        embedder,
+        data_manager,
+        df_metadata=None,
+        embedding_cache_size=1024,
+        result_cache_size=256,
+        client=None,
+        keyword_index=None,
+        fuse=False,
+    ):
         """
         embedder: MilvusEmbedder instance - To convert text queries into vector embeddings
         data_manager: MilvusDataManager instance - To perform the actual vector search in Milvus
         df_metadata: Pandas DataFrame with metadata and 'id' column for filtering
                         - A DataFrame containing metadata corresponding to each vector
+        embedding_cache_size: Max query embeddings kept (keyed by normalized prompt)
+        result_cache_size: Max search results kept (keyed by vector hash, top_k, filters, search params)
+        client: Optional RemoteSearchClient; the CLI then only forwards queries to the search service
+        keyword_index: Optional KeywordIndex; ID-shaped or "quoted" queries are answered from it (no encode)
+        fuse: Merge dense hits with keyword hits (reciprocal rank fusion) for every other query
         """
         self.embedder = embedder
         self.data_manager = data_manager
         self.df_metadata = df_metadata
+        self._metadata_by_id = None  # Lazily built id-indexed view of df_metadata
+        self.client = client
+        self.keyword_index = keyword_index
+        self.fuse = fuse
+
+        self.query_cache = LRUCache(embedding_cache_size)
+        self.result_cache = LRUCache(result_cache_size)
+        # ? Any write through the data manager makes cached results stale
+        if hasattr(data_manager, "add_change_listener"):
+            data_manager.add_change_listener(self.result_cache.clear)
+
+    # TODO: Embed a prompt, reusing the cached vector for repeated/re-spaced/re-cased prompts
+    def _embed_query(self, prompt):
+        key = normalize_prompt(prompt)
+        vector = self.query_cache.get(key)
+        if vector is None:
+            vector = self.embedder.encode([key], show_progress_bar=False)[0]
+            self.query_cache.put(key, vector)
+        return vector
 
-    # TODO: Run a semantic search for the given prompt, then filter results based on metadata if filters are provided.
+    # TODO: Hit/miss counters of both caches
+    def cache_stats(self):
+        if self.client is not None:
+            return {"service": self.client.stats()}
+        return {
+            "query_embeddings": self.query_cache.stats(),
+            "results": self.result_cache.stats(),
+        }
+
+    # TODO: Run a semantic search for the given prompt; filters on scalar fields are pushed into Milvus.
     def search_with_filter(self, prompt, top_k=5, filters=None):
-        query_vector = self.embedder.encode([prompt])[0]
-        results = self.data_manager.search(query_vector, top_k=top_k)
-
-        if filters and self.df_metadata is not None:
-            filtered_results = []
-            for res in results:
-                row = self.df_metadata[self.df_metadata["id"] == res["id"]]
-                if row.empty:
-                    continue
-                match = True
-                for key, val in filters.items():
-                    if (
-                        key not in row.columns
-                        or str(row.iloc[0][key]).lower() != str(val).lower()
-                    ):
-                        match = False
-                        break
-                if match:
-                    filtered_results.append(res)
-            results = filtered_results
+        results = self.search(prompt, top_k=top_k, filters=filters)
 
         print(
             f"\nSearch results for: '{prompt}' (filtered by {filters})"
@@ -43,13 +71,134 @@ class MilvusSearchCLI:
             print("No matching results found.")
         else:
             for i, res in enumerate(results, 1):
-                print(f"{i}. [Score: {res['score']:.4f}] {res['text']}")
+                match = f" [{res['match']}]" if res.get("match") else ""
+                print(f"{i}. [Score: {res['score']:.4f}]{match} {res['text']}")
+
+    # TODO: Return the filtered top-k hits for a prompt: keyword lookups, semantic search, or both fused.
+    def search(self, prompt, top_k=5, filters=None):
+        if self.client is not None:
+            # ? The service holds the warm model/collection and does its own batching
+            return self.client.search(prompt, top_k=top_k, filters=filters)
+
+        # ? Lookups (a TCID, "REQ-1234", a "quoted error string") skip the encode and the ANN search
+        hits = self.keyword_lookup(prompt, top_k, filters)
+        if hits:
+            return hits
+
+        results = self._dense_search(prompt, top_k, filters)
+        return self.fuse_keyword_hits(prompt, results, top_k, filters)
+
+    # TODO: Keyword-index answer for lookup-style prompts ([] for other prompts or without an index)
+    def keyword_lookup(self, prompt, top_k=5, filters=None):
+        if self.keyword_index is None or not self.keyword_index.is_lookup(prompt):
+            return []
+        return self._keyword_search(prompt, top_k, filters)
+
+    # TODO: Merge keyword hits into dense results when fusion is on (results unchanged otherwise)
+    def fuse_keyword_hits(self, prompt, results, top_k=5, filters=None):
+        if not self.fuse or self.keyword_index is None:
+            return results
+        hits = self._keyword_search(prompt, top_k, filters)
+        if not hits:
+            return results
+        return reciprocal_rank_fusion([results, hits], top_k=top_k)
+
+    # TODO: Split filters into scalar fields the store pre-filters and leftovers checked against df_metadata
+    def split_filters(self, filters):
+        pushed, leftover = {}, dict(filters or {})
+        if filters and hasattr(self.data_manager, "filterable_fields"):
+            fields = self.data_manager.filterable_fields()
+            pushed = {k: v for k, v in filters.items() if k in fields}
+            leftover = {k: v for k, v in filters.items() if k not in fields}
+        return pushed, leftover
+
+    # TODO: ANN candidates to fetch for top_k (widened when leftovers are post-filtered)
+    def candidate_limit(self, top_k, leftover):
+        return top_k * 10 if leftover and self.df_metadata is not None else top_k
+
+    # TODO: Apply leftover filters to ANN candidates and trim them to top_k
+    def finish_candidates(self, results, top_k, leftover):
+        if leftover and self.df_metadata is not None:
+            return self._post_filter(results, leftover)[:top_k]
+        return results[:top_k]
+
+    # TODO: Keyword-index hits for a prompt; filters are checked against df_metadata ([] if they cannot be)
+    def _keyword_search(self, prompt, top_k=5, filters=None):
+        if not filters:
+            return self.keyword_index.lookup(prompt, top_k=top_k)
+        if self.df_metadata is None:
+            return []
+        hits = self.keyword_index.lookup(prompt, top_k=top_k * 10)
+        return self._post_filter(hits, filters)[:top_k]
+
+    # TODO: Embedding + ANN search, served from the result cache when possible
+    def _dense_search(self, prompt, top_k=5, filters=None):
+        query_vector = self._embed_query(prompt)
+
+        cache_key = (
+            vector_hash(query_vector),
+            top_k,
+            tuple(sorted((k, str(v).lower()) for k, v in (filters or {}).items())),
+            repr(getattr(self.data_manager, "search_params", None)),
+        )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        # ? Filters on collection scalar fields become a Milvus expr applied during the ANN search,
+        #   so a filtered query still returns a full top-k
+        pushed, leftover = self.split_filters(filters)
+
+        # ? Remaining filters are checked against df_metadata, so widen the candidate set for them
+        results = self.data_manager.search(
+            query_vector,
+            top_k=self.candidate_limit(top_k, leftover),
+            filters=pushed or None,
+        )
+        results = self.finish_candidates(results, top_k, leftover)
+
+        self.result_cache.put(cache_key, list(results))
+        return results
+
+    # TODO: Run many prompts in one encode call and chunked multi-vector searches (batch tooling).
+    def search_batch(self, prompts, top_k=5, filters=None):
+        """
+        Returns: list with one result list per prompt, in prompt order.
+        """
+        return self.data_manager.search_many(
+            list(prompts), top_k=top_k, filters=filters, embedder=self.embedder
+        )
+
+    # TODO: Keep only hits whose df_metadata row matches every filter (indexed id lookup, no full scans)
+    def _post_filter(self, results, filters):
+        if self._metadata_by_id is None:
+            self._metadata_by_id = (
+                self.df_metadata.drop_duplicates("id").set_index("id").astype(str)
+            )
+            for col in self._metadata_by_id.columns:
+                self._metadata_by_id[col] = self._metadata_by_id[col].str.lower()
+
+        table = self._metadata_by_id
+        if any(key not in table.columns for key in filters):
+            return []
+        filtered_results = []
+        for res in results:
+            if res["id"] not in table.index:
+                continue
+            row = table.loc[res["id"]]
+            if all(row[key] == str(val).lower() for key, val in filters.items()):
+                filtered_results.append(res)
+        return filtered_results
 
     # TODO: Provide a user-friendly REPL (Read-Eval-Print Loop) CLI to perform searches and filtering until the user exits.
     def interactive_cli(self):
         print("\n--- Interactive Search CLI ---")
         print("Type 'exit' or 'quit' to stop.")
-        print("You can add filters like: priority=High functionalarea=Login\n")
+        print("You can add filters like: priority=High functionalarea=Login")
+        print("Type ':stats' to show cache hit/miss counters.")
+        if self.keyword_index is not None:
+            print("Type ':fuse' to toggle fusing keyword hits into semantic results.")
+        print()
 
         while True:
             raw_input = input(
@@ -57,6 +206,13 @@ class MilvusSearchCLI:
             ).strip()
             if raw_input.lower() in ("exit", "quit"):
                 break
+            if raw_input.lower() == ":stats":
+                print(self.cache_stats())
+                continue
+            if raw_input.lower() == ":fuse" and self.keyword_index is not None:
+                self.fuse = not self.fuse
+                print(f"Keyword fusion {'on' if self.fuse else 'off'}.")
+                continue
             if not raw_input:
                 continue
 
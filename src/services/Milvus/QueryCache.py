@@ -0,0 +1,63 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+
+# TODO: Normalize a prompt so trivial rephrasings (case, spacing) share a cache entry
+def normalize_prompt(prompt: str) -> str:
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+# TODO: Stable hash of a query vector (float32 bytes) for result-cache keys
+def vector_hash(vector) -> str:
+    import numpy as np
+
+    return hashlib.sha1(np.asarray(vector, dtype=np.float32).tobytes()).hexdigest()
+
+
+class LRUCache:
+    # TODO: Bounded, thread-safe least-recently-used cache with hit/miss counters
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    # TODO: Return the cached value (refreshing its recency) or None on a miss
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    # TODO: Store a value, evicting the least recently used entry when full
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    # TODO: Drop every entry (counters are kept)
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    # TODO: Counters for monitoring cache effectiveness
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
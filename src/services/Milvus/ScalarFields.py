@@ -0,0 +1,19 @@
+import math
+
+# ? Metadata columns stored as filterable scalar fields in new collections (name: max_length)
+DEFAULT_SCALAR_FIELDS = {"priority": 64, "functionalarea": 256}
+
+# ? Fields every collection has; anything else in the schema is a filterable scalar field
+CORE_FIELDS = ("id", "embedding", "text")
+
+
+# TODO: Normalize a metadata value the same way at insert and query time (trimmed, lowercase)
+def normalize_scalar(value, max_length: int = 256) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value).strip().lower()[:max_length]
+
+
+# TODO: Quote a string literal for a Milvus boolean expression
+def quote_expr_value(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
@@ -0,0 +1,274 @@
+import json
+import logging
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from services.Milvus.MilvusSearchCLI import MilvusSearchCLI
+from services.Milvus.QueryCache import normalize_prompt
+
+
+class MicroBatcher:
+    # TODO: Coalesce concurrent search requests into one encode + one search_many per filter group
+    def __init__(
+        self, embedder, data_manager, window_ms=10, max_batch=64, searcher=None
+    ):
+        """
+        embedder: MilvusEmbedder kept warm for the lifetime of the service
+        data_manager: MilvusDataManager / LocalDataManager with search_many
+        window_ms: How long the first request of a batch waits for company
+        max_batch: Upper bound of requests per micro-batch
+        searcher: MilvusSearchCLI whose filter split (pre-filter / df_metadata post-filter),
+                  keyword lookups and fusion are applied, so the service answers like the CLI
+        """
+        self.embedder = embedder
+        self.data_manager = data_manager
+        self.searcher = searcher or MilvusSearchCLI(embedder, data_manager)
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._latencies = deque(maxlen=10000)
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run, name="micro-batcher", daemon=True
+        )
+        self._worker.start()
+
+    # TODO: Enqueue one query; returns a Future resolving to its result list
+    def submit(self, prompt, top_k=5, filters=None) -> Future:
+        future = Future()
+        self._queue.put((time.perf_counter(), prompt, top_k, filters or {}, future))
+        return future
+
+    # TODO: Block until the next batch is available: first request, then whatever arrives within the window
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if batch:
+                self._process(batch)
+
+    # TODO: Keyword lookups first, one encode call for the rest, then one search_many per distinct filter set
+    def _process(self, batch):
+        searcher = self.searcher
+        pending = []
+        for pos, (_, prompt, top_k, filters, future) in enumerate(batch):
+            try:
+                hits = searcher.keyword_lookup(prompt, top_k, filters)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            if hits:
+                future.set_result(hits)
+            else:
+                pending.append(pos)
+
+        vectors = {}
+        if pending:
+            try:
+                prompts = [normalize_prompt(batch[p][1]) for p in pending]
+                encoded = self.embedder.encode(prompts, show_progress_bar=False)
+                vectors = dict(zip(pending, encoded))
+            except Exception as e:
+                for p in pending:
+                    batch[p][4].set_exception(e)
+                pending = []
+
+        # ? Same normalization as the filter values themselves, so equal filter sets share a search
+        groups = {}
+        for pos in pending:
+            key = tuple(
+                sorted((k, str(v).strip().lower()) for k, v in batch[pos][3].items())
+            )
+            groups.setdefault(key, []).append(pos)
+
+        for key, positions in groups.items():
+            try:
+                pushed, leftover = searcher.split_filters(dict(key))
+                results = self.data_manager.search_many(
+                    [vectors[p] for p in positions],
+                    top_k=[
+                        searcher.candidate_limit(batch[p][2], leftover)
+                        for p in positions
+                    ],
+                    filters=pushed or None,
+                )
+                for p, res in zip(positions, results):
+                    _, prompt, top_k, filters, _ = batch[p]
+                    res = searcher.finish_candidates(res, top_k, leftover)
+                    batch[p][4].set_result(
+                        searcher.fuse_keyword_hits(prompt, res, top_k, filters)
+                    )
+            except Exception as e:
+                for p in positions:
+                    if not batch[p][4].done():
+                        batch[p][4].set_exception(e)
+
+        done = time.perf_counter()
+        with self._stats_lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self._latencies.extend(done - item[0] for item in batch)
+
+    # TODO: Latency percentiles, queue depth and batching efficiency
+    def stats(self) -> dict:
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            requests, batches = self.requests, self.batches
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            idx = min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))
+            return round(latencies[idx] * 1000, 2)
+
+        return {
+            "requests": requests,
+            "batches": batches,
+            "avg_batch_size": round(requests / batches, 2) if batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "p50_ms": pct(50),
+            "p99_ms": pct(99),
+        }
+
+    def stop(self):
+        self._stopped.set()
+        self._worker.join(timeout=2)
+
+
+class _SearchHandler(BaseHTTPRequestHandler):
+    batcher = None  # Set by SearchServer
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.batcher.stats())
+        elif self.path == "/health":
+            self._send(200, {"status": "ok"})
+        else:
+            self._send(404, {"error": f"Unknown path '{self.path}'"})
+
+    def do_POST(self):
+        if self.path != "/search":
+            self._send(404, {"error": f"Unknown path '{self.path}'"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            prompt = request["prompt"]
+            future = self.batcher.submit(
+                prompt, int(request.get("top_k", 5)), request.get("filters")
+            )
+            self._send(200, {"results": future.result(timeout=60)})
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            logging.exception("Search request failed")
+            self._send(500, {"error": str(e)})
+
+    def log_message(self, format, *args):
+        logging.debug("search-server: " + format % args)
+
+
+class SearchServer:
+    # TODO: Long-running localhost HTTP service keeping the model and collection warm
+    def __init__(
+        self,
+        embedder,
+        data_manager,
+        host="127.0.0.1",
+        port=8765,
+        window_ms=10,
+        max_batch=64,
+        df_metadata=None,
+        keyword_index=None,
+        fuse=False,
+    ):
+        """
+        df_metadata / keyword_index / fuse: As for MilvusSearchCLI (post-filters, lookups, fusion)
+        """
+        searcher = MilvusSearchCLI(
+            embedder,
+            data_manager,
+            df_metadata=df_metadata,
+            keyword_index=keyword_index,
+            fuse=fuse,
+        )
+        self.batcher = MicroBatcher(
+            embedder, data_manager, window_ms, max_batch, searcher=searcher
+        )
+        handler = type("SearchHandler", (_SearchHandler,), {"batcher": self.batcher})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+
+    # TODO: Serve until interrupted (Ctrl+C)
+    def serve_forever(self):
+        logging.info(f"Search service listening on {self.url}")
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Search service stopping...")
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.httpd.server_close()
+        self.batcher.stop()
+
+
+class RemoteSearchClient:
+    # TODO: Thin client for SearchServer with the same search() shape as MilvusSearchCLI
+    def __init__(self, url="http://127.0.0.1:8765", timeout=60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(
+            self.url + path,
+            data=data,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", str(e))
+            raise RuntimeError(f"Search service error ({e.code}): {message}") from e
+
+    def search(self, prompt, top_k=5, filters=None):
+        payload = {"prompt": prompt, "top_k": top_k, "filters": filters or {}}
+        return self._call("/search", payload)["results"]
+
+    def stats(self):
+        return self._call("/stats")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# ? Tests import modules the way mainApp does ("services...", "dataLoaders..."), from the src folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
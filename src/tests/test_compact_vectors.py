@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from services.Milvus.CompactVectors import (
+    bytes_per_vector,
+    compare_modes,
+    from_storage,
+    rerank,
+    to_storage,
+)
+
+DIM = 32
+
+
+def unit(matrix):
+    return matrix / np.linalg.norm(matrix, axis=-1, keepdims=True)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(400, DIM)).astype(np.float32), rng.normal(
+        size=(20, DIM)
+    ).astype(np.float32)
+
+
+def test_bytes_per_vector():
+    assert bytes_per_vector("float32", 384) == 1536
+    assert bytes_per_vector("float16", 384) == 768
+    assert bytes_per_vector("binary", 384) == 48
+    with pytest.raises(ValueError):
+        bytes_per_vector("int8", 384)
+
+
+def test_storage_round_trip(data):
+    vectors, _ = data
+    half = from_storage(to_storage(vectors, "float16"), "float16", DIM)
+    np.testing.assert_allclose(half, vectors, rtol=1e-3, atol=1e-3)
+
+    packed = to_storage(vectors, "binary")
+    assert len(packed[0]) == DIM // 8
+    bits = from_storage(packed, "binary", DIM)
+    np.testing.assert_array_equal(bits, np.where(vectors > 0, 1.0, -1.0))
+
+
+def test_rerank_matches_full_precision_order(data):
+    vectors, queries = data
+    candidates = np.random.default_rng(1).permutation(len(vectors))[:50]
+    for query in queries:
+        positions, scores = rerank(query, vectors[candidates], top_k=10)
+        exact = unit(vectors[candidates]) @ unit(query)
+        expected = np.argsort(-exact, kind="stable")[:10]
+        assert positions.tolist() == expected.tolist()
+        np.testing.assert_allclose(scores, exact[expected], rtol=1e-5)
+
+
+def test_rerank_puts_unknown_ids_last(data):
+    vectors, queries = data
+    candidates = vectors[:5].copy()
+    candidates[0] = np.nan  # ? e.g. an id missing from the full-precision store
+    positions, scores = rerank(queries[0], candidates, top_k=5)
+    assert positions[-1] == 0 and scores[-1] == -np.inf
+
+
+def test_rerank_recovers_recall_lost_to_quantization(data):
+    vectors, queries = data
+    report = compare_modes(vectors, queries, top_k=10, rerank_factor=4)
+    assert report["float32"]["recall"] == 1.0
+    assert report["float16"]["recall"] >= 0.99
+    assert report["binary+rerank"]["recall"] > report["binary"]["recall"]
+    assert report["float16+rerank"]["recall"] >= report["float16"]["recall"]
+    assert report["binary"]["saved_pct"] == pytest.approx(96.9, abs=0.1)
@@ -0,0 +1,76 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from services.Milvus import EmbeddingCache as cache_module
+from services.Milvus.EmbeddingCache import EmbeddingCache
+
+DIM = 8
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_bytes=4 * DIM * 4)  # ? Room for 4 vectors
+    yield cache
+    cache.close()
+
+
+def vectors(n, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def test_hit_returns_stored_vector_and_miss_is_absent(cache):
+    key = EmbeddingCache.make_key("model", True, "login works")
+    stored = vectors(1)
+    cache.put_many([key], stored)
+
+    other = EmbeddingCache.make_key("model", True, "logout works")
+    found = cache.get_many([key, other])
+    assert list(found) == [key]
+    np.testing.assert_array_equal(found[key], stored[0])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_model_and_normalize_flag():
+    keys = {
+        EmbeddingCache.make_key("a", True, "text"),
+        EmbeddingCache.make_key("b", True, "text"),
+        EmbeddingCache.make_key("a", False, "text"),
+    }
+    assert len(keys) == 3
+    assert EmbeddingCache.make_key("a", True, "text") in keys
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    # ? Every clock read is one second later, so access order is never a tie
+    clock = itertools.count(1000)
+    monkeypatch.setattr(cache_module.time, "time", lambda: float(next(clock)))
+    keys = [f"k{i}" for i in range(4)]
+    for key, vec in zip(keys, vectors(4)):
+        cache.put_many([key], [vec])
+    cache.get_many(["k0"])  # ? k0 becomes the most recently used
+
+    cache.put_many(["k4", "k5"], vectors(2, seed=1))
+    assert len(cache) == 4
+    assert set(cache.get_many(keys + ["k4", "k5"])) == {"k0", "k3", "k4", "k5"}
+
+
+def test_replacing_a_key_does_not_grow_the_total(cache):
+    cache.put_many(["k0", "k1"], vectors(2))
+    cache.put_many(["k0", "k0"], vectors(2, seed=1))  # ? Last vector wins
+    assert cache._total_bytes == 2 * DIM * 4
+    np.testing.assert_array_equal(cache.get_many(["k0"])["k0"], vectors(2, seed=1)[1])
+
+
+def test_running_total_survives_reopen(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["k0", "k1", "k2"], vectors(3))
+    cache.close()
+
+    reopened = EmbeddingCache(str(tmp_path))
+    assert reopened._total_bytes == 3 * DIM * 4
+    assert len(reopened) == 3
+    reopened.clear()
+    assert reopened._total_bytes == 0 and len(reopened) == 0
+    reopened.close()
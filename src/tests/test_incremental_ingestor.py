@@ -0,0 +1,126 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.HelperClass import HelperClass
+from services.Milvus.IncrementalIngestor import IncrementalIngestor, assign_stable_ids
+from services.Milvus.LocalDataManager import LocalDataManager
+
+DIM = 8
+
+
+class FakeEmbedder:
+    # ? Deterministic vector per text; records every text sent to the "model"
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.encoded.extend(texts)
+        seeds = [int(hashlib.sha1(t.encode()).hexdigest()[:8], 16) for t in texts]
+        return np.array(
+            [np.random.default_rng(s).normal(size=DIM) for s in seeds],
+            dtype=np.float32,
+        )
+
+
+def workbook(rows, source="plan.xlsx"):
+    return pd.DataFrame(
+        [
+            {"TCID": tcid, "description": text, "priority": prio, "sourcefile": source}
+            for tcid, text, prio in rows
+        ]
+    )
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    store = LocalDataManager(
+        "test", DIM, persist_dir=None, scalar_fields={"priority": 64}
+    )
+    return IncrementalIngestor(
+        FakeEmbedder(), store, state_path=str(tmp_path / "state.json")
+    )
+
+
+def test_stable_id_is_deterministic_and_source_scoped():
+    helper = HelperClass()
+    first = helper.stableID("plan.xlsx", "tc-1")
+    assert first == HelperClass().stableID("plan.xlsx", "tc-1")
+    assert 0 <= first < 2**63
+    assert first != helper.stableID("other.xlsx", "tc-1")
+    assert first != helper.stableID("plan.xlsx", "tc-2")
+
+
+def test_ids_survive_reorder_and_tcid_formatting():
+    df = workbook([("TC-1", "Login", "High"), ("TC-2", "Logout", "Low")])
+    ids = assign_stable_ids(df).set_index("TCID")["id"]
+
+    reordered = workbook([(" tc-2 ", "Logout", "Low"), ("TC-1", "Login", "High")])
+    again = assign_stable_ids(reordered)
+    assert list(again["id"]) == [ids["TC-2"], ids["TC-1"]]
+
+
+def test_duplicate_and_missing_tcids_get_distinct_ids():
+    df = workbook(
+        [("TC-1", "Login", "High"), ("TC-1", "Login again", "High"), (None, "X", "")]
+    )
+    ids = assign_stable_ids(df)["id"]
+    assert ids.is_unique
+    # ? A row without a TCID is keyed on its text, so it keeps its id across runs
+    assert ids.iloc[2] == assign_stable_ids(df.iloc[[2]])["id"].iloc[0]
+
+
+def test_sync_only_touches_new_changed_and_deleted_rows(ingestor):
+    first = workbook(
+        [("TC-1", "Login", "High"), ("TC-2", "Logout", "Low"), ("TC-3", "Reset", "Low")]
+    )
+    summary = ingestor.sync(first)
+    assert (summary["new"], summary["reencoded"]) == (3, 3)
+    assert len(ingestor.data_manager) == 3
+
+    ingestor.embedder.encoded.clear()
+    assert ingestor.sync(first)["reencoded"] == 0
+    assert ingestor.embedder.encoded == []
+
+    second = workbook(
+        [
+            ("TC-1", "Login with SSO", "High"),  # ? Text changed
+            ("TC-2", "Logout", "High"),  # ? Only metadata changed
+            ("TC-4", "Signup", "Low"),  # ? New; TC-3 was removed
+        ]
+    )
+    summary = ingestor.sync(second)
+    assert (summary["new"], summary["changed"], summary["deleted"]) == (1, 2, 1)
+    assert summary["unchanged"] == 0
+    assert sorted(ingestor.embedder.encoded) == ["Login with SSO", "Logout", "Signup"]
+
+    ids = assign_stable_ids(second)["id"].tolist()
+    stored = ingestor.data_manager.search(np.ones(DIM), top_k=10)
+    assert sorted(r["id"] for r in stored) == sorted(ids)
+    hits = ingestor.data_manager.search(
+        FakeEmbedder().encode(["Login with SSO"])[0], top_k=1
+    )
+    assert hits[0]["id"] == ids[0] and hits[0]["text"] == "Login with SSO"
+
+
+def test_rows_of_workbooks_not_in_the_run_are_kept(ingestor):
+    ingestor.sync(workbook([("TC-1", "Login", "High")], source="a.xlsx"))
+    summary = ingestor.sync(workbook([("TC-1", "Login", "High")], source="b.xlsx"))
+    assert (summary["new"], summary["deleted"]) == (1, 0)
+    assert len(ingestor.data_manager) == 2
+
+
+def test_state_is_reloaded_and_full_sync_does_not_duplicate(ingestor, tmp_path):
+    df = workbook([("TC-1", "Login", "High"), ("TC-2", "Logout", "Low")])
+    ingestor.sync(df)
+
+    reopened = IncrementalIngestor(
+        FakeEmbedder(), ingestor.data_manager, state_path=str(tmp_path / "state.json")
+    )
+    assert reopened.sync(df)["reencoded"] == 0
+
+    summary = reopened.sync(df, full=True)
+    assert summary["reencoded"] == 2
+    assert len(reopened.data_manager) == 2
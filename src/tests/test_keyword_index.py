@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+
+from services.Milvus.KeywordIndex import (
+    KeywordIndex,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+
+
+def frame(rows, source="plan.xlsx"):
+    return pd.DataFrame(
+        [
+            {"id": i, "TCID": tcid, "description": text, "sourcefile": source}
+            for i, tcid, text in rows
+        ]
+    )
+
+
+ROWS = [
+    (1, "TC-001", "Login with valid password"),
+    (2, "TC-002", "Login with expired password shows error E-403"),
+    (3, "TC-003", "Password reset email is sent"),
+    (4, "TC-004", "Logout clears the session"),
+    (5, "TC-005", "Session timeout after password change password password"),
+    (6, None, "Covers REQ-1234: export report as PDF"),
+]
+
+
+@pytest.fixture
+def index():
+    index = KeywordIndex()
+    index.sync(frame(ROWS))
+    return index
+
+
+def test_tokenize_keeps_compound_ids_and_their_parts():
+    assert tokenize("See REQ-1234 and v4.2.1!") == [
+        "see",
+        "req-1234",
+        "req",
+        "1234",
+        "and",
+        "v4.2.1",
+        "v4",
+        "2",
+        "1",
+    ]
+
+
+def test_is_lookup_detects_ids_and_quoted_strings():
+    assert KeywordIndex.is_lookup("TC-0042")
+    assert KeywordIndex.is_lookup("4.2.1")
+    assert KeywordIndex.is_lookup('"connection refused"')
+    assert not KeywordIndex.is_lookup("login")
+    assert not KeywordIndex.is_lookup("login with password")
+
+
+def test_tcid_lookup_is_exact_and_case_insensitive(index):
+    hits = index.lookup(" tc-003 ")
+    assert [(h["id"], h["match"]) for h in hits] == [(3, "tcid")]
+    assert index.lookup("TC-999") == []
+
+
+def test_id_and_quoted_lookups_only_return_exact_matches(index):
+    assert [h["id"] for h in index.lookup("REQ-1234")] == [6]
+    assert [h["id"] for h in index.lookup('"expired password"')] == [2]
+    # ? Both tokens occur, but never as this exact phrase
+    assert index.lookup('"password login"') == []
+
+
+def test_bm25_ranks_rare_and_frequent_terms_higher(index):
+    hits = index.lookup("password", top_k=10)
+    ids = [h["id"] for h in hits]
+    assert set(ids) == {1, 2, 3, 5}
+    assert ids[0] == 5  # ? Highest term frequency
+    scores = [h["score"] for h in hits]
+    assert scores == sorted(scores, reverse=True)
+
+    # ? "expired" occurs once in the corpus, so it outweighs the common "password"
+    assert index.lookup("expired password", top_k=1)[0]["id"] == 2
+
+
+def test_verbatim_match_ranks_first_for_free_text(index):
+    hits = index.lookup("session timeout after password change", top_k=3)
+    assert (hits[0]["id"], hits[0]["match"]) == (5, "phrase")
+    assert all(h["match"] == "keyword" for h in hits[1:])
+
+
+def test_sync_updates_changed_and_removed_rows_per_workbook(index):
+    other = frame([(7, "TC-001", "Login on mobile")], source="mobile.xlsx")
+    index.sync(other)
+
+    rows = [r for r in ROWS if r[0] != 4]
+    rows[0] = (1, "TC-001", "Login with SSO")
+    summary = index.sync(frame(rows))
+    assert summary == {"added": 0, "changed": 1, "removed": 1}
+    assert index.lookup("logout") == []
+    assert [h["id"] for h in index.lookup("sso")] == [1]
+    # ? The same TCID in another workbook is a separate row and is kept
+    assert sorted(h["id"] for h in index.lookup("TC-001")) == [1, 7]
+
+
+def test_save_and_reload(tmp_path, index):
+    index.path = str(tmp_path / "keyword_index.json")
+    index.save()
+    reloaded = KeywordIndex(index.path)
+    assert len(reloaded) == len(ROWS)
+    assert reloaded.lookup("password", top_k=10) == index.lookup("password", top_k=10)
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    dense = [{"id": 1, "text": "a"}, {"id": 2, "text": "b"}, {"id": 3, "text": "c"}]
+    keyword = [{"id": 3, "text": "c"}, {"id": 4, "text": "d"}]
+    fused = reciprocal_rank_fusion([dense, keyword], top_k=3)
+    assert [h["id"] for h in fused] == [3, 1, 2]
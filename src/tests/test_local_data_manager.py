@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from services.Milvus.LocalDataManager import LocalDataManager
+
+DIM = 16
+
+
+def brute_force(vectors, query, k):
+    # ? Reference ranking: cosine similarity over every row, highest first
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ (query / np.linalg.norm(query))
+    order = np.argsort(-scores, kind="stable")[:k]
+    return order.tolist(), scores[order]
+
+
+def make_store(rows=500, batches=5, persist_dir=None):
+    store = LocalDataManager(
+        "test", DIM, persist_dir=persist_dir, scalar_fields={"priority": 64}
+    )
+    vectors = np.random.default_rng(0).normal(size=(rows, DIM)).astype(np.float32)
+    priorities = ["High" if i % 3 == 0 else "Low" for i in range(rows)]
+    step = rows // batches
+    for start in range(0, rows, step):
+        end = start + step
+        store.insert_embeddings(
+            list(range(start, end)),
+            vectors[start:end],
+            [f"t{i}" for i in range(start, end)],
+            {"priority": priorities[start:end]},
+        )
+    return store, vectors
+
+
+def test_search_matches_brute_force_ordering():
+    store, vectors = make_store()
+    queries = np.random.default_rng(1).normal(size=(8, DIM)).astype(np.float32)
+    for query, results in zip(queries, store.search_many(queries, top_k=10)):
+        expected_ids, expected_scores = brute_force(vectors, query, 10)
+        assert [r["id"] for r in results] == expected_ids
+        np.testing.assert_allclose(
+            [r["score"] for r in results], expected_scores, rtol=1e-5
+        )
+        assert results[0]["text"] == f"t{expected_ids[0]}"
+
+
+def test_per_query_top_k_and_oversized_k():
+    store, vectors = make_store(rows=50)
+    results = store.search_many(vectors[:3], top_k=[1, 5, 100])
+    assert [len(r) for r in results] == [1, 5, 50]
+    assert [r[0]["id"] for r in results] == [0, 1, 2]
+
+
+def test_filters_restrict_candidates_before_ranking():
+    store, vectors = make_store()
+    high = np.array([i for i in range(len(vectors)) if i % 3 == 0])
+    results = store.search(vectors[1], top_k=5, filters={"priority": " HIGH "})
+    expected, _ = brute_force(vectors[high], vectors[1], 5)
+    assert [r["id"] for r in results] == high[expected].tolist()
+
+    with pytest.raises(ValueError):
+        store.search(vectors[1], filters={"unknown": "x"})
+
+
+def test_upsert_and_delete_change_the_ranking():
+    store, vectors = make_store()
+    store.upsert_embeddings([7], -vectors[0][None, :], ["moved"])
+    store.delete_by_ids([0])
+    results = store.search(vectors[0], top_k=len(vectors))
+    assert len(store) == len(vectors) - 1
+    assert 0 not in [r["id"] for r in results]
+    assert results[-1]["id"] == 7 and results[-1]["text"] == "moved"
+
+
+def test_flush_and_reload_keep_results(tmp_path):
+    store, vectors = make_store(persist_dir=str(tmp_path))
+    before = store.search(vectors[42], top_k=5)
+    store.flush()
+
+    reloaded = LocalDataManager(
+        "test", DIM, persist_dir=str(tmp_path), scalar_fields={"priority": 64}
+    )
+    assert len(reloaded) == len(vectors)
+    assert reloaded.search(vectors[42], top_k=5) == before
+    np.testing.assert_allclose(
+        reloaded.get_vectors([42])[0],
+        vectors[42] / np.linalg.norm(vectors[42]),
+        rtol=1e-6,
+    )
+
+
+def test_search_many_accepts_the_milvus_keyword_arguments():
+    import inspect
+
+    from services.Milvus.MilvusDataManager import MilvusDataManager
+
+    local = inspect.signature(LocalDataManager.search_many).parameters
+    milvus = inspect.signature(MilvusDataManager.search_many).parameters
+    assert [(p.name, p.default) for p in local.values()] == [
+        (p.name, p.default) for p in milvus.values()
+    ]
+
+    store, vectors = make_store(rows=50)
+    results = store.search_many(
+        vectors[:2], top_k=3, workers=4, rerank=False, search_params={"ef": 8}
+    )
+    assert [r[0]["id"] for r in results] == [0, 1]
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from services.Milvus import MilvusConnector as connector_module
+from services.Milvus.MilvusConnector import MilvusConnector
+
+
+class FakeConnections:
+    # ? Stand-in for pymilvus.connections: tracks which aliases are open
+    def __init__(self):
+        self.open = set()
+
+    def connect(self, alias, host=None, port=None):
+        self.open.add(alias)
+
+    def has_connection(self, alias):
+        return alias in self.open
+
+    def disconnect(self, alias):
+        self.open.discard(alias)
+
+
+@pytest.fixture
+def connector(monkeypatch):
+    monkeypatch.setattr(connector_module, "connections", FakeConnections())
+    return MilvusConnector(pool_size=2).connect()
+
+
+def pooled(connector):
+    return sorted(connector._pool.queue)
+
+
+def test_lease_from_before_disconnect_is_not_returned(connector):
+    with connector.acquire() as stale:
+        connector.disconnect()
+        connector.connect()
+        assert pooled(connector) == sorted(connector.aliases)
+    # ? Returning the stale lease would hand the same alias to two workers
+    assert pooled(connector) == sorted(connector.aliases)
+
+    with connector.acquire() as fresh:
+        assert connector_module.connections.has_connection(fresh)
+    assert stale in connector.aliases
+
+
+def test_waiter_is_not_stranded_by_disconnect(connector):
+    got = []
+    with connector.acquire(), connector.acquire():  # ? Pool exhausted
+        waiter = threading.Thread(
+            target=lambda: got.append(connector.acquire(timeout=5).__enter__())
+        )
+        waiter.start()
+        connector.disconnect()  # ? The held leases are dropped, never returned
+        waiter.join(timeout=5)
+    assert got and got[0] in connector.aliases
+    assert connector.connected
+
+
+def test_acquire_times_out_when_the_pool_stays_busy(connector):
+    with connector.acquire(), connector.acquire():
+        with pytest.raises(TimeoutError):
+            with connector.acquire(timeout=0.1):
+                pass
@@ -0,0 +1,171 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pymilvus import DataType
+
+from services.Milvus.CompactVectors import from_storage
+from services.Milvus.LocalDataManager import LocalDataManager
+from services.Milvus.MilvusConnector import VECTOR_DTYPES, MilvusConnector
+from services.Milvus.MilvusDataManager import MilvusDataManager
+
+DIM = 16
+
+
+class FakeCollection:
+    # ? Brute-force stand-in for a pymilvus Collection with an HNSW index (rejects ef < limit like Milvus)
+    def __init__(self, mode="float32"):
+        self.mode = mode
+        self.schema = SimpleNamespace(
+            fields=[
+                SimpleNamespace(name="id", dtype=DataType.INT64, params={}),
+                SimpleNamespace(
+                    name="embedding", dtype=VECTOR_DTYPES[mode], params={"dim": DIM}
+                ),
+                SimpleNamespace(
+                    name="text", dtype=DataType.VARCHAR, params={"max_length": 1000}
+                ),
+            ]
+        )
+        self.indexes = [
+            SimpleNamespace(
+                field_name="embedding",
+                params={
+                    "index_type": "HNSW",
+                    "metric_type": "COSINE",
+                    "params": {"M": 16, "efConstruction": 200},
+                },
+            )
+        ]
+        self.rows = {}
+        self.search_calls = []
+
+    def insert(self, entities):
+        ids, vectors, texts = entities[:3]
+        decoded = from_storage(vectors, self.mode, DIM)
+        for i, vector, text in zip(ids, decoded, texts):
+            self.rows[int(i)] = (vector, text)
+
+    upsert = insert
+
+    @property
+    def num_entities(self):
+        return len(self.rows)
+
+    def search(self, data, field, param, limit, expr, output_fields):
+        ef = param["params"].get("ef")
+        if ef is not None and ef < limit:
+            raise ValueError(f"ef ({ef}) should be larger than topk ({limit})")
+        self.search_calls.append((param, limit))
+        ids = list(self.rows)
+        matrix = np.array([self.rows[i][0] for i in ids])
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        results = []
+        for q in from_storage(data, self.mode, DIM):
+            scores = matrix @ (q / np.linalg.norm(q))
+            order = np.argsort(-scores)[:limit]
+            results.append(
+                [
+                    SimpleNamespace(
+                        id=ids[j],
+                        distance=float(scores[j]),
+                        entity={"text": self.rows[ids[j]][1]},
+                    )
+                    for j in order
+                ]
+            )
+        return results
+
+
+class FakeConnector:
+    pool_size = 1
+    vector_mode_of = staticmethod(MilvusConnector.vector_mode_of)
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def collection(self, name, alias=None):
+        return self._collection
+
+    def execute(self, name, operation, retries=1):
+        return operation(self._collection)
+
+
+def make_manager(mode="float32", rerank_factor=4, rows=300):
+    collection = FakeCollection(mode)
+    rerank_store = (
+        None
+        if mode == "float32"
+        else LocalDataManager("test", DIM, persist_dir=None, scalar_fields={})
+    )
+    manager = MilvusDataManager(
+        FakeConnector(collection),
+        "test",
+        rerank_store=rerank_store,
+        rerank_factor=rerank_factor,
+    )
+    manager.search_params = None  # ? Ignore tuned params persisted on this machine
+    vectors = np.random.default_rng(0).normal(size=(rows, DIM)).astype(np.float32)
+    manager.insert_embeddings(
+        list(range(rows)), vectors, [f"t{i}" for i in range(rows)]
+    )
+    return manager, collection, vectors
+
+
+def test_larger_top_k_than_cached_ef_raises_ef():
+    manager, collection, vectors = make_manager()
+    manager.search(vectors[0], top_k=5)  # ? Caches the default ef=64
+    results = manager.search(vectors[0], top_k=100)
+    assert len(results) == 100
+    assert collection.search_calls[-1][0]["params"]["ef"] == 100
+    assert manager.search_params["params"]["ef"] == 64  # ? Cached params stay untouched
+
+
+@pytest.mark.parametrize("mode", ["float16", "binary"])
+def test_rerank_widened_limit_above_ef(mode):
+    manager, collection, vectors = make_manager(mode, rerank_factor=4)
+    manager.search_params = {"metric_type": "COSINE", "params": {"ef": 20}}
+    # ? top_k=20 > ef / rerank_factor: the widened limit is 80
+    results = manager.search(vectors[3], top_k=20)
+    assert collection.search_calls[-1][1] == 80
+    assert collection.search_calls[-1][0]["params"]["ef"] == 80
+    assert len(results) == 20
+    assert results[0]["id"] == 3
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.parametrize("mode", ["float16", "binary"])
+def test_rerank_returns_full_precision_results(mode):
+    # ? A limit covering every row makes the reranked top-k equal to exact float32 search
+    manager, _, vectors = make_manager(mode, rerank_factor=30, rows=300)
+    exact = LocalDataManager("exact", DIM, persist_dir=None, scalar_fields={})
+    exact.insert_embeddings(
+        list(range(len(vectors))), vectors, [f"t{i}" for i in range(len(vectors))]
+    )
+    queries = np.random.default_rng(1).normal(size=(5, DIM)).astype(np.float32)
+    for query in queries:
+        expected = exact.search(query, top_k=10)
+        results = manager.search(query, top_k=10)
+        assert [r["id"] for r in results] == [r["id"] for r in expected]
+        np.testing.assert_allclose(
+            [r["score"] for r in results], [r["score"] for r in expected], rtol=1e-5
+        )
+
+
+def test_reselect_index_rebuilds_only_when_the_type_changes(monkeypatch):
+    from services.Milvus import IndexTuner
+
+    collection = FakeCollection()
+    collection.rows = dict.fromkeys(range(50))
+    connector = MilvusConnector()
+    monkeypatch.setattr(connector, "collection", lambda name, alias=None: collection)
+    rebuilt = []
+    monkeypatch.setattr(
+        connector, "rebuild_index", lambda *a, **kw: rebuilt.append(kw) or kw
+    )
+
+    assert connector.reselect_index("test") is None  # ? 50 rows: HNSW stays
+    monkeypatch.setattr(IndexTuner, "HNSW_MAX_ROWS", 10)
+    assert connector.reselect_index("test") == {"metric_type": "COSINE", "num_rows": 50}
+    assert len(rebuilt) == 1
@@ -0,0 +1,23 @@
+import importlib.util
+
+import pytest
+
+from services.Milvus.MilvusEmbedder import load_sentence_model
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown embedder backend"):
+        load_sentence_model("all-MiniLM-L6-v2", "tensorrt")
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_missing_onnx_packages_are_named(backend, monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *a: None if name == "optimum" else find_spec(name, *a),
+    )
+    with pytest.raises(ImportError, match=r"optimum\[onnxruntime\]") as error:
+        load_sentence_model("all-MiniLM-L6-v2", backend)
+    assert "requirements-onnx.txt" in str(error.value)
@@ -0,0 +1,81 @@
+import numpy as np
+
+from services.Milvus.LocalDataManager import LocalDataManager
+from services.Milvus.MilvusSearchCLI import MilvusSearchCLI
+from services.Milvus.QueryCache import LRUCache, normalize_prompt, vector_hash
+
+DIM = 8
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array(
+            [np.random.default_rng(len(t)).normal(size=DIM) for t in texts],
+            dtype=np.float32,
+        )
+
+
+class CountingStore(LocalDataManager):
+    # ? LocalDataManager that counts the searches reaching the store
+    def __init__(self):
+        super().__init__("test", DIM, persist_dir=None, scalar_fields={})
+        self.searches = 0
+
+    def search(self, *args, **kwargs):
+        self.searches += 1
+        return super().search(*args, **kwargs)
+
+
+def make_cli(rows=20):
+    store = CountingStore()
+    vectors = np.random.default_rng(0).normal(size=(rows, DIM)).astype(np.float32)
+    store.insert_embeddings(list(range(rows)), vectors, [f"t{i}" for i in range(rows)])
+    embedder = CountingEmbedder()
+    return MilvusSearchCLI(embedder, store), embedder, store
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # ? "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_prompt_normalization_and_vector_hash():
+    assert normalize_prompt("  Login   FAILS\n") == "login fails"
+    vector = np.arange(DIM, dtype=np.float64)
+    assert vector_hash(vector) == vector_hash(vector.astype(np.float32))
+    assert vector_hash(vector) != vector_hash(vector + 1)
+
+
+def test_repeated_prompt_is_encoded_and_searched_once():
+    cli, embedder, store = make_cli()
+    first = cli.search("Login fails", top_k=3)
+    again = cli.search("  login   FAILS ", top_k=3)
+    assert again == first
+    assert embedder.calls == [["login fails"]]
+    assert store.searches == 1
+
+    cli.search(
+        "login fails", top_k=5
+    )  # ? Other top_k: new result entry, same embedding
+    assert store.searches == 2 and len(embedder.calls) == 1
+
+
+def test_writes_invalidate_cached_results():
+    cli, embedder, store = make_cli()
+    query = embedder.encode(["login fails"])[0]
+    cli.search("login fails", top_k=1)
+
+    store.insert_embeddings([99], query[None, :], ["exact match"])
+    results = cli.search("login fails", top_k=1)
+    assert store.searches == 2
+    assert results[0]["id"] == 99
@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pytest
+
+from dataLoaders.DataLoaderClass import DataLoaderClass
+from dataLoaders.WorkbookCache import WorkbookCache
+
+
+@pytest.fixture
+def raw_folder(tmp_path, monkeypatch):
+    # ? Snapshots go to ../data/processed, so run from a scratch "src" folder
+    (tmp_path / "src").mkdir()
+    monkeypatch.chdir(tmp_path / "src")
+    folder = tmp_path / "raw"
+    folder.mkdir()
+    return folder
+
+
+def write_workbook(path, descriptions):
+    pd.DataFrame(
+        {
+            "TC ID": [f"TC-{i}" for i in range(len(descriptions))],
+            "Description": descriptions,
+        }
+    ).to_excel(path, index=False)
+
+
+def test_watch_feeds_each_change_to_on_change(raw_folder):
+    write_workbook(raw_folder / "a.xlsx", ["Login", "Logout"])
+    seen = []
+
+    def on_change(df):
+        seen.append(sorted(df["description"]))
+        if len(seen) == 1:
+            write_workbook(raw_folder / "b.xlsx", ["Signup"])
+        else:
+            raise KeyboardInterrupt  # ? Ends the watch loop like Ctrl+C
+
+    loader = DataLoaderClass(cache=WorkbookCache(str(raw_folder.parent / "cache")))
+    loader.watchRawFolder(str(raw_folder), interval=0.01, on_change=on_change, keep=1)
+
+    assert seen == [["Login", "Logout"], ["Login", "Logout", "Signup"]]
+    assert len(os.listdir(raw_folder.parent / "data" / "processed")) >= 1
+
+
+def test_watch_needs_a_cache(raw_folder):
+    with pytest.raises(ValueError):
+        DataLoaderClass().watchRawFolder(str(raw_folder))
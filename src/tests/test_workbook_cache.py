@@ -0,0 +1,101 @@
+import os
+
+import pandas as pd
+import pytest
+
+from dataLoaders import WorkbookCache as cache_module
+from dataLoaders.WorkbookCache import WorkbookCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return WorkbookCache(str(tmp_path / "cache"))
+
+
+def write_workbook(path, content=b"workbook v1"):
+    # ? The cache only hashes bytes, so any file stands in for an .xlsx
+    path.write_bytes(content)
+    return str(path)
+
+
+def parsed(source):
+    return pd.DataFrame(
+        {"TCID": ["TC-1", 2], "description": ["Login", "Logout"], "sourcefile": source}
+    )
+
+
+def test_miss_then_hit_after_put(cache, tmp_path):
+    path = write_workbook(tmp_path / "plan.xlsx")
+    assert cache.isStale(path)
+    assert cache.get(path) is None
+
+    cache.put(path, parsed("plan.xlsx"))
+    assert not cache.isStale(path)
+    df = cache.get(path)
+    assert df["description"].tolist() == ["Login", "Logout"]
+    assert df["TCID"].tolist() == ["TC-1", "2"]  # ? Mixed object columns stored as text
+
+
+def test_changed_content_is_stale_but_touch_is_not(cache, tmp_path):
+    path = write_workbook(tmp_path / "plan.xlsx")
+    cache.put(path, parsed("plan.xlsx"))
+
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))  # ? Same bytes, new mtime
+    assert cache.get(path) is not None
+
+    write_workbook(tmp_path / "plan.xlsx", b"workbook v2")
+    assert cache.isStale(path)
+    assert cache.get(path) is None
+
+
+def test_index_persists_across_instances(cache, tmp_path):
+    path = write_workbook(tmp_path / "plan.xlsx")
+    cache.put(path, parsed("plan.xlsx"))
+    assert WorkbookCache(cache.cache_dir).get(path) is not None
+
+
+def test_parser_version_bump_invalidates(cache, tmp_path, monkeypatch):
+    path = write_workbook(tmp_path / "plan.xlsx")
+    cache.put(path, parsed("plan.xlsx"))
+    monkeypatch.setattr(cache_module, "PARSER_VERSION", cache_module.PARSER_VERSION + 1)
+    assert cache.isStale(path)
+
+
+def test_identical_copies_keep_their_own_sourcefile(cache, tmp_path):
+    first = write_workbook(tmp_path / "a.xlsx")
+    second = write_workbook(tmp_path / "b.xlsx")
+    cache.put(first, parsed("a.xlsx"))
+    cache.put(second, parsed("b.xlsx"))
+
+    assert cache.index[os.path.abspath(first)]["file"] != (
+        cache.index[os.path.abspath(second)]["file"]
+    )
+    assert set(cache.get(first)["sourcefile"]) == {"a.xlsx"}
+    assert set(cache.get(second)["sourcefile"]) == {"b.xlsx"}
+
+
+def cached_files(cache):
+    return sorted(f for f in os.listdir(cache.cache_dir) if f.endswith(".parquet"))
+
+
+def test_superseded_file_is_removed_on_put(cache, tmp_path):
+    path = write_workbook(tmp_path / "plan.xlsx")
+    cache.put(path, parsed("plan.xlsx"))
+    first = cached_files(cache)
+
+    write_workbook(tmp_path / "plan.xlsx", b"workbook v2")
+    cache.put(path, parsed("plan.xlsx"))
+    assert len(cached_files(cache)) == 1
+    assert cached_files(cache) != first
+
+
+def test_older_parser_versions_are_pruned_on_open(cache, tmp_path, monkeypatch):
+    path = write_workbook(tmp_path / "plan.xlsx")
+    cache.put(path, parsed("plan.xlsx"))
+    monkeypatch.setattr(cache_module, "PARSER_VERSION", cache_module.PARSER_VERSION + 1)
+
+    reopened = WorkbookCache(cache.cache_dir)
+    assert reopened.index == {}
+    assert cached_files(reopened) == []
+    assert reopened.get(path) is None